@@ -0,0 +1,132 @@
+import sys
+from pathlib import Path
+from time import perf_counter
+import importlib
+
+# the setpoint is applied to a network built in the in-memory powerfactory stand-in
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+path_standin = path_src / "pf_standin"
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make, path_standin]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+sys.path.insert(0, str(path_standin))
+
+import powerfactory
+import standin_project
+import make_network as mn
+import applyscenario as add_op
+
+importlib.reload(mn)
+importlib.reload(add_op)
+
+# directory of pf data csvs
+pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
+
+# opf results of the hour applied to the operation scenarios
+hour_dir = path_nem2000d / "results" / "opf" / "2050" / "stage_2" / "1"
+
+# latency of each stand-in call in seconds, see powerfactory.set_latency
+call_latency = {"default": 0.0001}
+
+# element classes in build order
+elm_classes = [
+    "ElmTerm",
+    "ElmStactrl",
+    "ElmLne",
+    "ElmTr2",
+    "ElmLod",
+    "ElmShnt",
+    "ElmSym",
+    "ElmGenstat",
+    "ElmPvsys",
+    "ElmSvs",
+]
+
+# attributes compared between the scenarios written with and without batching
+compared_attributes = {
+    "ElmSym": ["outserv", "pgini", "qgini", "usetp"],
+    "ElmGenstat": ["outserv", "pgini", "qgini", "usetp"],
+    "ElmPvsys": ["outserv", "pgini", "qgini", "usetp"],
+    "ElmSvs": ["qsetp"],
+    "ElmLod": ["outserv", "plini", "qlini"],
+    "ElmTr2": ["nntap"],
+    "ElmStactrl": ["usetp"],
+    "ElmShnt": ["outserv", "ncapa"],
+    "ElmTerm": ["outserv"],
+}
+
+
+def build_network(app):
+    data = {}
+    mn.prepare_project(app, data, "nem")
+    mn.parse_network_from_csvs(app, data, pf_data_dir)
+    mn.get_nem_dynamic_models(app, data)
+    mn.get_WECC_dynamic_models(app, data)
+    mn.make_nem_areas(app, data)
+    mn.reset_transfer_attributes()
+    mn.reset_shared_types()
+    for elm_class in elm_classes:
+        getattr(mn, f"make_all_{elm_class}")(app, data)
+
+
+# applies the setpoint to a new operation scenario
+# returns the wall time and stand-in call counts of applying and saving the setpoint
+def time_apply_setpoint(app, setpoint_data, scenario_name, batch_writes):
+    add_op.enable_batched_writes(batch_writes)
+    operation_scenario = add_op.make_operation_scenario(app, scenario_name)
+    powerfactory.reset_call_counts()
+    ts = perf_counter()
+    add_op.apply_setpoint_to_operation_scenario(app, operation_scenario, setpoint_data)
+    wall_time = perf_counter() - ts
+    call_counts = powerfactory.get_call_counts()
+    if batch_writes:
+        add_op.report_batched_writes(app)
+    add_op.enable_batched_writes(False)
+    return (wall_time, call_counts)
+
+
+# returns the compared attributes of all elements in the active scenario
+def get_scenario_values(app):
+    values = {}
+    for elm_class, attributes in compared_attributes.items():
+        for elm in app.GetCalcRelevantObjects(f"*.{elm_class}"):
+            for attribute in attributes:
+                values[(elm.loc_name, elm_class, attribute)] = elm.GetAttribute(
+                    attribute
+                )
+    return values
+
+
+if __name__ == "__main__":
+    app = standin_project.make_standin_application(echo=False)
+    build_network(app)
+    setpoint_data = add_op.parse_setpoint_from_opf_results(app, hour_dir)
+
+    powerfactory.set_latency(**call_latency)
+    (t_direct, n_direct) = time_apply_setpoint(
+        app, setpoint_data, "hour_001_direct", batch_writes=False
+    )
+    values_direct = get_scenario_values(app)
+    (t_batched, n_batched) = time_apply_setpoint(
+        app, setpoint_data, "hour_001_batched", batch_writes=True
+    )
+    values_batched = get_scenario_values(app)
+    powerfactory.reset_latency()
+
+    n_differences = sum(
+        1 for key, value in values_direct.items() if values_batched[key] != value
+    )
+    print("call: \tdirect -> batched")
+    for call in sorted(set(n_direct.keys()) | set(n_batched.keys())):
+        print(f"{call}: \t{n_direct.get(call, 0)} -> {n_batched.get(call, 0)}")
+    print(f"total calls: \t{sum(n_direct.values())} -> {sum(n_batched.values())}")
+    print(f"wall time: \t{round(t_direct, 3)}s -> {round(t_batched, 3)}s")
+    print(f"attribute differences: \t{n_differences} of {len(values_direct)}")
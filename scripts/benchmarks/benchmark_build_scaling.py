@@ -0,0 +1,212 @@
+import csv
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from time import perf_counter
+import importlib
+
+# the build is run against the in-memory powerfactory stand-in
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+path_standin = path_src / "pf_standin"
+path_benchmarks = Path(__file__).resolve().parent
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make, path_standin, path_benchmarks]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+sys.path.insert(0, str(path_standin))
+sys.path.insert(0, str(path_benchmarks))
+
+import powerfactory
+import standin_project
+import synthetic_network
+import make_network as mn
+
+importlib.reload(mn)
+
+# directory of pf data csvs, copied to make the synthetic networks
+pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
+
+# results are appended to this csv, one row per stage and scale. results/benchmarks is ignored by git
+results_path = path_nem2000d / "results" / "benchmarks" / "build_scaling.csv"
+
+# number of copies of the SNEM2000d network in each synthetic network
+scales = [1, 5, 20]
+
+# latency of each stand-in call in seconds, see powerfactory.set_latency
+call_latency = {"default": 0.0}
+
+# calls reported in the results, all other calls are included in total_calls
+reported_calls = [
+    "CreateObject",
+    "SetAttribute",
+    "SetAttributes",
+    "GetAttribute",
+    "DefineTransferAttributes",
+    "GetContents",
+    "GetCalcRelevantObjects",
+]
+
+results_columns = [
+    "timestamp",
+    "scale",
+    "n_buses",
+    "latency_s",
+    "stage",
+    "wall_time_s",
+    "peak_memory_mb",
+    "total_calls",
+] + reported_calls
+
+
+# element classes in build order
+elm_classes = [
+    "ElmTerm",
+    "ElmStactrl",
+    "ElmLne",
+    "ElmTr2",
+    "ElmLod",
+    "ElmShnt",
+    "ElmSym",
+    "ElmGenstat",
+    "ElmPvsys",
+    "ElmSvs",
+]
+
+# element classes with a graphic, in the order they are drawn
+grf_classes = [
+    "ElmTerm",
+    "ElmSym",
+    "ElmGenstat",
+    "ElmPvsys",
+    "ElmSvs",
+    "ElmLod",
+    "ElmShnt",
+    "ElmLne",
+    "ElmTr2",
+]
+
+
+def get_dynamic_models(app, data):
+    mn.get_nem_dynamic_models(app, data)
+    mn.get_WECC_dynamic_models(app, data)
+
+
+def make_diagram_frame(app, data):
+    mn.make_page_size(app, "nem_diagram", (31233, 62348))
+    mn.make_IntGrfNet(app, data, "nem_diagram")
+
+
+# returns the stages of the build, in order
+# the network diagram is split into its classes to show which grfs dominate
+def get_build_stages(data_dir):
+    stages = {
+        "parse": partial(
+            mn.parse_network_from_csvs, data_dir=data_dir, use_snapshot=False
+        ),
+        "dynamic_models": get_dynamic_models,
+        "areas": mn.make_nem_areas,
+    }
+    for elm_class in elm_classes:
+        stages[elm_class] = getattr(mn, f"make_all_{elm_class}")
+    stages["diagram"] = make_diagram_frame
+    for elm_class in grf_classes:
+        stages[f"grf_{elm_class}"] = getattr(mn, f"make_all_grfs_{elm_class}")
+    return stages
+
+
+# runs a stage and returns its wall time, peak python memory in MB and stand-in call counts
+def run_stage(app, data, stage_function):
+    powerfactory.reset_call_counts()
+    mn.reset_build_stats()
+    tracemalloc.reset_peak()
+    ts = perf_counter()
+    stage_function(app, data)
+    wall_time = perf_counter() - ts
+    (_, peak) = tracemalloc.get_traced_memory()
+    return (wall_time, peak / 1e6, powerfactory.get_call_counts())
+
+
+# raises if the calls recorded in the build stats of a stage differ from the calls made on the
+# stand-in. the calls of all build stages run by the stage are added up
+def check_build_stats(stage_name, call_counts):
+    recorded = {call: 0 for call in mn.counted_calls}
+    for stats in mn.get_build_stats():
+        for call in mn.counted_calls:
+            recorded[call] += stats[call]
+    made = {call: call_counts.get(call, 0) for call in mn.counted_calls}
+    if recorded != made:
+        raise RuntimeError(
+            f"Build stats of {stage_name} record {recorded}, but {made} calls were made"
+        )
+
+
+# builds the network in data_dir and returns a results row for each stage
+def benchmark_build(data_dir, scale):
+    app = standin_project.make_standin_application(echo=False)
+    powerfactory.reset_latency()
+    powerfactory.set_latency(**call_latency)
+
+    data = {}
+    mn.prepare_project(app, data, "nem")
+    mn.reset_transfer_attributes()
+    mn.reset_shared_types()
+
+    rows = []
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    tracemalloc.start()
+    for stage_name, stage_function in get_build_stages(data_dir).items():
+        (wall_time, peak_memory, call_counts) = run_stage(app, data, stage_function)
+        check_build_stats(stage_name, call_counts)
+        row = {
+            "timestamp": timestamp,
+            "scale": scale,
+            "stage": stage_name,
+            "latency_s": call_latency["default"],
+            "wall_time_s": round(wall_time, 4),
+            "peak_memory_mb": round(peak_memory, 2),
+            "total_calls": sum(call_counts.values()),
+        }
+        for call in reported_calls:
+            row[call] = call_counts.get(call, 0)
+        rows.append(row)
+        print(f"x{scale} {stage_name}: \t{round(wall_time, 2)}s")
+    tracemalloc.stop()
+
+    for row in rows:
+        row["n_buses"] = len(data["network"]["ElmTerm"])
+    return rows
+
+
+def write_results(rows, results_path):
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not results_path.exists()
+    with open(results_path, "a", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=results_columns)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    rows = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            synthetic_network.make_synthetic_network(pf_data_dir, tmp_dir, scale)
+            rows.extend(benchmark_build(Path(tmp_dir), scale))
+
+    write_results(rows, results_path)
+
+    for scale in scales:
+        total = sum(row["wall_time_s"] for row in rows if row["scale"] == scale)
+        print(f"x{scale} build total: \t{round(total, 2)}s")
+    print(f"Results appended to {results_path}")
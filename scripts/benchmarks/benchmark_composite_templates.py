@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+from time import perf_counter
+import importlib
+
+# the synchronous machines and WECC wind and pv plants are made in the in-memory powerfactory
+# stand-in, once object by object and once by copying composite model templates
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+path_standin = path_src / "pf_standin"
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make, path_standin]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+sys.path.insert(0, str(path_standin))
+
+import powerfactory
+import standin_project
+import make_network as mn
+
+importlib.reload(mn)
+
+# directory of pf data csvs
+pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
+
+# latency of each stand-in call in seconds, see powerfactory.set_latency
+call_latency = {"default": 0.0001}
+
+# element classes made before the plants
+network_classes = ["ElmTerm", "ElmStactrl", "ElmLne", "ElmTr2"]
+
+# element classes of the plants
+plant_classes = ["ElmSym", "ElmGenstat", "ElmPvsys"]
+
+
+# builds the network up to the plants, then times making the plants
+# returns the wall time and stand-in call counts
+def time_make_plants(app, use_templates):
+    data = {}
+    mn.prepare_project(app, data, "nem")
+    mn.parse_network_from_csvs(app, data, pf_data_dir)
+    mn.get_nem_dynamic_models(app, data)
+    mn.get_WECC_dynamic_models(app, data)
+    mn.make_nem_areas(app, data)
+    mn.reset_transfer_attributes()
+    mn.reset_shared_types()
+    for elm_class in network_classes:
+        getattr(mn, f"make_all_{elm_class}")(app, data)
+
+    mn.reset_composite_templates(enabled=use_templates)
+    powerfactory.set_latency(**call_latency)
+    powerfactory.reset_call_counts()
+    ts = perf_counter()
+    for elm_class in plant_classes:
+        getattr(mn, f"make_all_{elm_class}")(app, data)
+    wall_time = perf_counter() - ts
+    call_counts = powerfactory.get_call_counts()
+    powerfactory.reset_latency()
+    mn.report_composite_templates(app)
+    return (wall_time, call_counts)
+
+
+# returns a comparable value, with objects replaced by their full names
+def get_comparable(value):
+    if isinstance(value, list):
+        return [get_comparable(v) for v in value]
+    if isinstance(value, powerfactory.DataObject):
+        return value.GetFullName()
+    return value
+
+
+# returns the contents and attributes of all composite models in the network
+def get_plant_contents(app):
+    contents = {}
+    for comp_model in app.GetCalcRelevantObjects("*.ElmComp"):
+        for obj in [comp_model] + comp_model.GetContents("*", 1):
+            contents[obj.GetFullName()] = {
+                name: get_comparable(value) for name, value in obj._attributes.items()
+            }
+    return contents
+
+
+if __name__ == "__main__":
+    app = standin_project.make_standin_application(echo=False)
+
+    (t_direct, n_direct) = time_make_plants(app, use_templates=False)
+    contents_direct = get_plant_contents(app)
+    (t_templates, n_templates) = time_make_plants(app, use_templates=True)
+    contents_templates = get_plant_contents(app)
+    n_plants = mn.composite_templates["n_copies"]
+
+    n_differences = sum(
+        1
+        for name in set(contents_direct.keys()) | set(contents_templates.keys())
+        if contents_direct.get(name) != contents_templates.get(name)
+    )
+    print("call: \tdirect -> templates")
+    for call in sorted(set(n_direct.keys()) | set(n_templates.keys())):
+        print(f"{call}: \t{n_direct.get(call, 0)} -> {n_templates.get(call, 0)}")
+    print(f"total calls: \t{sum(n_direct.values())} -> {sum(n_templates.values())}")
+    print(f"wall time: \t{round(t_direct, 3)}s -> {round(t_templates, 3)}s")
+    print(
+        f"per plant: \t{round(1000 * t_direct / n_plants, 2)}ms -> "
+        f"{round(1000 * t_templates / n_plants, 2)}ms ({n_plants} plants)"
+    )
+    print(
+        f"composite model objects differing: \t{n_differences} of {len(contents_direct)}"
+    )
@@ -0,0 +1,105 @@
+import sys
+from pathlib import Path
+from time import perf_counter
+import importlib
+
+# consecutive hours of setpoints are applied to operation scenarios in the in-memory powerfactory
+# stand-in, once writing all setpoints and once writing only the setpoints that changed
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_benchmarks = path_nem2000d / "scripts" / "benchmarks"
+
+if str(path_benchmarks) not in sys.path:
+    sys.path.insert(0, str(path_benchmarks))
+
+import benchmark_batched_writes as bench
+
+importlib.reload(bench)
+
+from benchmark_batched_writes import powerfactory, standin_project, add_op
+
+# opf results of the stage applied to the operation scenarios
+year_dir = bench.hour_dir.parent
+
+# hours applied
+hours = list(range(1, 13))
+
+# tolerance of skipped writes
+tolerance = 1e-6
+
+
+# applies the hours to operation scenarios in a new folder
+# returns the wall time, stand-in call counts and the folder
+def time_apply_hours(app, folder_name, delta_writes):
+    target = app.GetProjectFolder("scen").CreateObject("IntFolder")
+    target.loc_name = folder_name
+    add_op.enable_delta_writes(delta_writes, tolerance)
+    powerfactory.set_latency(**bench.call_latency)
+    powerfactory.reset_call_counts()
+    ts = perf_counter()
+    add_op.add_operation_scenarios_for_isp_year(
+        app, year_dir, target=target, hours=hours, pf_data_dir=bench.pf_data_dir
+    )
+    wall_time = perf_counter() - ts
+    call_counts = powerfactory.get_call_counts()
+    powerfactory.reset_latency()
+    add_op.enable_delta_writes(False)
+    return (wall_time, call_counts, target)
+
+
+# returns the compared attributes of all elements in each operation scenario of the folder
+def get_folder_values(app, target):
+    values = {}
+    for scenario in target.GetContents("*.IntScenario"):
+        scenario.Activate()
+        values[scenario.loc_name] = bench.get_scenario_values(app)
+        scenario.Deactivate()
+    return values
+
+
+# returns the number of values differing by more than the tolerance and the values compared
+# the voltage setpoints of generators out of service are not written, so they keep the value of
+# the previous hour in delta written scenarios and are not compared
+def compare_folder_values(values_full, values_delta):
+    n_differences = 0
+    n_values = 0
+    for scenario_name, scenario_values in values_full.items():
+        for key, value in scenario_values.items():
+            (elm_name, elm_class, attribute) = key
+            if (
+                attribute == "usetp"
+                and elm_class in ["ElmSym", "ElmGenstat", "ElmPvsys"]
+                and scenario_values[(elm_name, elm_class, "outserv")] == 1
+            ):
+                continue
+            n_values += 1
+            if abs(values_delta[scenario_name][key] - value) > tolerance:
+                n_differences += 1
+    return (n_differences, n_values)
+
+
+if __name__ == "__main__":
+    app = standin_project.make_standin_application(echo=False)
+    bench.build_network(app)
+    add_op.reset_setpoint_index()
+    add_op.get_setpoint_index(app, bench.pf_data_dir)
+
+    (t_full, n_full, target_full) = time_apply_hours(app, "full", delta_writes=False)
+    (t_delta, n_delta, target_delta) = time_apply_hours(app, "delta", delta_writes=True)
+    (n_differences, n_values) = compare_folder_values(
+        get_folder_values(app, target_full), get_folder_values(app, target_delta)
+    )
+
+    for message in app.messages:
+        if "written" in str(message):
+            print(message[1])
+    print("call: \tfull -> delta")
+    for call in sorted(set(n_full.keys()) | set(n_delta.keys())):
+        print(f"{call}: \t{n_full.get(call, 0)} -> {n_delta.get(call, 0)}")
+    print(f"total calls: \t{sum(n_full.values())} -> {sum(n_delta.values())}")
+    print(
+        f"wall time: \t{round(t_full, 3)}s -> {round(t_delta, 3)}s ({len(hours)} hours)"
+    )
+    print(
+        f"scenario values differing by more than {tolerance}: \t"
+        f"{n_differences} of {n_values}"
+    )
@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+from time import perf_counter
+import importlib
+
+# a state is isolated from a network built in the in-memory powerfactory stand-in, with the
+# branches leaving the state replaced by loads from the opf results of the hour, once writing
+# directly and once with batched writes, and the isolated scenarios are compared
+# the stand-in does not run load flows, so the branch flows are read from the opf results csv,
+# and it keeps unsaved changes of operation scenarios across activations, which section
+# isolation relies on (see powerfactory.scenario_options)
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_benchmarks = path_nem2000d / "scripts" / "benchmarks"
+
+if str(path_benchmarks) not in sys.path:
+    sys.path.insert(0, str(path_benchmarks))
+
+import benchmark_batched_writes as bench
+
+importlib.reload(bench)
+
+from benchmark_batched_writes import powerfactory, standin_project, add_op
+
+import isolatesection as iso
+
+importlib.reload(iso)
+
+# state isolated
+state = "SA"
+
+# name of the operation scenario of the hour, used as the base of the isolated scenario
+base_scenario_name = "base"
+
+# replaced element name prefix, see isolatesection.core
+replacement_prefix = "temp_is_"
+
+
+# isolates the state into an operation scenario
+# returns the wall time, stand-in call counts, the kept elements and the isolated values
+# the values are read before the next isolation, which deletes the replacement loads
+def time_isolate_section(app, isolated_scenario_name, batch_writes):
+    net = app.GetProjectFolder("netdat").GetContents("*.ElmNet", 1)[0]
+    iso.enable_batched_writes(batch_writes)
+    powerfactory.set_latency(**bench.call_latency)
+    powerfactory.reset_call_counts()
+    ts = perf_counter()
+    elements_to_keep = iso.run_isolate_section_from_scenario(
+        app,
+        net,
+        iso.states[state],
+        base_scenario_name=base_scenario_name,
+        branch_flow_source_type="opf_result",
+        branch_flow_source_path=bench.hour_dir / "branch.csv",
+        isolated_scenario_name=isolated_scenario_name,
+    )
+    wall_time = perf_counter() - ts
+    call_counts = powerfactory.get_call_counts()
+    powerfactory.reset_latency()
+    if batch_writes:
+        iso.report_batched_writes(app)
+    iso.enable_batched_writes(False)
+    values = get_isolated_values(app, isolated_scenario_name)
+    return (wall_time, call_counts, elements_to_keep, values)
+
+
+# returns the service status of each network element and the demand of each replacement load
+# in the operation scenario
+def get_isolated_values(app, scenario_name):
+    iso.get_operation_scenario(app, scenario_name).Activate()
+    net = app.GetProjectFolder("netdat").GetContents("*.ElmNet", 1)[0]
+    values = {}
+    for elm in net.GetContents(1):
+        if not elm.HasAttribute("outserv") or elm.GetClassName() == "StaCubic":
+            continue
+        values[(elm.loc_name, elm.GetClassName(), "outserv")] = elm.outserv
+        if elm.loc_name.startswith(replacement_prefix):
+            values[(elm.loc_name, "ElmLod", "plini")] = elm.plini
+            values[(elm.loc_name, "ElmLod", "qlini")] = elm.qlini
+    return values
+
+
+# returns the elements that are in service in the isolated scenario, but are not kept or
+# replacement loads, and the kept elements that are out of service in the isolated scenario
+# but in service in the base scenario
+def check_isolated_values(values, base_values, elements_to_keep):
+    kept_names = {(elm.loc_name, elm.GetClassName()) for elm in elements_to_keep}
+    wrongly_on = []
+    wrongly_off = []
+    for (elm_name, elm_class, attribute), value in values.items():
+        if attribute != "outserv" or elm_name.startswith(replacement_prefix):
+            continue
+        if (elm_name, elm_class) not in kept_names:
+            if value == 0:
+                wrongly_on.append(elm_name)
+        elif value == 1 and base_values.get((elm_name, elm_class, attribute)) == 0:
+            wrongly_off.append(elm_name)
+    return (wrongly_on, wrongly_off)
+
+
+if __name__ == "__main__":
+    app = standin_project.make_standin_application(echo=False)
+    powerfactory.set_scenario_options(keep_unsaved=True)
+    bench.build_network(app)
+    add_op.reset_setpoint_index()
+    base_scenario = add_op.make_operation_scenario(app, base_scenario_name)
+    add_op.apply_setpoint_to_operation_scenario(
+        app, base_scenario, add_op.parse_setpoint_from_opf_results(app, bench.hour_dir)
+    )
+    base_values = get_isolated_values(app, base_scenario_name)
+
+    (t_direct, n_direct, _, values_direct) = time_isolate_section(
+        app, f"isolate_{state}_direct", batch_writes=False
+    )
+    (t_batched, n_batched, kept_batched, values_batched) = time_isolate_section(
+        app, f"isolate_{state}_batched", batch_writes=True
+    )
+    (wrongly_on, wrongly_off) = check_isolated_values(
+        values_batched, base_values, kept_batched
+    )
+
+    n_replacements = sum(
+        1
+        for elm_name, _, attribute in values_batched.keys()
+        if elm_name.startswith(replacement_prefix) and attribute == "outserv"
+    )
+    n_differences = sum(
+        1 for key, value in values_direct.items() if values_batched.get(key) != value
+    )
+    print(
+        f"{state}: {len(iso.states[state])} buses, {len(kept_batched)} elements kept, "
+        f"{n_replacements} branches replaced"
+    )
+    print("call: \tdirect -> batched")
+    for call in sorted(set(n_direct.keys()) | set(n_batched.keys())):
+        print(f"{call}: \t{n_direct.get(call, 0)} -> {n_batched.get(call, 0)}")
+    print(f"total calls: \t{sum(n_direct.values())} -> {sum(n_batched.values())}")
+    print(f"wall time: \t{round(t_direct, 3)}s -> {round(t_batched, 3)}s")
+    print(f"isolated values differing: \t{n_differences} of {len(values_direct)}")
+    print(f"elements in service outside {state}: \t{len(wrongly_on)} {wrongly_on[:10]}")
+    print(f"kept elements out of service: \t{len(wrongly_off)} {wrongly_off[:10]}")
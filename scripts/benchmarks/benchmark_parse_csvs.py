@@ -0,0 +1,85 @@
+import sys
+from pathlib import Path
+from time import perf_counter
+import importlib
+import powerfactory
+
+# import make_network module
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+
+import make_network as mn
+
+importlib.reload(mn)
+
+# directory of pf data csvs
+pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
+
+# number of times each parser is run
+n_repeats = 5
+
+# python interpreter used for the parallel parser workers
+# must be set when running inside PowerFactory, e.g. "C:/Python312/python.exe"
+python_executable = None
+
+
+# returns true if both parsed networks are identical, including value types
+def compare_parsed_data(a, b):
+    if type(a) != type(b):
+        return False
+    elif isinstance(a, dict):
+        return list(a.keys()) == list(b.keys()) and all(
+            compare_parsed_data(a[k], b[k]) for k in a.keys()
+        )
+    elif isinstance(a, list):
+        return len(a) == len(b) and all(
+            compare_parsed_data(x, y) for (x, y) in zip(a, b)
+        )
+    else:
+        return a == b
+
+
+# returns the minimum run time of parse_network_from_csvs and the parsed data
+# snapshots are disabled so that the csvs are parsed on every run
+def time_parser(app, **parse_options):
+    times = []
+    for _ in range(n_repeats):
+        data = {}
+        ts = perf_counter()
+        mn.parse_network_from_csvs(
+            app, data, pf_data_dir, use_snapshot=False, **parse_options
+        )
+        times.append(perf_counter() - ts)
+    return min(times), data
+
+
+if __name__ == "__main__":
+    app = powerfactory.GetApplication()
+    app.ClearOutputWindow()
+
+    (t_rows, data_rows) = time_parser(app, columnar=False)
+    (t_columns, data_columns) = time_parser(app, columnar=True)
+    (t_parallel, data_parallel) = time_parser(
+        app, columnar=True, parallel=True, python_executable=python_executable
+    )
+
+    if not compare_parsed_data(data_rows["network"], data_columns["network"]):
+        raise RuntimeError("Columnar parser does not match row parser")
+    if not compare_parsed_data(data_rows["network"], data_parallel["network"]):
+        raise RuntimeError("Parallel parser does not match row parser")
+
+    app.PrintInfo(f"row parser (parse_csv): \t\t{round(t_rows, 3)}s")
+    app.PrintInfo(f"columnar parser (parse_csv_columns): \t{round(t_columns, 3)}s")
+    app.PrintInfo(f"parallel columnar parser: \t\t{round(t_parallel, 3)}s")
+    app.PrintInfo(f"speedup (columnar): \t\t\t{round(t_rows / t_columns, 2)}x")
+    app.PrintInfo(f"speedup (parallel): \t\t\t{round(t_rows / t_parallel, 2)}x")
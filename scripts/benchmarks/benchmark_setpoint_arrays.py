@@ -0,0 +1,82 @@
+import sys
+from pathlib import Path
+from time import perf_counter
+import importlib
+
+# the setpoints of every hour of each stage are parsed from the opf results csvs hour by hour,
+# and transformed for all hours at once with stage_setpoints, and the two are compared
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+path_standin = path_src / "pf_standin"
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make, path_standin]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+sys.path.insert(0, str(path_standin))
+
+import powerfactory
+import applyscenario as add_op
+
+importlib.reload(add_op)
+
+# directory of the opf results of each stage
+year_dir = path_nem2000d / "results" / "opf" / "2050"
+
+# stages compared
+stages = ["stage_1", "stage_1_reruns", "stage_2"]
+
+
+# returns the setpoint data of each hour, parsed from the csvs, and the time taken
+def time_parse_csvs(app, hour_dirs):
+    ts = perf_counter()
+    setpoints = {
+        int(hour_dir.name): add_op.parse_setpoint_from_opf_csvs(app, hour_dir)
+        for hour_dir in hour_dirs
+    }
+    return (setpoints, perf_counter() - ts)
+
+
+# returns the setpoints of all hours transformed at once, and the time taken
+def time_transform(arrays):
+    ts = perf_counter()
+    stage_setpoints = add_op.transform_setpoints(arrays)
+    return (stage_setpoints, perf_counter() - ts)
+
+
+# returns the hours whose setpoint data differs between the csvs and the transformed setpoints
+def get_differing_hours(app, setpoints_csv, stage_setpoints):
+    differing_hours = []
+    for hour, setpoint_data in setpoints_csv.items():
+        position = add_op.get_hour_position(stage_setpoints, hour)
+        if (
+            add_op.get_hour_setpoint_data(app, stage_setpoints, position)
+            != setpoint_data
+        ):
+            differing_hours.append(hour)
+    return differing_hours
+
+
+if __name__ == "__main__":
+    app = powerfactory.GetApplication()
+    n_differing = 0
+    for stage in stages:
+        stage_dir = year_dir / stage
+        hour_dirs = add_op.get_hour_dirs(stage_dir)
+        (setpoints_csv, t_csv) = time_parse_csvs(app, hour_dirs)
+        arrays = add_op.read_opf_results(stage_dir)
+        (stage_setpoints, t_transform) = time_transform(arrays)
+        differing_hours = get_differing_hours(app, setpoints_csv, stage_setpoints)
+        n_differing += len(differing_hours)
+
+        print(f"{stage}: {len(hour_dirs)} hours")
+        print(f"parse csvs: \t{round(t_csv, 3)}s")
+        print(f"transform: \t{round(t_transform, 4)}s")
+        print(f"hours differing: \t{len(differing_hours)} {differing_hours[:10]}")
+    if n_differing != 0:
+        raise RuntimeError(f"{n_differing} hours differ from the parsed csvs")
@@ -0,0 +1,83 @@
+import sys
+from pathlib import Path
+from time import perf_counter
+import importlib
+import powerfactory
+
+# import make_network module
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+
+import make_network as mn
+
+importlib.reload(mn)
+
+# directory of pf data csvs
+pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
+
+# element classes in build order
+elm_classes = [
+    "ElmTerm",
+    "ElmStactrl",
+    "ElmLne",
+    "ElmTr2",
+    "ElmLod",
+    "ElmShnt",
+    "ElmSym",
+    "ElmGenstat",
+    "ElmPvsys",
+    "ElmSvs",
+]
+
+
+# builds the network elements and returns the wall time of each class
+# if cache is False, transfer attributes are defined for every element and type
+def time_build(app, cache):
+    data = {}
+    mn.prepare_project(app, data, "nem")
+    mn.parse_network_from_csvs(app, data, pf_data_dir)
+    mn.get_nem_dynamic_models(app, data)
+    mn.get_WECC_dynamic_models(app, data)
+    mn.make_nem_areas(app, data)
+
+    mn.reset_transfer_attributes()
+    mn.transfer_attributes["cache"] = cache
+    times = {}
+    for elm_class in elm_classes:
+        ts = perf_counter()
+        getattr(mn, f"make_all_{elm_class}")(app, data)
+        times[elm_class] = perf_counter() - ts
+    mn.transfer_attributes["cache"] = True
+    n_defined = dict(mn.transfer_attributes["n_defined"])
+    return times, n_defined
+
+
+if __name__ == "__main__":
+    app = powerfactory.GetApplication()
+    app.ClearOutputWindow()
+
+    (t_uncached, n_uncached) = time_build(app, cache=False)
+    (t_cached, n_cached) = time_build(app, cache=True)
+
+    app.PrintInfo(
+        "class: \tdefine calls (before -> after) \twall time (before -> after)"
+    )
+    for elm_class in sorted(n_uncached.keys()):
+        app.PrintInfo(
+            f"{elm_class}: \t{n_uncached[elm_class]} -> {n_cached.get(elm_class, 0)}"
+        )
+    for elm_class in elm_classes:
+        app.PrintInfo(
+            f"{elm_class}: \t\t{round(t_uncached[elm_class], 3)}s -> "
+            + f"{round(t_cached[elm_class], 3)}s"
+        )
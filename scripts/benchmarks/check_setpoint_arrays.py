@@ -0,0 +1,235 @@
+import sys
+import csv
+import math
+import shutil
+import tempfile
+from pathlib import Path
+import importlib
+
+# the setpoints of the hours of a small fixture stage are parsed with the original dict parsers
+# below, and compared to the setpoints parsed from the csvs with the parse_*_rows functions,
+# transformed for all hours at once with stage_setpoints, and read from a packed opf results
+# archive. the fixture hours cover generator status from alpha_g and from outserv, shunt status
+# from shunt_bigM and from outserv, a missing shunt results file and tap ratios close to their
+# limits of 0.9 and 1.1
+# benchmark_setpoint_arrays.py times and compares the same paths on the full opf results
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+path_standin = path_src / "pf_standin"
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make, path_standin]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+sys.path.insert(0, str(path_standin))
+
+import powerfactory
+import applyscenario as add_op
+
+importlib.reload(add_op)
+
+# fixture stage, one directory of opf results csvs per hour
+fixture_stage_dir = path_nem2000d / "scripts" / "benchmarks" / "fixtures" / "opf_stage"
+
+
+###################################################################################
+# ORIGINAL PARSERS
+# the results csv parsers of applyscenario.py before the parse_*_rows functions, kept unchanged
+# as the reference
+
+
+def header_indexes(header):
+    return {val: ind for ind, val in enumerate(header)}
+
+
+def parse_gens(app, gen_results_path, baseMVA=100):
+    gens = {}
+    with open(gen_results_path, "r") as f:
+        reader = csv.reader(f)
+        idx_of = header_indexes(next(reader))
+        if "alpha_g" in idx_of.keys():
+            for row in reader:
+                if math.isclose(float(row[idx_of["alpha_g"]]), 0.0, abs_tol=1e-5):
+                    gens[row[idx_of["ind"]]] = {
+                        "pgini": 0,
+                        "qgini": 0,
+                        "outserv": 1,
+                    }
+                else:
+                    gens[row[idx_of["ind"]]] = {
+                        "pgini": float(row[idx_of["pg"]]) * baseMVA,
+                        "qgini": float(row[idx_of["qg"]]) * baseMVA,
+                        "outserv": 0,
+                    }
+        elif "outserv" in idx_of.keys():
+            for row in reader:
+                gens[row[idx_of["ind"]]] = {
+                    "pgini": float(row[idx_of["pg"]]) * baseMVA,
+                    "qgini": float(row[idx_of["qg"]]) * baseMVA,
+                    "outserv": int(row[idx_of["outserv"]]),
+                }
+        else:
+            raise ValueError("No gen status found in gen results file")
+
+    return gens
+
+
+def parse_convs(app, conv_results_path, baseMVA=100):
+    convs = {}
+    with open(conv_results_path, "r") as f:
+        reader = csv.reader(f)
+        idx_of = header_indexes(next(reader))
+        for row in reader:
+            convs[row[idx_of["ind"]]] = {
+                "pgini": -float(row[idx_of["pgrid"]]) * baseMVA,
+                "qgini": -float(row[idx_of["qgrid"]]) * baseMVA,
+                "outserv": 0,
+            }
+    return convs
+
+
+def parse_loads(app, load_results_path, baseMVA=100):
+    loads = {}
+    with open(load_results_path, "r") as f:
+        reader = csv.reader(f)
+        idx_of = header_indexes(next(reader))
+        for row in reader:
+            loads[row[idx_of["ind"]]] = {
+                "plini": float(row[idx_of["pd"]]) * baseMVA,
+                "qlini": float(row[idx_of["qd"]]) * baseMVA,
+                "outserv": 0 if row[idx_of["status"]] == "1" else 1,
+            }
+    return loads
+
+
+def parse_buses(app, bus_results_path):
+    buses = {}
+    with open(bus_results_path, "r") as f:
+        reader = csv.reader(f)
+        idx_of = header_indexes(next(reader))
+        for row in reader:
+            buses[row[idx_of["ind"]]] = {
+                "vm": float(row[idx_of["vm"]]),
+                "va": float(row[idx_of["va"]]),
+            }
+    return buses
+
+
+def parse_branches(app, branch_results_path):
+    branches = {}
+    with open(branch_results_path, "r") as f:
+        reader = csv.reader(f)
+        idx_of = header_indexes(next(reader))
+        for row in reader:
+            tm = float(row[idx_of["tm"]])
+            if math.isclose(tm, 0.9, abs_tol=1e-5):
+                tm = 0.9
+            elif math.isclose(tm, 1.1, abs_tol=1e-5):
+                tm = 1.1
+            branches[row[idx_of["ind"]]] = {
+                "tm": tm,
+                "tap_percentage": 100 * (tm - 1),
+            }
+    return branches
+
+
+def parse_shunts(app, shunt_results_path):
+    shunts = {}
+    with open(shunt_results_path, "r") as f:
+        reader = csv.reader(f)
+        idx_of = header_indexes(next(reader))
+        if "shunt_bigM" in idx_of.keys():
+            for row in reader:
+                shunt_bigM = float(row[idx_of["shunt_bigM"]])
+                if math.isclose(shunt_bigM, 0.0, abs_tol=1e-5):
+                    shunts[row[idx_of["ind"]]] = {"outserv": 1}
+                else:
+                    shunts[row[idx_of["ind"]]] = {"outserv": 0}
+        elif "outserv" in idx_of.keys():
+            for row in reader:
+                shunts[row[idx_of["ind"]]] = {"outserv": int(row[idx_of["outserv"]])}
+        else:
+            raise ValueError("No shunt status found in shunt results file")
+    return shunts
+
+
+def parse_setpoint_from_opf_results(app, opf_results_dir):
+    setpoint_data = {}
+    setpoint_data["gen"] = parse_gens(app, opf_results_dir / "gen.csv")
+    setpoint_data["convdc"] = parse_convs(app, opf_results_dir / "convdc.csv")
+    setpoint_data["load"] = parse_loads(app, opf_results_dir / "load.csv")
+    setpoint_data["bus"] = parse_buses(app, opf_results_dir / "bus.csv")
+    setpoint_data["branch"] = parse_branches(app, opf_results_dir / "branch.csv")
+    try:
+        setpoint_data["shunt"] = parse_shunts(app, opf_results_dir / "shunt.csv")
+    except FileNotFoundError:
+        app.PrintInfo("No shunt results found")
+        setpoint_data["shunt"] = {}
+    return setpoint_data
+
+
+###################################################################################
+# CHECK
+
+
+# returns the setpoint data of each hour of the stage, parsed by each path
+def parse_stage(app, stage_dir):
+    hour_dirs = add_op.get_hour_dirs(stage_dir)
+    stage_setpoints = add_op.transform_setpoints(add_op.read_opf_results(stage_dir))
+    add_op.pack_opf_results(stage_dir)
+    if add_op.get_stage_setpoints(stage_dir) is None:
+        raise RuntimeError(f"Opf results archive of {stage_dir} not used")
+
+    parsed = {}
+    for hour_dir in hour_dirs:
+        hour = int(hour_dir.name)
+        parsed[hour] = {
+            "original": parse_setpoint_from_opf_results(app, hour_dir),
+            "parse rows": add_op.parse_setpoint_from_opf_csvs(app, hour_dir),
+            "transform": add_op.get_hour_setpoint_data(
+                app, stage_setpoints, add_op.get_hour_position(stage_setpoints, hour)
+            ),
+            "archive": add_op.parse_setpoint_from_opf_results(app, hour_dir),
+        }
+    return parsed
+
+
+# returns the (hour, path, component) of the setpoints differing from the original parsers
+def get_differences(parsed):
+    differences = []
+    for hour, setpoints in parsed.items():
+        for path, setpoint_data in setpoints.items():
+            for component, elms in setpoints["original"].items():
+                if setpoint_data.get(component) != elms:
+                    differences.append((hour, path, component))
+    return differences
+
+
+if __name__ == "__main__":
+    app = powerfactory.reset_application(echo=False)
+    # the fixture stage is copied, so that its archive is not written to the fixtures
+    with tempfile.TemporaryDirectory() as temp_dir:
+        stage_dir = Path(temp_dir) / "opf_stage"
+        shutil.copytree(fixture_stage_dir, stage_dir)
+        parsed = parse_stage(app, stage_dir)
+    differences = get_differences(parsed)
+
+    for hour, setpoints in parsed.items():
+        original = setpoints["original"]
+        print(
+            f"hour {hour}: gens out of service "
+            f"{[ind for ind, gen in original['gen'].items() if gen['outserv'] == 1]}, "
+            f"shunts out of service "
+            f"{[ind for ind, shunt in original['shunt'].items() if shunt['outserv'] == 1]}, "
+            f"tm {[branch['tm'] for branch in original['branch'].values()]}"
+        )
+    print(f"setpoints differing from the original parsers: \t{differences}")
+    if len(differences) != 0:
+        raise RuntimeError(
+            f"{len(differences)} setpoints differ from the original parsers"
+        )
@@ -0,0 +1,111 @@
+import csv
+import json
+from pathlib import Path
+
+# Synthetic networks for benchmarking the network build
+# A network at scale n is n copies of the SNEM2000d pf data, written with the same csv schemas.
+# Copy 0 keeps the original names, and copy i appends _x{i} to the names of all elements,
+# including the names referenced by con_* columns, so each copy is a complete island.
+# PowerModels indexes are offset per copy and copies are placed side by side in the diagram.
+
+
+# returns the name of element_name in copy i
+def copy_name(element_name, i):
+    if i == 0 or element_name in ["", "NA"]:
+        return element_name
+    return f"{element_name}_x{i}"
+
+
+# renames the elements referenced by a con_* entry
+# entries are a name, name.Class, or a comma separated list of either
+def copy_connection(entry, i):
+    names = []
+    for full_name in entry.split(", "):
+        if "." in full_name:
+            (name, elm_class) = full_name.rsplit(".", 1)
+            names.append(f"{copy_name(name, i)}.{elm_class}")
+        else:
+            names.append(copy_name(full_name, i))
+    return ", ".join(names)
+
+
+def offset_coordinates(entry, offset):
+    return str([x + offset for x in json.loads(entry)])
+
+
+# returns the value of column in copy i of a row
+def copy_value(column, value, i, index_offset, x_offset):
+    if i == 0 or value in ["", "NA"]:
+        return value
+    if column == "elm_loc_name":
+        return copy_name(value, i)
+    elif column.startswith("con_"):
+        return copy_connection(value, i)
+    elif column == "msc_powermodels_index" and value.isdigit():
+        return str(int(value) + i * index_offset)
+    elif column == "grf_rCenterX":
+        return str(float(value) + i * x_offset)
+    elif column in ["gco_rX", "gco_1_rX", "gco_2_rX"]:
+        return offset_coordinates(value, i * x_offset)
+    return value
+
+
+def read_csv_rows(file_path):
+    with open(file_path, newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        rows = list(reader)
+    return (header, rows)
+
+
+# returns the offset of the PowerModels indexes between copies of a csv
+def get_index_offset(header, rows):
+    if "msc_powermodels_index" not in header:
+        return 0
+    idx = header.index("msc_powermodels_index")
+    return max(int(row[idx]) for row in rows if row[idx].isdigit())
+
+
+# returns the width of the diagram, used to place copies side by side
+def get_diagram_width(data_dir, prefix="pf_data_"):
+    (header, rows) = read_csv_rows(Path(data_dir) / f"{prefix}ElmTerm.csv")
+    idx = header.index("grf_rCenterX")
+    x = [float(row[idx]) for row in rows]
+    return max(x) - min(x) + 1000
+
+
+def write_scaled_csv(file_path, target_path, scale, x_offset):
+    (header, rows) = read_csv_rows(file_path)
+    index_offset = get_index_offset(header, rows)
+    with open(target_path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for i in range(scale):
+            for row in rows:
+                writer.writerow(
+                    [
+                        copy_value(column, value, i, index_offset, x_offset)
+                        for (column, value) in zip(header, row)
+                    ]
+                )
+    return len(rows) * scale
+
+
+# writes the pf data and dsl csvs of a network at scale copies of data_dir to target_dir
+# returns the number of rows written for each csv
+def make_synthetic_network(data_dir, target_dir, scale, prefix="pf_data_"):
+    data_dir = Path(data_dir)
+    target_dir = Path(target_dir)
+    (target_dir / "dsl_csvs").mkdir(parents=True, exist_ok=True)
+    x_offset = get_diagram_width(data_dir, prefix)
+
+    n_rows = {}
+    for file_path in sorted(data_dir.glob(f"{prefix}*.csv")):
+        n_rows[file_path.stem] = write_scaled_csv(
+            file_path, target_dir / file_path.name, scale, x_offset
+        )
+    for file_path in sorted((data_dir / "dsl_csvs").glob(f"{prefix}*.csv")):
+        n_rows[file_path.stem] = write_scaled_csv(
+            file_path, target_dir / "dsl_csvs" / file_path.name, scale, x_offset
+        )
+    return n_rows
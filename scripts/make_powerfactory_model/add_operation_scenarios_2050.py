@@ -9,13 +9,16 @@ import powerfactory
 
 # import applyscenario module
 path_nem2000d = Path(__file__).resolve().parents[2]
-path_mod = path_nem2000d / "src" / "make_powerfactory_model"
+path_src = path_nem2000d / "src"
+path_mod = path_src / "make_powerfactory_model"
 
-# Remove any existing instances of path_mod from sys.path
-if str(path_mod) in sys.path:
-    sys.path.remove(str(path_mod))
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_mod]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
 
-# Add the correct path to sys.path
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
 sys.path.insert(0, str(path_mod))
 
 import applyscenario as add_op
@@ -32,9 +35,26 @@ baseMVA = 100
 # setpoints directory
 setpoints_dir = path_nem2000d / "results" / "opf" / "2050" / "stage_2"
 
+# directory of the pf data csvs the network was built from, used to index the elements by
+# PowerModels index. set to None to read the indexes from the element descriptions
+pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
+
+# hours of operation scenarios made, None for all solved hours
+# hours can be selected from the manifest of the setpoints directory, e.g. the solved hours with
+# [hour for hour in add_op.get_solved_hours(setpoints_dir) if hour <= 24]
+hours = None
+
 # skip existing scenarios
 skip_existing = True
 
+# queue setpoint writes and flush them with SetAttributes before each scenario is saved
+batch_writes = False
+
+# copy each operation scenario from the previous hour and write only the setpoints that changed
+# by more than delta_tolerance
+delta_writes = False
+delta_tolerance = 1e-6
+
 # ----------------------------------------------------------------
 # MAIN
 # ----------------------------------------------------------------
@@ -59,9 +79,16 @@ if __name__ == "__main__":
         year_folder.loc_name = str(year) + "_base"
 
     # add operation scenarios
+    add_op.enable_batched_writes(batch_writes)
+    add_op.enable_delta_writes(delta_writes, delta_tolerance)
     add_op.add_operation_scenarios_for_isp_year(
         app,
         setpoints_dir,
         target=year_folder,
-        # hours=["1"],
+        pf_data_dir=pf_data_dir,
+        hours=hours,
     )
+    if batch_writes:
+        add_op.report_batched_writes(app)
+        add_op.enable_batched_writes(False)
+    add_op.enable_delta_writes(False)
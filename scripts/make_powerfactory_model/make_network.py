@@ -34,19 +34,88 @@ importlib.reload(iso)
 # directory of pf data csvs
 pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
 
-# make network
-if __name__ == "__main__":
-    app = powerfactory.GetApplication()
-    app.ClearOutputWindow()
-    data = {}
+# only apply changes to the pf data csvs since the last build to the existing network
+# requires a previous full build, which writes the build manifest
+incremental = False
+
+# build the network by writing all objects to a DGS file and importing it in one command
+# the DGS file is written next to the build manifest and can be checked offline with validate_dgs.py
+dgs_import = False
+
+# make one equipment type per distinct type parameter block, shared by all elements using it
+# a report mapping elements to shared types is written next to the build manifest
+shared_types = False
+
+# make the WECC wind and pv plants and the synchronous machines with controls by copying one
+# composite model template per frame and set of dsl models, then patching the dsl parameters of
+# each plant in bulk
+template_composite_models = False
+
+# build the network without making or opening the network diagram, for study-only builds
+# the grf and gco data is cached next to the build manifest, so the diagram can be made later
+# with make_network_diagram.py
+headless = False
+
+# lay out the network diagram from a bus coordinates csv (name, x, y) instead of the grf and gco
+# data in the pf data csvs, e.g. path_nem2000d / "data" / "bus_xy" / "bus_xy_v01.csv"
+# set to None to use the pf data csvs
+bus_xy_path = None
+
+
+# reads the network data and lays out the diagram from bus_xy_path if it is set
+def read_network_data(app, data):
+    mn.parse_network_from_csvs(app, data, pf_data_dir)
+    if bus_xy_path is not None:
+        mn.apply_schematic_layout(app, data, bus_xy_path)
+
+
+# makes the network diagram, replacing a partially made diagram from a failed build
+def make_diagram(app, data):
+    mn.remake_network_diagram(app, data, "nem_diagram", page_size=(31233, 62348))
+
+
+# writes the time and PowerFactory calls of each build stage next to the build manifest
+def save_build_stats(app):
+    for suffix in [".json", ".csv"]:
+        mn.write_build_stats(app, mn.get_build_stats_path(app, pf_data_dir, suffix))
+
+
+# stages of the full build, in order
+# a checkpoint is written after each stage, so a failed build resumes at the failed stage
+build_stages = {
+    "areas": mn.make_nem_areas,
+    "ElmTerm": mn.make_all_ElmTerm,
+    "ElmStactrl": mn.make_all_ElmStactrl,
+    "ElmLne": mn.make_all_ElmLne,
+    "ElmTr2": mn.make_all_ElmTr2,
+    "ElmLod": mn.make_all_ElmLod,
+    "ElmShnt": mn.make_all_ElmShnt,
+    "ElmSym": mn.make_all_ElmSym,
+    "ElmGenstat": mn.make_all_ElmGenstat,
+    "ElmPvsys": mn.make_all_ElmPvsys,
+    "ElmSvs": mn.make_all_ElmSvs,
+    "diagram": make_diagram,
+}
+
+
+# full build: clears the project and makes all elements
+# if a previous build failed, the project is not cleared and the build resumes from its checkpoint
+def build_network(app, data):
+    checkpoint_path = mn.get_checkpoint_path(app, pf_data_dir)
+    checkpoint = mn.read_build_checkpoint(app, checkpoint_path)
 
     # clear project, create network, study case and diagram, configure settings
     app.PrintInfo("Started building network")
-
-    mn.prepare_project(app, data, "nem")
+    if checkpoint is None:
+        mn.prepare_project(app, data, "nem")
+    else:
+        mn.prepare_project_incremental(app, data, "nem")
 
     # read network data
-    mn.parse_network_from_csvs(app, data, pf_data_dir)
+    read_network_data(app, data)
+
+    # fingerprint network data for later incremental builds
+    build_manifest = mn.make_build_manifest(data)
 
     # for k, v in data["network"]["ElmGenstat"]["gen_4008_1"]["dsl"].items():
     #     pr(f"{k}: {v}")
@@ -57,23 +126,105 @@ if __name__ == "__main__":
     # get WECC dynamic models
     mn.get_WECC_dynamic_models(app, data)
 
-    # make areas
-    mn.make_nem_areas(app, data)
-
-    # make network
-    mn.make_all_ElmTerm(app, data)
-    mn.make_all_ElmStactrl(app, data)
-    mn.make_all_ElmLne(app, data)
-    mn.make_all_ElmTr2(app, data)
-    mn.make_all_ElmLod(app, data)
-    mn.make_all_ElmShnt(app, data)
-    mn.make_all_ElmSym(app, data)
-    mn.make_all_ElmGenstat(app, data)
-    mn.make_all_ElmPvsys(app, data)
-    mn.make_all_ElmSvs(app, data)
-
-    # make network diagram
-    mn.make_network_diagram(app, data, "nem_diagram", page_size=(31233, 62348))
+    # make areas, network and network diagram
+    # transfer attributes are defined once per attribute signature of each class
+    mn.reset_build_stats()
+    mn.reset_transfer_attributes()
+    mn.reset_shared_types(enabled=shared_types)
+    mn.reset_composite_templates(enabled=template_composite_models)
+    if headless:
+        stages = {k: v for k, v in build_stages.items() if k != "diagram"}
+        mn.write_diagram_cache(app, data, mn.get_diagram_cache_path(app, pf_data_dir))
+    else:
+        stages = build_stages
+    mn.run_build_stages(app, data, stages, checkpoint, checkpoint_path)
+    mn.report_transfer_attributes(app)
+    mn.report_composite_templates(app)
+    save_build_stats(app)
+    if shared_types:
+        mn.write_shared_types_report(
+            app, mn.get_shared_types_report_path(app, pf_data_dir)
+        )
+
+    # record build for later incremental builds
+    mn.write_build_manifest(app, build_manifest, mn.get_manifest_path(app, pf_data_dir))
+    mn.clear_build_checkpoint(app, checkpoint_path)
+
+
+# DGS build: the network is written to a DGS file and imported, then linked to the dynamic models
+def build_network_dgs(app, data):
+    app.PrintInfo("Started building network from DGS import")
+
+    mn.prepare_project_for_dgs_import(app, data)
+
+    # read network data
+    read_network_data(app, data)
+
+    # fingerprint network data for later incremental builds
+    build_manifest = mn.make_build_manifest(data)
+
+    # get dynamic models
+    mn.get_nem_dynamic_models(app, data)
+    mn.get_WECC_dynamic_models(app, data)
+
+    # write and import DGS file
+    dgs_path = mn.get_dgs_path(app, pf_data_dir)
+    mn.reset_shared_types(enabled=shared_types)
+    mn.write_network_dgs(app, data, dgs_path, "nem", diagram=not headless)
+    mn.import_dgs_file(app, dgs_path)
+    if shared_types:
+        mn.write_shared_types_report(
+            app, mn.get_shared_types_report_path(app, pf_data_dir)
+        )
+
+    # set composite model frames, dsl model types and dsl parameters
+    mn.link_dgs_objects(app, data, "nem")
+
+    # set page size and open the network diagram
+    if headless:
+        mn.write_diagram_cache(app, data, mn.get_diagram_cache_path(app, pf_data_dir))
+    else:
+        mn.configure_dgs_diagram(app, data, "nem_diagram", page_size=(31233, 62348))
+
+    # record build for later incremental builds
+    mn.write_build_manifest(app, build_manifest, mn.get_manifest_path(app, pf_data_dir))
+
+
+# incremental build: only changes since the last build are applied to the existing network
+def build_network_incremental(app, data):
+    app.PrintInfo("Started incremental network build")
+
+    mn.prepare_project_incremental(app, data, "nem")
+
+    # read network data
+    read_network_data(app, data)
+
+    # get dynamic models
+    mn.get_nem_dynamic_models(app, data)
+    mn.get_WECC_dynamic_models(app, data)
+
+    # create, update and delete changed elements
+    mn.reset_build_stats()
+    mn.reset_shared_types(enabled=shared_types)
+    mn.reset_composite_templates(enabled=template_composite_models)
+    mn.build_network_incrementally(app, data, mn.get_manifest_path(app, pf_data_dir))
+    if headless:
+        mn.write_diagram_cache(app, data, mn.get_diagram_cache_path(app, pf_data_dir))
+    save_build_stats(app)
+
+
+# make network
+if __name__ == "__main__":
+    app = powerfactory.GetApplication()
+    app.ClearOutputWindow()
+    data = {}
+
+    if incremental:
+        build_network_incremental(app, data)
+    elif dgs_import:
+        build_network_dgs(app, data)
+    else:
+        build_network(app, data)
 
     # # compare load flow
     # iso.compare_bus_voltages(
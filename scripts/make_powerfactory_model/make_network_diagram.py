@@ -0,0 +1,63 @@
+import sys
+from pathlib import Path
+import importlib
+import powerfactory
+
+# import make_network module
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+
+import make_network as mn
+
+importlib.reload(mn)
+
+# makes the network diagram of a network built with headless = True in make_network.py
+# the diagram is made from the grf and gco data cached by the headless build, so the pf data
+# csvs are not read. any existing diagram is replaced
+# if bus_xy_path is set, the diagram of an existing network is instead laid out from the bus
+# coordinates csv, e.g. to switch between the layouts in data/bus_xy
+
+# directory of pf data csvs, the diagram cache is stored in its .build_manifests folder
+pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
+
+# open the diagram once it is made. set to False when running without a GUI
+show = True
+
+# bus coordinates csv (name, x, y) to lay out the diagram from, e.g.
+# path_nem2000d / "data" / "bus_xy" / "bus_xy_v01.csv". set to None to use the diagram cache
+bus_xy_path = None
+
+
+if __name__ == "__main__":
+    app = powerfactory.GetApplication()
+    app.ClearOutputWindow()
+    data = {}
+
+    mn.prepare_project_incremental(app, data, "nem")
+    mn.reset_build_stats()
+    mn.reset_transfer_attributes()
+    if bus_xy_path is None:
+        mn.make_deferred_network_diagram(
+            app,
+            data,
+            mn.get_diagram_cache_path(app, pf_data_dir),
+            "nem_diagram",
+            page_size=(31233, 62348),
+            show=show,
+        )
+    else:
+        mn.parse_network_from_csvs(app, data, pf_data_dir)
+        mn.apply_schematic_layout(app, data, bus_xy_path)
+        mn.remake_network_diagram(
+            app, data, "nem_diagram", page_size=(31233, 62348), show=show
+        )
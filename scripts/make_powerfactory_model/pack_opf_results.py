@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+from time import perf_counter
+import importlib
+
+# import opf_archive module
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_mod = path_nem2000d / "src" / "make_powerfactory_model"
+
+# Remove any existing instances of the path from sys.path
+if str(path_mod) in sys.path:
+    sys.path.remove(str(path_mod))
+
+# Add the correct path to sys.path
+sys.path.insert(0, str(path_mod))
+
+import opf_archive
+
+importlib.reload(opf_archive)
+
+
+# ----------------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------------
+# directory of the opf results of each stage
+year_dir = path_nem2000d / "results" / "opf" / "2050"
+
+# stages packed, each into <stage>_opf_archive.npz in year_dir
+stages = ["stage_1", "stage_1_reruns", "stage_2"]
+
+# ----------------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------------
+
+
+if __name__ == "__main__":
+    for stage in stages:
+        ts = perf_counter()
+        archive_path = opf_archive.pack_opf_results(year_dir / stage)
+        print(f"{stage} packed to {archive_path.name} in {round(perf_counter() - ts, 2)}s")
@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+import importlib
+import powerfactory
+
+# import make_network module
+path_nem2000d = Path(__file__).resolve().parents[2]
+path_src = path_nem2000d / "src"
+path_make = path_src / "make_powerfactory_model"
+
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_make]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
+
+# Add the correct paths to sys.path
+sys.path.insert(0, str(path_src))
+sys.path.insert(0, str(path_make))
+
+import make_network as mn
+
+importlib.reload(mn)
+
+# directory of pf data csvs
+pf_data_dir = path_nem2000d / "data" / "SNEM2000d_pf_data"
+
+# DGS file to validate
+# if None, a DGS file is made from the csvs first (no powerfactory project is used)
+dgs_path = None
+
+
+# checks a DGS file against the pf data csvs
+if __name__ == "__main__":
+    app = powerfactory.GetApplication()
+    app.ClearOutputWindow()
+
+    if dgs_path is None:
+        data = {}
+        mn.parse_network_from_csvs(app, data, pf_data_dir, use_snapshot=False)
+        dgs_path = pf_data_dir / ".build_manifests" / "validate.dgs"
+        mn.write_network_dgs(app, data, dgs_path, "nem")
+
+    errors = mn.validate_dgs_file(app, dgs_path, pf_data_dir)
+    if len(errors) != 0:
+        raise RuntimeError(f"{len(errors)} differences between DGS file and csvs")
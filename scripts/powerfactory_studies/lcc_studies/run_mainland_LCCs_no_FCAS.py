@@ -69,13 +69,15 @@ mainland_unstable_scenarios_stage_1 = [
 unstable_scenarios = [46, 47, 54, 55, 61, 101, 102, 110, 111, 142]
 
 
+# turns off the TAS area in the active operation scenario
+# writes are flushed before returning, so the scenario can be saved or a load flow run
 def turn_off_tasmania(app):
     area_folder = app.GetDataFolder("ElmArea")
     tas_area = area_folder.GetContents("TAS.ElmArea")[0]
 
     # buses
     for bus in tas_area.GetBuses():
-        bus.SetAttribute("outserv", 1)
+        pf.set_attribute(bus, "outserv", 1)
 
     # generators
     for gen in (
@@ -83,19 +85,22 @@ def turn_off_tasmania(app):
         + tas_area.GetObjs("ElmGenstat")
         + tas_area.GetObjs("ElmPvsys")
     ):
-        gen.SetAttribute("outserv", 1)
+        pf.set_attribute(gen, "outserv", 1)
 
         # turn off dynamic models if they exist
         comp_model = gen.GetAttribute("c_pmod")
         if comp_model is not None:
-            comp_model.SetAttribute("outserv", 1)
+            pf.set_attribute(comp_model, "outserv", 1)
             for dsl in comp_model.GetContents():
-                dsl.SetAttribute("outserv", 1)
+                pf.set_attribute(dsl, "outserv", 1)
 
         # turn off station controllers if they exist
         stac = gen.GetAttribute("c_pstac")
         if stac is not None:
-            stac.SetAttribute("outserv", 1)
+            pf.set_attribute(stac, "outserv", 1)
+
+    # write queued attributes
+    pf.flush_writes(app)
 
 
 def remake_operation_scenarios(app):
@@ -2,23 +2,24 @@ import sys
 import os
 from pathlib import Path
 
-
 # import export load flow module
 path_nem20000d = Path(__file__).resolve().parents[3]
-path_mod = path_nem20000d / "src" / "load_flow_verification"
+path_src = path_nem20000d / "src"
+path_mod = path_src / "load_flow_verification"
 
-# Remove any existing instances of path_mod from sys.path
-if str(path_mod) in sys.path:
-    sys.path.remove(str(path_mod))
+# Remove any existing instances of the paths from sys.path
+for path in [path_src, path_mod]:
+    if str(path) in sys.path:
+        sys.path.remove(str(path))
 
-# Add the correct path to sys.path
+# Add the correct paths to sys.path, pf_utils is imported from src
+sys.path.insert(0, str(path_src))
 sys.path.insert(0, str(path_mod))
 
 # import export load flow module
 import export_ldf_results as ldf
 import powerfactory
 
-
 skip_existing = True
 output_dir = path_nem20000d / "results" / "load_flow_verification"
 
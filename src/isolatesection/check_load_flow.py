@@ -130,14 +130,16 @@ def compare_bus_voltages(
     elif base_scenario_name is not None:
         # save isolated scenario
         isolated_scenario = app.GetActiveScenario()
-        # activate base scenario
+        # activate base scenario, queued writes belong to the isolated scenario
         base_scenario = get_operation_scenario(app, base_scenario_name)
+        flush_writes(app)
         base_scenario.Activate()
         # get bus results
         bus_ldf_results = parse_bus_results_from_powerfactory(
             app, get_selected_buses(app, selected_bus_names)
         )
         # activate isolated scenario
+        flush_writes(app)
         isolated_scenario.Activate()
     elif external_data_type == "pf_data":
         bus_ldf_results = parse_bus_results_from_pf_data_csv(
@@ -180,12 +182,14 @@ def compare_gen_dispatch(
     elif base_scenario_name is not None:
         # save isolated scenario
         isolated_scenario = app.GetActiveScenario()
-        # activate base scenario
+        # activate base scenario, queued writes belong to the isolated scenario
         base_scenario = get_operation_scenario(app, base_scenario_name)
+        flush_writes(app)
         base_scenario.Activate()
         # get gen dispatch results
         gen_ldf_results = parse_gen_dispatch_from_powerfactory(app, selected_gens)
         # activate isolated scenario
+        flush_writes(app)
         isolated_scenario.Activate()
     elif external_data_type == "pf_data":
         gen_ldf_results = parse_gen_dispatch_from_pf_data_csv(
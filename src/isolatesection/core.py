@@ -1,3 +1,11 @@
+import importlib
+
+from pf_utils import write_batch
+
+importlib.reload(write_batch)
+
+from pf_utils.write_batch import *
+
 ###################################################################################
 # MISCELLANEOUS
 
@@ -8,6 +16,7 @@ def header_indexer(header):
 
 # deactivates the current operation scenario
 def deactivate_operation_scenario(app):
+    flush_writes(app)
     scenario = app.GetActiveScenario()
     if scenario is not None:
         scenario.Deactivate()
@@ -32,18 +41,19 @@ def clean(app, net):
 def turn_off_elms(app, elms):
     for elm in elms:
         if elm.HasAttribute("outserv"):
-            elm.outserv = 1
+            set_attribute(elm, "outserv", 1)
 
 
 # turns on all elements provided in the list
 def turn_on_elms(app, elms):
     for elm in elms:
         if elm.HasAttribute("outserv"):
-            elm.outserv = 0
+            set_attribute(elm, "outserv", 0)
 
 
 # executes a load flow and raises exception if it fails
 def run_load_flow(app):
+    flush_writes(app)
     comldf = app.GetFromStudyCase("ComLdf")
     if comldf.Execute() != 0:
         raise RuntimeError("Load flow failed")
@@ -141,6 +151,9 @@ def get_operation_scenario(app, operation_scenario_name):
 
 # makes an operation scenario
 def make_operation_scenario(app, operation_scenario_name):
+    # queued writes belong to the previously active scenario
+    flush_writes(app)
+
     # get study case
     operation_scenarios_folder = app.GetProjectFolder("scen")
 
@@ -351,6 +364,8 @@ def fix_boundary_conditions(app, net, elements_to_replace, bus_voltages):
 def copy_setpoint_from_base_scenario(
     app, elements_to_copy, base_scenario, operation_scenario
 ):
+    # writes queued for the operation scenario must be flushed before switching scenarios
+    flush_writes(app)
     base_scenario.Activate()
     vars_to_copy = {
         "ElmSym": ["e:pgini", "e:qgini", "e:usetp"],
@@ -384,4 +399,4 @@ def copy_setpoint_from_base_scenario(
     operation_scenario.Activate()
     for elm, data in data_to_copy.items():
         for var, val in data.items():
-            elm.SetAttribute(var, val)
+            set_attribute(elm, var, val)
@@ -4,10 +4,13 @@ import powerfactory
 import importlib
 
 from . import core
+from pf_utils import read_batch
 
 importlib.reload(core)
+importlib.reload(read_batch)
 
 from .core import *
+from pf_utils.read_batch import *
 
 ###################################################################################
 # GET BRANCH FLOWS
@@ -206,11 +209,10 @@ def parse_bus_results_from_powerfactory(app, selected_buses):
     app.PrintInfo("Getting bus results from powerfactory")
     run_load_flow(app)
     bus_results = {}
-    for bus in selected_buses:
-        bus_results[bus.loc_name] = {
-            "u": bus.GetAttribute("m:u"),
-            "phi": bus.GetAttribute("m:phiu"),
-        }
+    for row in read_attribute_rows(
+        app, selected_buses, ["loc_name", "m:u", "m:phiu"], "ElmTerm"
+    ):
+        bus_results[row[0]] = {"u": row[1], "phi": row[2]}
     return bus_results
 
 
@@ -253,9 +255,8 @@ def parse_gen_dispatch_from_pf_data_csv(
 # executes a load flow and makes the generation dispatch dictionary
 def parse_gen_dispatch_from_powerfactory(app, selected_gens):
     gen_dispatch = {}
-    for gen in selected_gens:
-        gen_dispatch[gen.loc_name] = {
-            "pg": gen.GetAttribute("m:P:bus1"),
-            "qg": gen.GetAttribute("m:Q:bus1"),
-        }
+    for row in read_attribute_rows(
+        app, selected_gens, ["loc_name", "m:P:bus1", "m:Q:bus1"]
+    ):
+        gen_dispatch[row[0]] = {"pg": row[1], "qg": row[2]}
     return gen_dispatch
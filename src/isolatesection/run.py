@@ -10,7 +10,6 @@ importlib.reload(parse_data)
 from .core import *
 from .parse_data import *
 
-
 # depreceated i think
 # # runs the isolate section
 # def run_isolate_section(
@@ -81,6 +80,8 @@ def run_isolate_section_from_scenario(
     selected_buses = get_selected_buses(app, selected_bus_names)
 
     # activate base scenario, if it exists
+    # queued writes belong to the previously active scenario
+    flush_writes(app)
     if base_scenario_name is None:  # deactivate any active scenario
         app.PrintWarn("Deactivating active operation scenario")
         active_scenario = app.GetActiveScenario()
@@ -153,6 +154,7 @@ def run_isolate_section_from_scenario(
 
     # save operation scenario
     app.PrintInfo("Saving operation scenario")
+    flush_writes(app)
     isolated_operation_scenario.Save()
 
     # set temp loads to out of service in base scenario
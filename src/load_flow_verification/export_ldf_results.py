@@ -1,6 +1,13 @@
 import csv
+import importlib
 import powerfactory
 
+from pf_utils import read_batch
+
+importlib.reload(read_batch)
+
+from pf_utils.read_batch import *
+
 
 def export_ldf_results(app, target_dir, prefix="pf_ldf_results_"):
     # define variables to export
@@ -39,8 +46,7 @@ def export_ldf_results(app, target_dir, prefix="pf_ldf_results_"):
             csvwriter = csv.writer(file)
             header = ["loc_name"] + [var.replace(":", "_") for var in var_list]
             csvwriter.writerow(header)
-            for elm in app.GetCalcRelevantObjects(f"*.{elm_class}", 0):
-                row = [elm.loc_name]
-                for var in var_list:
-                    row.append(elm.GetAttribute(var))
-                csvwriter.writerow(row)
+            elms = app.GetCalcRelevantObjects(f"*.{elm_class}", 0)
+            csvwriter.writerows(
+                read_attribute_rows(app, elms, ["loc_name"] + var_list, elm_class)
+            )
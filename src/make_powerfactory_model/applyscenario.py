@@ -3,125 +3,161 @@ import sys
 import csv
 import math
 from pathlib import Path
+import importlib
+from time import perf_counter
 import powerfactory
 
+from pf_utils import write_batch
+from pf_utils import read_batch
+import stage_setpoints
+import opf_manifest
+
+importlib.reload(write_batch)
+importlib.reload(read_batch)
+importlib.reload(stage_setpoints)
+importlib.reload(opf_manifest)
+
+from pf_utils.write_batch import *
+from pf_utils.read_batch import *
+from stage_setpoints import *
+from opf_manifest import *
+
 
 def header_indexes(header):
     return {val: ind for ind, val in enumerate(header)}
 
 
-def parse_gens(app, gen_results_path, baseMVA=100):
+# the parse_*_rows functions take the header indexes and rows of a results csv
+# stage_setpoints.py applies the same rules to all hours of a stage at once
+
+
+def parse_gen_rows(app, idx_of, rows, baseMVA=100):
     gens = {}
-    with open(gen_results_path, "r") as f:
-        reader = csv.reader(f)
-        idx_of = header_indexes(next(reader))
-        if "alpha_g" in idx_of.keys():
-            for row in reader:
-                if math.isclose(float(row[idx_of["alpha_g"]]), 0.0, abs_tol=1e-5):
-                    gens[row[idx_of["ind"]]] = {
-                        "pgini": 0,
-                        "qgini": 0,
-                        "outserv": 1,
-                    }
-                else:
-                    gens[row[idx_of["ind"]]] = {
-                        "pgini": float(row[idx_of["pg"]]) * baseMVA,
-                        "qgini": float(row[idx_of["qg"]]) * baseMVA,
-                        "outserv": 0,
-                    }
-        elif "outserv" in idx_of.keys():
-            for row in reader:
+    if "alpha_g" in idx_of.keys():
+        for row in rows:
+            if math.isclose(float(row[idx_of["alpha_g"]]), 0.0, abs_tol=1e-5):
+                gens[row[idx_of["ind"]]] = {
+                    "pgini": 0,
+                    "qgini": 0,
+                    "outserv": 1,
+                }
+            else:
                 gens[row[idx_of["ind"]]] = {
                     "pgini": float(row[idx_of["pg"]]) * baseMVA,
                     "qgini": float(row[idx_of["qg"]]) * baseMVA,
-                    "outserv": int(row[idx_of["outserv"]]),
+                    "outserv": 0,
                 }
-        else:
-            raise ValueError("No gen status found in gen results file")
+    elif "outserv" in idx_of.keys():
+        for row in rows:
+            gens[row[idx_of["ind"]]] = {
+                "pgini": float(row[idx_of["pg"]]) * baseMVA,
+                "qgini": float(row[idx_of["qg"]]) * baseMVA,
+                "outserv": int(row[idx_of["outserv"]]),
+            }
+    else:
+        raise ValueError("No gen status found in gen results file")
 
     return gens
 
 
-def parse_convs(app, conv_results_path, baseMVA=100):
+def parse_conv_rows(app, idx_of, rows, baseMVA=100):
     convs = {}
-    with open(conv_results_path, "r") as f:
-        reader = csv.reader(f)
-        idx_of = header_indexes(next(reader))
-        for row in reader:
-            convs[row[idx_of["ind"]]] = {
-                "pgini": -float(row[idx_of["pgrid"]]) * baseMVA,
-                "qgini": -float(row[idx_of["qgrid"]]) * baseMVA,
-                "outserv": 0,
-            }
+    for row in rows:
+        convs[row[idx_of["ind"]]] = {
+            "pgini": -float(row[idx_of["pgrid"]]) * baseMVA,
+            "qgini": -float(row[idx_of["qgrid"]]) * baseMVA,
+            "outserv": 0,
+        }
     return convs
 
 
-def parse_loads(app, load_results_path, baseMVA=100):
+def parse_load_rows(app, idx_of, rows, baseMVA=100):
     loads = {}
-    with open(load_results_path, "r") as f:
-        reader = csv.reader(f)
-        idx_of = header_indexes(next(reader))
-        for row in reader:
-            loads[row[idx_of["ind"]]] = {
-                "plini": float(row[idx_of["pd"]]) * baseMVA,
-                "qlini": float(row[idx_of["qd"]]) * baseMVA,
-                "outserv": 0 if row[idx_of["status"]] == "1" else 1,
-            }
+    for row in rows:
+        loads[row[idx_of["ind"]]] = {
+            "plini": float(row[idx_of["pd"]]) * baseMVA,
+            "qlini": float(row[idx_of["qd"]]) * baseMVA,
+            "outserv": 0 if float(row[idx_of["status"]]) == 1 else 1,
+        }
     return loads
 
 
-def parse_buses(app, bus_results_path):
+def parse_bus_rows(app, idx_of, rows):
     buses = {}
-    with open(bus_results_path, "r") as f:
-        reader = csv.reader(f)
-        idx_of = header_indexes(next(reader))
-        for row in reader:
-            buses[row[idx_of["ind"]]] = {
-                "vm": float(row[idx_of["vm"]]),
-                "va": float(row[idx_of["va"]]),
-            }
+    for row in rows:
+        buses[row[idx_of["ind"]]] = {
+            "vm": float(row[idx_of["vm"]]),
+            "va": float(row[idx_of["va"]]),
+        }
     return buses
 
 
-def parse_branches(app, branch_results_path):
+def parse_branch_rows(app, idx_of, rows):
     branches = {}
-    with open(branch_results_path, "r") as f:
-        reader = csv.reader(f)
-        idx_of = header_indexes(next(reader))
-        for row in reader:
-            tm = float(row[idx_of["tm"]])
-            if math.isclose(tm, 0.9, abs_tol=1e-5):
-                tm = 0.9
-            elif math.isclose(tm, 1.1, abs_tol=1e-5):
-                tm = 1.1
-            branches[row[idx_of["ind"]]] = {
-                "tm": tm,
-                "tap_percentage": 100 * (tm - 1),
-            }
+    for row in rows:
+        tm = float(row[idx_of["tm"]])
+        if math.isclose(tm, 0.9, abs_tol=1e-5):
+            tm = 0.9
+        elif math.isclose(tm, 1.1, abs_tol=1e-5):
+            tm = 1.1
+        branches[row[idx_of["ind"]]] = {
+            "tm": tm,
+            "tap_percentage": 100 * (tm - 1),
+        }
     return branches
 
 
-def parse_shunts(app, shunt_results_path):
+def parse_shunt_rows(app, idx_of, rows):
     shunts = {}
-    with open(shunt_results_path, "r") as f:
+    if "shunt_bigM" in idx_of.keys():
+        for row in rows:
+            shunt_bigM = float(row[idx_of["shunt_bigM"]])
+            if math.isclose(shunt_bigM, 0.0, abs_tol=1e-5):
+                shunts[row[idx_of["ind"]]] = {"outserv": 1}
+            else:
+                shunts[row[idx_of["ind"]]] = {"outserv": 0}
+    elif "outserv" in idx_of.keys():
+        for row in rows:
+            shunts[row[idx_of["ind"]]] = {"outserv": int(row[idx_of["outserv"]])}
+    else:
+        raise ValueError("No shunt status found in shunt results file")
+    return shunts
+
+
+# parses a results csv with a parse_*_rows function
+def parse_results_csv(app, parse_rows, results_path, **kwargs):
+    with open(results_path, "r") as f:
         reader = csv.reader(f)
         idx_of = header_indexes(next(reader))
-        if "shunt_bigM" in idx_of.keys():
-            for row in reader:
-                shunt_bigM = float(row[idx_of["shunt_bigM"]])
-                if math.isclose(shunt_bigM, 0.0, abs_tol=1e-5):
-                    shunts[row[idx_of["ind"]]] = {"outserv": 1}
-                else:
-                    shunts[row[idx_of["ind"]]] = {"outserv": 0}
-        elif "outserv" in idx_of.keys():
-            for row in reader:
-                shunts[row[idx_of["ind"]]] = {"outserv": int(row[idx_of["outserv"]])}
-        else:
-            raise ValueError("No shunt status found in shunt results file")
-    return shunts
+        return parse_rows(app, idx_of, reader, **kwargs)
 
 
-def parse_setpoint_from_opf_results(app, opf_results_dir):
+def parse_gens(app, gen_results_path, baseMVA=100):
+    return parse_results_csv(app, parse_gen_rows, gen_results_path, baseMVA=baseMVA)
+
+
+def parse_convs(app, conv_results_path, baseMVA=100):
+    return parse_results_csv(app, parse_conv_rows, conv_results_path, baseMVA=baseMVA)
+
+
+def parse_loads(app, load_results_path, baseMVA=100):
+    return parse_results_csv(app, parse_load_rows, load_results_path, baseMVA=baseMVA)
+
+
+def parse_buses(app, bus_results_path):
+    return parse_results_csv(app, parse_bus_rows, bus_results_path)
+
+
+def parse_branches(app, branch_results_path):
+    return parse_results_csv(app, parse_branch_rows, branch_results_path)
+
+
+def parse_shunts(app, shunt_results_path):
+    return parse_results_csv(app, parse_shunt_rows, shunt_results_path)
+
+
+# parses the setpoint of an hour from its results csvs
+def parse_setpoint_from_opf_csvs(app, opf_results_dir):
     setpoint_data = {}
     setpoint_data["gen"] = parse_gens(app, opf_results_dir / "gen.csv")
     setpoint_data["convdc"] = parse_convs(app, opf_results_dir / "convdc.csv")
@@ -136,8 +172,26 @@ def parse_setpoint_from_opf_results(app, opf_results_dir):
     return setpoint_data
 
 
+# parses the setpoint of an hour
+# if its stage has an opf results archive, the setpoints of all hours of the stage are transformed
+# at once (see stage_setpoints.py) and the setpoint of the hour is taken from them
+def parse_setpoint_from_opf_results(app, opf_results_dir):
+    opf_results_dir = Path(opf_results_dir)
+    if opf_results_dir.name.isdigit():
+        stage_setpoints = get_stage_setpoints(opf_results_dir.parent)
+        if stage_setpoints is not None:
+            position = get_hour_position(stage_setpoints, int(opf_results_dir.name))
+            if position is not None:
+                return get_hour_setpoint_data(app, stage_setpoints, position)
+    return parse_setpoint_from_opf_csvs(app, opf_results_dir)
+
+
 # makes an operation scenario
-def make_operation_scenario(app, operation_scenario_name, target=None):
+# if base is given, the operation scenario is made as a copy of it, holding its values
+def make_operation_scenario(app, operation_scenario_name, target=None, base=None):
+    # queued writes belong to the previously active scenario
+    flush_writes(app)
+
     # get study case
     if target is None:
         target = app.GetProjectFolder("scen")
@@ -148,133 +202,288 @@ def make_operation_scenario(app, operation_scenario_name, target=None):
             scenario.Deactivate()
             scenario.Delete()
 
-    operation_scenario = target.CreateObject("IntScenario")
-    operation_scenario.loc_name = operation_scenario_name
+    if base is None:
+        operation_scenario = target.CreateObject("IntScenario")
+        operation_scenario.loc_name = operation_scenario_name
+    else:
+        operation_scenario = target.AddCopy(base, operation_scenario_name)
     operation_scenario.Activate()
     return operation_scenario
 
 
-def apply_setpoint_gens(app, setpoint_data):
-    gens = (
-        app.GetCalcRelevantObjects("ElmSym")
-        + app.GetCalcRelevantObjects("ElmGenstat")
-        + app.GetCalcRelevantObjects("ElmPvsys")
+# Setpoint index
+# Maps the PowerModels index of each generator, converter, load, transformer, shunt and svc to
+# its PowerFactory object and the PowerModels index of its connected bus, so that setpoints are
+# applied without looking up the objects and parsing their descriptions for every hour.
+# The index is built once per project, by get_setpoint_index. PowerModels indexes, connected
+# buses and tap steps are seeded from the pf data csvs when pf_data_dir is given, and read from
+# PowerFactory for elements that are not in the csvs. reset_setpoint_index must be called when
+# the network is rebuilt.
+
+setpoint_index = {
+    "project": None,  # project the index was built for
+    "gen": [],  # (pm index, object, class, bus pm index), excluding converters
+    "convdc": [],  # (pm index, object, bus pm index)
+    "load": [],  # (pm index, object)
+    # (pm index, object, tap step, f bus name, f bus shunt or None, f bus shunt ncapa)
+    "branch": [],
+    "shunt": [],  # (pm index, object)
+    "svc": [],  # (gen pm index, object)
+    "stactrl": [],  # (object, bus pm index)
+    "n_seeded": 0,  # elements indexed from the pf data csvs
+}
+
+# classes read from the pf data csvs to seed the index
+setpoint_index_classes = [
+    "ElmTerm",
+    "ElmSym",
+    "ElmGenstat",
+    "ElmPvsys",
+    "ElmSvs",
+    "ElmLod",
+    "ElmTr2",
+    "ElmShnt",
+    "ElmStactrl",
+]
+
+
+def reset_setpoint_index():
+    setpoint_index["project"] = None
+    for component in ["gen", "convdc", "load", "branch", "shunt", "svc", "stactrl"]:
+        setpoint_index[component] = []
+    setpoint_index["n_seeded"] = 0
+
+
+# returns the PowerModels index in the description of a PowerFactory object
+def get_pm_index(obj):
+    return obj.GetAttribute("desc")[0].replace("PowerModels index: ", "")
+
+
+# returns the rows of the pf data csvs of the indexed classes
+# format: {elm_class: {loc_name: {column: value}}}
+def read_setpoint_index_csvs(pf_data_dir, prefix="pf_data_"):
+    csv_rows = {}
+    for elm_class in setpoint_index_classes:
+        csv_path = Path(pf_data_dir) / f"{prefix}{elm_class}.csv"
+        if not csv_path.exists():
+            continue
+        with open(csv_path, "r", newline="") as f:
+            csv_rows[elm_class] = {
+                row["elm_loc_name"]: row for row in csv.DictReader(f)
+            }
+    return csv_rows
+
+
+# returns the calculation relevant objects of a class, keyed by loc_name
+def get_objects_by_name(app, elm_class):
+    elms = app.GetCalcRelevantObjects(elm_class)
+    names = read_attribute_rows(app, elms, ["loc_name"], elm_class)
+    return {row[0]: elm for row, elm in zip(names, elms)}
+
+
+# returns the bus an element is connected to, given the csv column of its bus
+def get_connected_bus(elm, con):
+    if con == "con_bus":
+        return elm.GetAttribute("rembar")
+    return elm.bus1.cterm
+
+
+# returns the pm index of an element, the pm index of the bus in its csv column con and its csv
+# row. both are read from PowerFactory if the element or its bus is not in the csvs
+def get_pm_indexes(csv_rows, bus_pm_indexes, elm_class, elm_name, elm, con=None):
+    row = csv_rows.get(elm_class, {}).get(elm_name)
+    if row is not None and (con is None or row.get(con) in bus_pm_indexes):
+        setpoint_index["n_seeded"] += 1
+        bus_pm_index = None if con is None else bus_pm_indexes[row[con]]
+        return (row.get("msc_powermodels_index"), bus_pm_index, row)
+    pm_index = None if elm_class == "ElmStactrl" else get_pm_index(elm)
+    bus_pm_index = None if con is None else get_pm_index(get_connected_bus(elm, con))
+    return (pm_index, bus_pm_index, None)
+
+
+# builds the setpoint index of the active project
+def build_setpoint_index(app, pf_data_dir=None):
+    ts = perf_counter()
+    reset_setpoint_index()
+    csv_rows = {} if pf_data_dir is None else read_setpoint_index_csvs(pf_data_dir)
+    bus_pm_indexes = {
+        bus_name: row["msc_powermodels_index"]
+        for bus_name, row in csv_rows.get("ElmTerm", {}).items()
+    }
+
+    # generators and converters
+    for elm_class in ["ElmSym", "ElmGenstat", "ElmPvsys"]:
+        for gen_name, gen in get_objects_by_name(app, elm_class).items():
+            (pm_index, bus_pm_index, _) = get_pm_indexes(
+                csv_rows, bus_pm_indexes, elm_class, gen_name, gen, "con_bus1"
+            )
+            if "conv" not in gen_name:
+                setpoint_index["gen"].append((pm_index, gen, elm_class, bus_pm_index))
+            elif elm_class == "ElmGenstat":
+                setpoint_index["convdc"].append((pm_index, gen, bus_pm_index))
+
+    # loads and svcs
+    for load_name, load in get_objects_by_name(app, "ElmLod").items():
+        (pm_index, _, _) = get_pm_indexes(
+            csv_rows, bus_pm_indexes, "ElmLod", load_name, load
+        )
+        setpoint_index["load"].append((pm_index, load))
+    for svc_name, svc in get_objects_by_name(app, "ElmSvs").items():
+        (pm_index, _, _) = get_pm_indexes(
+            csv_rows, bus_pm_indexes, "ElmSvs", svc_name, svc
+        )
+        setpoint_index["svc"].append((pm_index, svc))
+
+    # shunts
+    shunts = get_objects_by_name(app, "ElmShnt")
+    for shunt_name, shunt in shunts.items():
+        (pm_index, _, _) = get_pm_indexes(
+            csv_rows, bus_pm_indexes, "ElmShnt", shunt_name, shunt
+        )
+        setpoint_index["shunt"].append((pm_index, shunt))
+
+    # transformers, with their tap step and the shunt at their f bus
+    # the capacitor steps of the shunt are kept, so that they are scaled from the same value in
+    # every hour, as operation scenarios can carry over the values of the previous one
+    for tr2_name, tr2 in get_objects_by_name(app, "ElmTr2").items():
+        (pm_index, _, row) = get_pm_indexes(
+            csv_rows, bus_pm_indexes, "ElmTr2", tr2_name, tr2
+        )
+        if row is not None and row.get("typ_dutap", "") != "":
+            dutap = float(row["typ_dutap"])
+            f_bus_line = row["elm_desc"].split("\n")[1]
+        else:
+            dutap = tr2.typ_id.dutap
+            f_bus_line = tr2.GetAttribute("desc")[1]
+        f_bus_name = f_bus_line.replace("f_bus: ", "")
+        f_bus_shunt_name = f"shunt_{tr2_name}_{f_bus_name}"
+        f_bus_shunt = shunts.get(f_bus_shunt_name)
+        f_bus_ncapa = None
+        if f_bus_shunt is not None:
+            shunt_row = csv_rows.get("ElmShnt", {}).get(f_bus_shunt_name)
+            if shunt_row is not None and shunt_row.get("elm_ncapa", "") != "":
+                f_bus_ncapa = int(float(shunt_row["elm_ncapa"]))
+            else:
+                f_bus_ncapa = f_bus_shunt.ncapa
+        setpoint_index["branch"].append(
+            (pm_index, tr2, dutap, f_bus_name, f_bus_shunt, f_bus_ncapa)
+        )
+
+    # station controllers
+    for stactrl_name, stactrl in get_objects_by_name(app, "ElmStactrl").items():
+        (_, bus_pm_index, _) = get_pm_indexes(
+            csv_rows, bus_pm_indexes, "ElmStactrl", stactrl_name, stactrl, "con_bus"
+        )
+        setpoint_index["stactrl"].append((stactrl, bus_pm_index))
+
+    setpoint_index["project"] = app.GetActiveProject()
+    n_elements = sum(
+        len(setpoint_index[component])
+        for component in ["gen", "convdc", "load", "branch", "shunt", "svc", "stactrl"]
     )
-    for gen in gens:
-        if "conv" not in gen.loc_name:
-            pm_index = gen.GetAttribute("desc")[0].replace("PowerModels index: ", "")
-            if (
-                pm_index in setpoint_data["gen"].keys()
-                and setpoint_data["gen"][pm_index]["outserv"] == 0
-            ):
-                gen.SetAttribute("outserv", 0)
-                if gen.GetClassName() != "ElmPvsys":
-                    gen.SetAttribute("pgini", setpoint_data["gen"][pm_index]["pgini"])
-                    gen.SetAttribute("qgini", setpoint_data["gen"][pm_index]["qgini"])
-                else:
-                    gen.SetAttribute(
-                        "pgini", setpoint_data["gen"][pm_index]["pgini"] * 1000
-                    )
-                    gen.SetAttribute(
-                        "qgini", setpoint_data["gen"][pm_index]["qgini"] * 1000
-                    )
-
-                gen_bus = gen.bus1.cterm
-                bus_pm_index = gen_bus.GetAttribute("desc")[0].replace(
-                    "PowerModels index: ", ""
-                )
-                gen.SetAttribute("usetp", setpoint_data["bus"][bus_pm_index]["vm"])
+    app.PrintInfo(
+        f"Setpoint index of {n_elements} elements built in {round(perf_counter() - ts, 2)}s, "
+        f"{setpoint_index['n_seeded']} seeded from pf data csvs"
+    )
+
 
+# returns the setpoint index, building it if it was not built for the active project
+def get_setpoint_index(app, pf_data_dir=None):
+    if setpoint_index["project"] != app.GetActiveProject():
+        build_setpoint_index(app, pf_data_dir)
+    return setpoint_index
+
+
+def apply_setpoint_gens(app, setpoint_data):
+    for pm_index, gen, gen_class, bus_pm_index in get_setpoint_index(app)["gen"]:
+        if (
+            pm_index in setpoint_data["gen"].keys()
+            and setpoint_data["gen"][pm_index]["outserv"] == 0
+        ):
+            set_attribute(gen, "outserv", 0)
+            if gen_class != "ElmPvsys":
+                set_attribute(gen, "pgini", setpoint_data["gen"][pm_index]["pgini"])
+                set_attribute(gen, "qgini", setpoint_data["gen"][pm_index]["qgini"])
             else:
-                gen.SetAttribute("outserv", 1)
-                gen.SetAttribute("pgini", 0)
-                gen.SetAttribute("qgini", 0)
+                set_attribute(
+                    gen, "pgini", setpoint_data["gen"][pm_index]["pgini"] * 1000
+                )
+                set_attribute(
+                    gen, "qgini", setpoint_data["gen"][pm_index]["qgini"] * 1000
+                )
+            set_attribute(gen, "usetp", setpoint_data["bus"][bus_pm_index]["vm"])
+
+        else:
+            set_attribute(gen, "outserv", 1)
+            set_attribute(gen, "pgini", 0)
+            set_attribute(gen, "qgini", 0)
 
 
 def apply_setpoint_svc(app, setpoint_data):
-    svc = app.GetCalcRelevantObjects("ElmSvs")
-    for svc in svc:
-        pm_index = svc.GetAttribute("desc")[0].replace("PowerModels index: ", "")
-        svc.SetAttribute("qsetp", -setpoint_data["gen"][pm_index]["qgini"])
+    for pm_index, svc in get_setpoint_index(app)["svc"]:
+        set_attribute(svc, "qsetp", -setpoint_data["gen"][pm_index]["qgini"])
 
 
 def apply_setpoint_loads(app, setpoint_data):
-    loads = app.GetCalcRelevantObjects("ElmLod")
-    for load in loads:
-        pm_index = load.GetAttribute("desc")[0].replace("PowerModels index: ", "")
-        load.SetAttribute("plini", setpoint_data["load"][pm_index]["plini"])
-        load.SetAttribute("qlini", setpoint_data["load"][pm_index]["qlini"])
-        load.SetAttribute("outserv", setpoint_data["load"][pm_index]["outserv"])
+    for pm_index, load in get_setpoint_index(app)["load"]:
+        set_attribute(load, "plini", setpoint_data["load"][pm_index]["plini"])
+        set_attribute(load, "qlini", setpoint_data["load"][pm_index]["qlini"])
+        set_attribute(load, "outserv", setpoint_data["load"][pm_index]["outserv"])
 
 
 def apply_setpoint_convs(app, setpoint_data):
-    convs = [
-        gen
-        for gen in app.GetCalcRelevantObjects("ElmGenstat")
-        if "conv" in gen.loc_name
-    ]
-    for conv in convs:
-        pm_index = conv.GetAttribute("desc")[0].replace("PowerModels index: ", "")
-        conv.SetAttribute("pgini", setpoint_data["convdc"][pm_index]["pgini"])
-        conv.SetAttribute("qgini", setpoint_data["convdc"][pm_index]["qgini"])
-
-        gen_bus = conv.bus1.cterm
-        bus_pm_index = gen_bus.GetAttribute("desc")[0].replace(
-            "PowerModels index: ", ""
-        )
-        conv.SetAttribute("usetp", setpoint_data["bus"][bus_pm_index]["vm"])
+    for pm_index, conv, bus_pm_index in get_setpoint_index(app)["convdc"]:
+        set_attribute(conv, "pgini", setpoint_data["convdc"][pm_index]["pgini"])
+        set_attribute(conv, "qgini", setpoint_data["convdc"][pm_index]["qgini"])
+        set_attribute(conv, "usetp", setpoint_data["bus"][bus_pm_index]["vm"])
 
 
 def apply_setpoint_branches(app, setpoint_data):
-    tr2s = app.GetCalcRelevantObjects("ElmTr2")
-    for tr2 in tr2s:
-        pm_index = tr2.GetAttribute("desc")[0].replace("PowerModels index: ", "")
-        dutap = tr2.typ_id.dutap
-        tr2.SetAttribute(
-            "nntap", round(setpoint_data["branch"][pm_index]["tap_percentage"] / dutap)
+    for (
+        pm_index,
+        tr2,
+        dutap,
+        f_bus_name,
+        f_bus_shunt,
+        f_bus_ncapa,
+    ) in get_setpoint_index(app)["branch"]:
+        set_attribute(
+            tr2,
+            "nntap",
+            round(setpoint_data["branch"][pm_index]["tap_percentage"] / dutap),
         )
         # modify branch shunts
         if setpoint_data["branch"][pm_index]["tap_percentage"] != 0:
-            f_bus_name = tr2.GetAttribute("desc")[1].replace("f_bus: ", "")
-            f_bus_shunt = app.GetCalcRelevantObjects(
-                f"shunt_{tr2.loc_name}_{f_bus_name}.ElmShnt"
-            )
-            if f_bus_shunt != []:
-                f_bus_shunt = f_bus_shunt[0]
+            if f_bus_shunt is not None:
                 app.PrintInfo(f"Modifying shunt at {f_bus_name}")
-                f_bus_shunt.SetAttribute(
+                set_attribute(
+                    f_bus_shunt,
                     "ncapa",
                     round(
-                        f_bus_shunt.ncapa
+                        f_bus_ncapa
                         / (
                             setpoint_data["branch"][pm_index]["tm"]
                             * setpoint_data["branch"][pm_index]["tm"]
                         ),
                     ),
                 )
+        # restore branch shunts modified in a previous scenario
+        elif f_bus_shunt is not None and applied_values["enabled"]:
+            set_attribute(f_bus_shunt, "ncapa", f_bus_ncapa)
 
 
 def apply_setpoint_station_controllers(app, setpoint_data):
-    station_controllers = app.GetCalcRelevantObjects("ElmStactrl")
-    for station_controller in station_controllers:
-        con_bus = station_controller.GetAttribute("rembar")
-        bus_pm_index = con_bus.GetAttribute("desc")[0].replace(
-            "PowerModels index: ", ""
-        )
-        station_controller.SetAttribute(
-            "usetp", setpoint_data["bus"][bus_pm_index]["vm"]
+    for station_controller, bus_pm_index in get_setpoint_index(app)["stactrl"]:
+        set_attribute(
+            station_controller, "usetp", setpoint_data["bus"][bus_pm_index]["vm"]
         )
 
 
 def apply_setpoint_shunts(app, setpoint_data):
-    shunts = app.GetCalcRelevantObjects("ElmShnt")
-    for shunt in shunts:
-        shunt_pm_index = shunt.GetAttribute("desc")[0].replace(
-            "PowerModels index: ", ""
-        )
+    for shunt_pm_index, shunt in get_setpoint_index(app)["shunt"]:
         if shunt_pm_index in setpoint_data["shunt"].keys():
-            shunt.SetAttribute(
-                "outserv", setpoint_data["shunt"][shunt_pm_index]["outserv"]
+            set_attribute(
+                shunt, "outserv", setpoint_data["shunt"][shunt_pm_index]["outserv"]
             )
 
 
@@ -295,17 +504,17 @@ def turn_off_isolated_buses_and_connected_elements(
     for bus_name in isolated_bus_names:
         try:
             bus = app.GetCalcRelevantObjects(f"{bus_name}.ElmTerm")[0]
-            bus.SetAttribute("outserv", 1)
+            set_attribute(bus, "outserv", 1)
             for elm in bus.GetConnectedElements():
-                elm.SetAttribute("outserv", 1)
+                set_attribute(elm, "outserv", 1)
                 if elm.HasAttribute("c_pmod"):
                     if elm.c_pmod is not None:
-                        elm.c_pmod.SetAttribute("outserv", 1)
+                        set_attribute(elm.c_pmod, "outserv", 1)
                         for dsl in elm.c_pmod.GetContents():
-                            dsl.SetAttribute("outserv", 1)
+                            set_attribute(dsl, "outserv", 1)
                 if elm.HasAttribute("c_pstac"):
                     if elm.c_pstac is not None:
-                        elm.c_pstac.SetAttribute("outserv", 1)
+                        set_attribute(elm.c_pstac, "outserv", 1)
         except:
             pass
 
@@ -319,6 +528,7 @@ def apply_setpoint_to_operation_scenario(app, operation_scenario, setpoint_data)
     apply_setpoint_shunts(app, setpoint_data)
     apply_setpoint_svc(app, setpoint_data)
     turn_off_isolated_buses_and_connected_elements(app)
+    flush_writes(app)
     operation_scenario.Save()
 
 
@@ -330,28 +540,46 @@ def check_if_scenario_has_solved(app, hour_dir):
         return next(reader)[1] in ["LOCALLY_SOLVED", "ALMOST_LOCALLY_SOLVED"]
 
 
+# year_dir is the stage directory of the opf results, whose hours are selected from its manifest
+# (see opf_manifest.py)
+# pf_data_dir is the directory of the pf data csvs the network was built from, used to seed the
+# setpoint index
+# if delta writes are enabled (see enable_delta_writes), each operation scenario is copied from
+# the previous one and only the setpoints that changed are written
 def add_operation_scenarios_for_isp_year(
-    app, year_dir, skip_existing=True, target=None, hours=None
+    app, year_dir, skip_existing=True, target=None, hours=None, pf_data_dir=None
 ):
     # get target folder
     if target is None:
         target = app.GetProjectFolder("scen")
 
-    # get hours
+    # get hours, skipping unsolved hours before touching PowerFactory
+    manifest = get_opf_manifest(year_dir)
+    # hours are ints or strings of ints, e.g. from get_solved_hours or the hour directory names
     if hours is None:
-        hours = os.listdir(year_dir)
+        hours = manifest.keys()
+    solved_hours = []
+    for h in hours:
+        hour = int(h)
+        if is_solved(manifest.get(hour)):
+            solved_hours.append(hour)
+        else:
+            app.PrintInfo(
+                f"Skipping hour_{str(hour).zfill(3)} because it has not solved"
+            )
+
+    # index the elements once for all hours
+    get_setpoint_index(app, pf_data_dir)
+
+    # operation scenario the last setpoints were written to
+    previous_scenario = None
+    reset_delta_writes()
 
-    # make operation scenarios for each hour
-    for hour_str in hours:
-        # parse hour
-        hour = int(hour_str)
+    # make operation scenarios for each solved hour
+    for hour in solved_hours:
         scenario_name = f"hour_{str(hour).zfill(3)}"
-        hour_dir = year_dir / hour_str
+        hour_dir = year_dir / str(hour)
 
-        # skip unsolved scenarios
-        if not check_if_scenario_has_solved(app, hour_dir):
-            app.PrintInfo(f"Skipping {scenario_name} because it has not solved")
-            continue
         # skip if already exists
         if skip_existing and target.GetContents(f"{scenario_name}.IntScenario") != []:
             app.PrintInfo(f"Skipping {scenario_name}")
@@ -361,7 +589,14 @@ def add_operation_scenarios_for_isp_year(
         setpoint_data = parse_setpoint_from_opf_results(app, hour_dir)
 
         # make scenario
-        operation_scenario = make_operation_scenario(app, scenario_name, target=target)
+        base = previous_scenario if applied_values["enabled"] else None
+        operation_scenario = make_operation_scenario(
+            app, scenario_name, target=target, base=base
+        )
 
         # apply setpoints
         apply_setpoint_to_operation_scenario(app, operation_scenario, setpoint_data)
+        previous_scenario = operation_scenario
+        if applied_values["enabled"]:
+            report_delta_writes(app, scenario_name)
+            reset_delta_counts()
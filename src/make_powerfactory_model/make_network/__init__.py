@@ -4,6 +4,11 @@ __all__ = [
     "make_all_network_elements",
     "make_graphic",
     "nem_specific",
+    "incremental_build",
+    "make_dgs",
+    "checkpoint_build",
+    "deferred_diagram",
+    "schematic_layout",
 ]
 
 import importlib
@@ -13,13 +18,22 @@ from . import parse_csvs
 from . import make_all_network_elements
 from . import make_graphic
 from . import nem_specific
-
+from . import incremental_build
+from . import make_dgs
+from . import checkpoint_build
+from . import deferred_diagram
+from . import schematic_layout
 
 importlib.reload(initial_tasks)
 importlib.reload(parse_csvs)
 importlib.reload(make_all_network_elements)
 importlib.reload(make_graphic)
 importlib.reload(nem_specific)
+importlib.reload(incremental_build)
+importlib.reload(make_dgs)
+importlib.reload(checkpoint_build)
+importlib.reload(deferred_diagram)
+importlib.reload(schematic_layout)
 
 
 from .initial_tasks import *
@@ -27,3 +41,8 @@ from .parse_csvs import *
 from .make_all_network_elements import *
 from .make_graphic import *
 from .nem_specific import *
+from .incremental_build import *
+from .make_dgs import *
+from .checkpoint_build import *
+from .deferred_diagram import *
+from .schematic_layout import *
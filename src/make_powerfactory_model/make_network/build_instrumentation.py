@@ -0,0 +1,209 @@
+import csv
+import json
+import heapq
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+# Build instrumentation
+# The build is split into stages (one per element class and graphic class), and each stage
+# records its wall time, the number of PowerFactory calls made and its slowest elements.
+# Stages can be nested, the time of the enclosing stage is paused while a nested stage runs,
+# so that stage times add up to the build time.
+# The build makes its counted calls through create_object, set_attribute, set_attributes and
+# add_copy (and define_transfer_attributes, see make_base.py), which count them in the running
+# stage, so that the counted calls are the calls made. PowerFactory objects can not be wrapped,
+# so calls made on objects directly, including attribute assignments (obj.loc_name = x), are not
+# counted and must not be used by the build.
+# Stages are run with build_stage, which ends the stage if it raises, so that a failed stage
+# is not left running and does not collect the calls of later stages.
+
+# calls counted for each stage
+counted_calls = [
+    "CreateObject",
+    "SetAttribute",
+    "SetAttributes",
+    "DefineTransferAttributes",
+    "AddCopy",
+]
+
+build_stats = {
+    "stages": {},
+    "running": [],  # names of running stages, innermost last
+    "n_slowest": 10,  # number of slowest elements kept for each stage
+}
+
+
+# clears the recorded stages
+def reset_build_stats(n_slowest=10):
+    build_stats["stages"] = {}
+    build_stats["running"] = []
+    build_stats["n_slowest"] = n_slowest
+
+
+def get_stage_stats(stage_name):
+    if stage_name not in build_stats["stages"]:
+        build_stats["stages"][stage_name] = {
+            "wall_time": 0.0,
+            "n_runs": 0,
+            "n_elements": 0,
+            "calls": {call: 0 for call in counted_calls},
+            "slowest": [],  # heap of (time, element name)
+            "ts": None,
+            "run_time": 0.0,
+        }
+    return build_stats["stages"][stage_name]
+
+
+# returns the stats of the innermost running stage
+# calls made outside of any stage are recorded in the stage "other"
+def get_running_stage_stats():
+    if len(build_stats["running"]) == 0:
+        return get_stage_stats("other")
+    return build_stats["stages"][build_stats["running"][-1]]
+
+
+def pause_stage(stats, now):
+    stats["wall_time"] += now - stats["ts"]
+    stats["run_time"] += now - stats["ts"]
+
+
+def start_stage(stage_name):
+    now = perf_counter()
+    if len(build_stats["running"]) != 0:
+        pause_stage(get_running_stage_stats(), now)
+    stats = get_stage_stats(stage_name)
+    stats["n_runs"] += 1
+    stats["run_time"] = 0.0
+    stats["ts"] = now
+    build_stats["running"].append(stage_name)
+
+
+# ends the stage and prints its run time
+def end_stage(app, stage_name, failed=False):
+    now = perf_counter()
+    stats = build_stats["stages"][stage_name]
+    pause_stage(stats, now)
+    build_stats["running"].remove(stage_name)
+    if len(build_stats["running"]) != 0:
+        get_running_stage_stats()["ts"] = now
+    if failed:
+        app.PrintWarn(f"{stage_name} failed after: \t{round(stats['run_time'], 2)}")
+    else:
+        app.PrintInfo(f"{stage_name} made in: \t\t{round(stats['run_time'], 2)}")
+
+
+# runs the body of the with statement as a stage, e.g.
+#   with build_stage(app, "ElmTerm"):
+#       ...
+# the stage is ended if the body raises
+@contextmanager
+def build_stage(app, stage_name):
+    start_stage(stage_name)
+    try:
+        yield
+    except BaseException:
+        end_stage(app, stage_name, failed=True)
+        raise
+    end_stage(app, stage_name)
+
+
+# adds to the call counts of the running stage, e.g. count_calls(CreateObject=1)
+def count_calls(**calls):
+    stage_calls = get_running_stage_stats()["calls"]
+    for call, n in calls.items():
+        stage_calls[call] += n
+
+
+# makes an object of class_name in parent, named by the joined name parts if given
+def create_object(parent, class_name, *name_parts):
+    count_calls(CreateObject=1)
+    return parent.CreateObject(class_name, *name_parts)
+
+
+def set_attribute(obj, name, value):
+    count_calls(SetAttribute=1)
+    return obj.SetAttribute(name, value)
+
+
+# sets the transfer attributes of the object's class, defined with define_transfer_attributes
+def set_attributes(obj, values):
+    count_calls(SetAttributes=1)
+    return obj.SetAttributes(values)
+
+
+# copies obj into parent, named by the joined name parts
+def add_copy(parent, obj, *name_parts):
+    count_calls(AddCopy=1)
+    return parent.AddCopy(obj, *name_parts)
+
+
+# records the time taken to make an element, from ts to now
+def record_element(elm_name, ts):
+    elm_time = perf_counter() - ts
+    stats = get_running_stage_stats()
+    stats["n_elements"] += 1
+    if len(stats["slowest"]) < build_stats["n_slowest"]:
+        heapq.heappush(stats["slowest"], (elm_time, elm_name))
+    elif elm_time > stats["slowest"][0][0]:
+        heapq.heapreplace(stats["slowest"], (elm_time, elm_name))
+
+
+# returns the recorded stages as a list of dictionaries, in the order they were started
+def get_build_stats():
+    stages = []
+    for stage_name, stats in build_stats["stages"].items():
+        stages.append(
+            {
+                "stage": stage_name,
+                "wall_time_s": round(stats["wall_time"], 4),
+                "n_runs": stats["n_runs"],
+                "n_elements": stats["n_elements"],
+                **stats["calls"],
+                "slowest": [
+                    {"element": elm_name, "time_s": round(elm_time, 6)}
+                    for (elm_time, elm_name) in sorted(stats["slowest"], reverse=True)
+                ],
+            }
+        )
+    return stages
+
+
+# returns the default build stats path for the active project
+def get_build_stats_path(app, data_dir, suffix=".json"):
+    project_name = app.GetActiveProject().loc_name
+    return Path(data_dir) / ".build_manifests" / f"{project_name}_build_stats{suffix}"
+
+
+# writes the recorded stages to a json or csv file, depending on the file suffix
+# in the csv, the slowest elements are written as a single column of element:time entries
+def write_build_stats(app, stats_path):
+    stats_path = Path(stats_path)
+    stats_path.parent.mkdir(parents=True, exist_ok=True)
+    stages = get_build_stats()
+    if stats_path.suffix == ".csv":
+        with open(stats_path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                ["stage", "wall_time_s", "n_runs", "n_elements"]
+                + counted_calls
+                + ["slowest"]
+            )
+            for stage in stages:
+                writer.writerow(
+                    [
+                        stage[key]
+                        for key in ["stage", "wall_time_s", "n_runs", "n_elements"]
+                    ]
+                    + [stage[call] for call in counted_calls]
+                    + [
+                        "; ".join(
+                            f"{elm['element']}:{elm['time_s']}"
+                            for elm in stage["slowest"]
+                        )
+                    ]
+                )
+    else:
+        with open(stats_path, "w") as file:
+            json.dump({"stages": stages}, file, indent=1)
+    app.PrintInfo(f"Build stats written to {stats_path}")
@@ -0,0 +1,179 @@
+import json
+from pathlib import Path
+from time import perf_counter
+import importlib
+import powerfactory
+
+from . import incremental_build
+from . import make_dgs
+
+importlib.reload(incremental_build)
+importlib.reload(make_dgs)
+
+from .incremental_build import *
+from .make_dgs import *
+
+# Checkpointed network builds
+# The full build is run as a sequence of named stages. A checkpoint is written after each
+# stage, and when a stage fails, recording the completed stages and the elements that exist
+# in the network. A re-run resumes from the checkpoint instead of cleaning the project.
+
+checkpoint_version = 1
+
+
+# returns the default checkpoint path for the active project
+def get_checkpoint_path(app, data_dir):
+    project_name = app.GetActiveProject().loc_name
+    return Path(data_dir) / ".build_manifests" / f"{project_name}_checkpoint.json"
+
+
+def write_build_checkpoint(app, checkpoint, checkpoint_path):
+    checkpoint_path = Path(checkpoint_path)
+    checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = checkpoint_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(checkpoint, file)
+    tmp_path.replace(checkpoint_path)
+
+
+# returns the checkpoint of an unfinished build, or None if there is none
+def read_build_checkpoint(app, checkpoint_path):
+    checkpoint_path = Path(checkpoint_path)
+    if not checkpoint_path.exists():
+        return None
+    with open(checkpoint_path) as file:
+        checkpoint = json.load(file)
+    if checkpoint.get("version") != checkpoint_version:
+        app.PrintWarn(f"Checkpoint {checkpoint_path} is out of date and is ignored")
+        return None
+    app.PrintInfo(
+        f"Resuming build after stages: {', '.join(checkpoint['completed_stages'])}"
+    )
+    return checkpoint
+
+
+# deletes the checkpoint once the build is complete
+def clear_build_checkpoint(app, checkpoint_path):
+    checkpoint_path = Path(checkpoint_path)
+    if checkpoint_path.exists():
+        checkpoint_path.unlink()
+
+
+# returns the names of the elements of elm_class that exist in the network, in build order
+# if the stage failed, the last element made may be incomplete and is excluded
+# plants copied from composite model templates are excluded until their queued patches are
+# written, which is done at the end of their stage
+def get_completed_elements(app, data, elm_class, elm_names, completed, failed):
+    net = data["directories"]["net"]
+    existing = {elm.loc_name for elm in net.GetContents(f"*.{elm_class}", 1)}
+    unpatched = composite_templates["queued_elements"]
+    made = [
+        elm_data["elm"]["loc_name"]
+        for elm_data in get_elms_to_make(data, elm_class, elm_names)
+        if elm_data["elm"]["loc_name"] in existing
+        and elm_data["elm"]["loc_name"] not in unpatched
+    ]
+    if failed and len(made) != 0:
+        made = made[:-1]
+    return completed + made
+
+
+# deletes elements of a partially completed stage that are not in the checkpoint, with their
+# composite models, including unpatched copies of composite model templates
+# returns the names of the elements still to be made
+def remove_incomplete_elements(app, data, elm_class, completed):
+    to_make = [
+        elm_name
+        for elm_name in data["network"][elm_class].keys()
+        if elm_name not in completed
+    ]
+    existing = get_existing_objects(app, data, elm_class)
+    for elm_name in to_make:
+        if elm_name in existing:
+            delete_element(app, data, existing[elm_name], elm_class)
+            data["network"][elm_class][elm_name].pop("object", None)
+
+    # composite models are made before some generators, so they can exist without one
+    if elm_class in ["ElmSym", "ElmGenstat", "ElmPvsys"]:
+        net = data["directories"]["net"]
+        comp_models = {comp.loc_name: comp for comp in net.GetContents("*.ElmComp")}
+        for elm_name in to_make:
+            model = data["network"][elm_class][elm_name]["msc"]["powerfactory_model"]
+            if model not in comp_model_names.keys():
+                continue
+            comp_name = comp_model_names[model].format(elm_name)
+            if comp_name in comp_models:
+                comp_models[comp_name].Delete()
+    return to_make
+
+
+# runs the build stages in order, writing a checkpoint after each stage
+# stages is a dictionary of stage name: function(app, data)
+# stages named after an element class are called with elm_names, so that they can be resumed
+# part way through. other stages are rerun from the start if they did not complete
+# checkpoint is the checkpoint of a previous run (see read_build_checkpoint), or None
+def run_build_stages(app, data, stages, checkpoint, checkpoint_path):
+    data_fingerprint = fingerprint(make_build_manifest(data)["classes"])
+    if checkpoint is None:
+        checkpoint = {
+            "version": checkpoint_version,
+            "data_fingerprint": data_fingerprint,
+            "completed_stages": [],
+            "elements": {},
+        }
+    elif checkpoint["data_fingerprint"] != data_fingerprint:
+        raise RuntimeError(
+            f"Network data changed since checkpoint {checkpoint_path} was written. "
+            "Delete the checkpoint to rebuild, or use an incremental build."
+        )
+
+    for stage_name, stage_function in stages.items():
+        is_elm_class = stage_name in data["network"].keys()
+
+        # objects of completed stages are added to the data dictionary for later stages
+        if stage_name in checkpoint["completed_stages"]:
+            if is_elm_class:
+                get_existing_objects(app, data, stage_name)
+            continue
+
+        ts = perf_counter()
+        completed = checkpoint["elements"].get(stage_name, [])
+        elm_names = None
+        try:
+            if is_elm_class:
+                elm_names = remove_incomplete_elements(app, data, stage_name, completed)
+                stage_function(app, data, elm_names=elm_names)
+            else:
+                stage_function(app, data)
+        except:
+            if is_elm_class:
+                checkpoint["elements"][stage_name] = get_completed_elements(
+                    app, data, stage_name, elm_names, completed, failed=True
+                )
+            write_build_checkpoint(app, checkpoint, checkpoint_path)
+            app.PrintWarn(
+                f"Build failed in stage {stage_name}. Re-run the build to resume from "
+                f"{checkpoint_path}"
+            )
+            raise
+
+        if is_elm_class:
+            checkpoint["elements"][stage_name] = get_completed_elements(
+                app, data, stage_name, elm_names, completed, failed=False
+            )
+        checkpoint["completed_stages"].append(stage_name)
+        write_build_checkpoint(app, checkpoint, checkpoint_path)
+        app.PrintInfo(
+            f"Stage {stage_name} completed in: \t{round(perf_counter() - ts, 2)}"
+        )
+    return checkpoint
+
+
+# deletes the network diagram if it exists and makes it again
+# used as a build stage, as the diagram can not be resumed part way through
+def remake_network_diagram(app, data, page_name, page_size=None, show=True):
+    if "dig" in data["directories"]:
+        data["directories"]["dig"].Close()
+        data["directories"]["dig"].Delete()
+        del data["directories"]["dig"]
+    make_network_diagram(app, data, page_name, page_size=page_size, show=show)
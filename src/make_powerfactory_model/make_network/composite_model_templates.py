@@ -0,0 +1,293 @@
+import powerfactory
+import importlib
+
+from . import make_base
+
+importlib.reload(make_base)
+
+from .make_base import *
+
+# Composite model templates
+# When enabled, the WECC wind and pv plants and the synchronous machines with controls are made
+# by copying a template composite model instead of creating each dsl, measurement device and slot
+# assignment separately. One template is made per frame and set of dsl models, with the dsl
+# model types, measurement device settings, slots and the plant control composite model already
+# set. Each plant is then a copy of its template, patched with the parameters of its dsls and
+# connected to its generator.
+# DSL parameters are patched in bulk by flush_template_patches, which writes all queued patches
+# with one DefineTransferAttributes call per class and signature and one SetAttributes call per
+# object. The patches must be flushed before the plants are used, see make_all_ElmGenstat.
+# Plants with queued patches are not complete, and are remade when a failed build is resumed
+# (see get_completed_elements).
+
+composite_templates = {
+    "enabled": False,
+    "folder": None,  # folder of templates in the project templates folder
+    "templates": {},  # template key: template composite model
+    "patches": {},  # (class, params): [(object, values)], in the order queued
+    "matrices": [],  # (dsl, matrix rows) set after the parameters
+    "queued_elements": set(),  # names of the elements of the queued patches
+    "n_templates": 0,
+    "n_copies": 0,
+}
+
+# name of the folder holding the templates
+template_folder_name = "composite_model_templates"
+
+# measurement devices of the WECC composite models, with the settings shared by all plants
+wecc_measurements = {
+    "pq_meas": ("StaPqmea", {"i_mode": 1, "i_orient": 1, "iAstabint": 1}),
+    "v_meas": ("StaVmea", {"iOutput": 0, "i_mode": 1, "iAstabint": 1}),
+    "i_meas": ("StaImea", {"i_mode": 1}),
+}
+
+
+# clears the templates and queued patches and enables or disables templates
+def reset_composite_templates(enabled=False):
+    composite_templates["enabled"] = enabled
+    composite_templates["folder"] = None
+    composite_templates["templates"] = {}
+    composite_templates["patches"] = {}
+    composite_templates["matrices"] = []
+    composite_templates["queued_elements"] = set()
+    composite_templates["n_templates"] = 0
+    composite_templates["n_copies"] = 0
+
+
+# returns the template folder, replacing templates left by a previous build
+def get_template_folder(app):
+    if composite_templates["folder"] is None:
+        templ = app.GetProjectFolder("templ")
+        for folder in templ.GetContents(f"{template_folder_name}.IntFolder"):
+            folder.Delete()
+        composite_templates["folder"] = create_object(
+            templ, "IntFolder", template_folder_name
+        )
+    return composite_templates["folder"]
+
+
+def make_template_measurement(app, comp_model, name):
+    (elm_class, params) = wecc_measurements[name]
+    return make_element(
+        app, comp_model, {"elm": {"loc_name": name, **params}}, elm_class
+    )
+
+
+# makes a WECC composite model template with all dsls, measurement devices and slots set
+# dsls are named after their dsl model, the generator and measurement points are set per plant
+def make_WECC_template(
+    app, template_name, frame, dsl_names, wecc_dsl_models, plant_control_frame
+):
+    comp_model = create_object(get_template_folder(app), "ElmComp")
+    set_attribute(comp_model, "loc_name", template_name)
+    set_attribute(comp_model, "typ_id", frame)
+
+    # make ElmDsls
+    plant_control_dsl = None
+    for dsl_name in dsl_names:
+        dsl = create_object(comp_model, "ElmDsl")
+        set_attribute(dsl, "loc_name", dsl_name)
+        set_attribute(dsl, "typ_id", wecc_dsl_models[dsl_name]["blkdef"])
+
+        slot_name = wecc_dsl_models[dsl_name]["slot"]
+        if slot_name == "Plant Control DSL":
+            plant_control_dsl = dsl
+            continue
+        set_attribute(comp_model, slot_name, dsl)
+
+    # make measurement devices
+    pq_measurement = make_template_measurement(app, comp_model, "pq_meas")
+    set_attribute(comp_model, "Power Measurement", pq_measurement)
+    v_measurement = make_template_measurement(app, comp_model, "v_meas")
+    set_attribute(comp_model, "Voltage Measurement", v_measurement)
+
+    # make plant control model if required
+    if plant_control_dsl is not None:
+        if plant_control_frame.loc_name != "Frame WECC Plant Control":
+            raise ValueError(
+                f"Plant control frame type {plant_control_frame.loc_name} is not implemented."
+            )
+        plant_control = create_object(comp_model, "ElmComp")
+        set_attribute(plant_control, "loc_name", "plant_control")
+        set_attribute(plant_control, "typ_id", plant_control_frame)
+        set_attribute(plant_control, "Plant Level Control", plant_control_dsl)
+        set_attribute(plant_control, "Voltage Measurement", v_measurement)
+        set_attribute(plant_control, "Power Measurement", pq_measurement)
+        i_measurement = make_template_measurement(app, plant_control, "i_meas")
+        set_attribute(plant_control, "Current Measurement", i_measurement)
+        set_attribute(comp_model, "Plant Control", plant_control)
+
+    composite_templates["n_templates"] += 1
+    return comp_model
+
+
+# returns the template of a WECC plant, making it if it does not exist yet
+def get_WECC_template(app, elm_data, frame, wecc_dsl_models, plant_control_frame):
+    dsl_names = tuple(elm_data["dsl"].keys())
+    template_key = (elm_data["msc"]["frame_type"],) + dsl_names
+    if template_key not in composite_templates["templates"]:
+        composite_templates["templates"][template_key] = make_WECC_template(
+            app,
+            " ".join(template_key),
+            frame,
+            dsl_names,
+            wecc_dsl_models,
+            plant_control_frame,
+        )
+    return composite_templates["templates"][template_key]
+
+
+# queues a patch of the attributes of a copied object, written by flush_template_patches
+def queue_template_patch(obj, elm_class, attributes):
+    signature = (elm_class, tuple(attributes.keys()))
+    composite_templates["patches"].setdefault(signature, []).append(
+        (obj, list(attributes.values()))
+    )
+
+
+# copies the template of a WECC plant into net
+# the copy is connected to gen and its dsls are patched by patch_WECC_template_copy
+def copy_WECC_template(
+    app, net, elm_data, comp_name, frame, wecc_dsl_models, plant_control_frame
+):
+    template = get_WECC_template(
+        app, elm_data, frame, wecc_dsl_models, plant_control_frame
+    )
+    return copy_template(app, net, template, comp_name)
+
+
+def copy_template(app, net, template, comp_name):
+    comp_model = add_copy(net, template, comp_name)
+    composite_templates["n_copies"] += 1
+    return comp_model
+
+
+# connects a copied template to its generator and queues the patches of its contents
+def patch_WECC_template_copy(app, comp_model, gen, elm_data):
+    name = elm_data["elm"]["loc_name"]
+    set_attribute(comp_model, "Generator", gen)
+    composite_templates["queued_elements"].add(name)
+
+    # contents of the copy, by template name
+    contents = {obj.loc_name: obj for obj in comp_model.GetContents("*", 1)}
+
+    # dsl parameters, which include the dsl name
+    for dsl_name, dsl_data in elm_data["dsl"].items():
+        dsl = contents[dsl_name]
+        queue_template_patch(dsl, "ElmDsl", dsl_data["elm"])
+        if "mat" in dsl_data.keys():
+            composite_templates["matrices"].append((dsl, dsl_data["mat"]))
+
+    # measurement devices and plant control model
+    queue_template_patch(
+        contents["pq_meas"],
+        "StaPqmea",
+        {"loc_name": f"pq_meas_{name}", "pcubic": gen.bus1},
+    )
+    queue_template_patch(
+        contents["v_meas"],
+        "StaVmea",
+        {"loc_name": f"v_meas_{name}", "pbusbar": gen.bus1.cterm},
+    )
+    if "plant_control" in contents.keys():
+        plant_control_name = f"Frame WECC Plant Control {name}"
+        queue_template_patch(
+            contents["plant_control"], "ElmComp", {"loc_name": plant_control_name}
+        )
+        queue_template_patch(
+            contents["i_meas"],
+            "StaImea",
+            {"loc_name": f"i_meas_{plant_control_name}", "pcubic": gen.bus1},
+        )
+
+
+# makes a synchronous machine composite model template with the avr, governor and pss dsls
+# in their slots. the generator slot is left empty and set per machine
+def make_sym_template(app, template_name, frame, avr_model, gov_model, pss_model):
+    comp_model = create_object(get_template_folder(app), "ElmComp")
+    set_attribute(comp_model, "loc_name", template_name)
+    set_attribute(comp_model, "typ_id", frame)
+
+    dsls = []
+    for dsl_name, dsl_model in [
+        ("avr", avr_model),
+        ("gov", gov_model),
+        ("pss", pss_model),
+    ]:
+        dsl = create_object(comp_model, "ElmDsl")
+        set_attribute(dsl, "loc_name", dsl_name)
+        set_attribute(dsl, "typ_id", dsl_model)
+        dsls.append(dsl)
+
+    set_attribute(comp_model, "pelm", [None] + dsls + [None, None, None])
+
+    composite_templates["n_templates"] += 1
+    return comp_model
+
+
+# copies the template of a synchronous machine into net
+# the copy is connected to gen and its dsls are patched by patch_sym_template_copy
+def copy_sym_template(
+    app, net, elm_data, comp_name, frame, avr_model, gov_model, pss_model
+):
+    template_key = tuple(
+        elm_data["msc"][key] for key in ["frame_type", "avr", "gov", "pss"]
+    )
+    if template_key not in composite_templates["templates"]:
+        composite_templates["templates"][template_key] = make_sym_template(
+            app, " ".join(template_key), frame, avr_model, gov_model, pss_model
+        )
+    return copy_template(
+        app, net, composite_templates["templates"][template_key], comp_name
+    )
+
+
+# connects a copied template to its generator and queues the patches of its dsls
+# the dsls are found from the slots of the copy, which are in the order avr, gov, pss
+def patch_sym_template_copy(app, comp_model, gen, elm_data):
+    slots = list(comp_model.GetAttribute("pelm"))
+    slots[0] = gen
+    set_attribute(comp_model, "pelm", slots)
+    composite_templates["queued_elements"].add(elm_data["elm"]["loc_name"])
+
+    for dsl, key in zip(slots[1:4], ["avr", "gov", "pss"]):
+        dsl_data = elm_data["dsl"][elm_data["msc"][key]]
+        queue_template_patch(dsl, "ElmDsl", dsl_data["elm"])
+        if "mat" in dsl_data.keys():
+            composite_templates["matrices"].append((dsl, dsl_data["mat"]))
+
+
+# writes all queued patches, grouped by class and signature
+def flush_template_patches(app):
+    for (elm_class, params), patches in composite_templates["patches"].items():
+        define_transfer_attributes(app, elm_class, params)
+        for obj, values in patches:
+            try:
+                set_attributes(obj, values)
+            except:
+                # iterate so that it actually flags which one is a problem
+                app.PrintWarn(f"Error setting attributes for {values[0]}.{elm_class}")
+                for p, v in zip(params, values):
+                    app.PrintInfo(f"{p} \t {v}")
+                    set_attribute(obj, p, v)
+                raise RuntimeError(
+                    f"Error setting attributes for {values[0]}.{elm_class}"
+                )
+
+    # set matrix entries (rows are stored as arrays, powerfactory expects lists)
+    for dsl, matrix in composite_templates["matrices"]:
+        for matrix_row_index, matrix_row in matrix.items():
+            set_attribute(dsl, f"matrix:{matrix_row_index}", list(matrix_row))
+
+    composite_templates["patches"] = {}
+    composite_templates["matrices"] = []
+    composite_templates["queued_elements"] = set()
+
+
+# prints the number of templates made and copied
+def report_composite_templates(app):
+    if composite_templates["enabled"]:
+        app.PrintInfo(
+            f"Composite model templates: {composite_templates['n_copies']} plants copied "
+            f"from {composite_templates['n_templates']} templates"
+        )
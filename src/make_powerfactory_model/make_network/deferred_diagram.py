@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+from time import perf_counter
+import importlib
+import powerfactory
+
+from . import checkpoint_build
+
+importlib.reload(checkpoint_build)
+
+from .checkpoint_build import *
+
+# Deferred network diagrams
+# Headless builds make the network without a diagram, and cache the grf and gco data of each
+# element next to the build manifest. The diagram is made later from the cache by
+# make_deferred_network_diagram, which can run in another PowerFactory instance as it only
+# needs the built network and the cache, not the pf data csvs.
+
+diagram_cache_version = 1
+
+
+def get_diagram_cache_path(app, data_dir):
+    project_name = app.GetActiveProject().loc_name
+    return Path(data_dir) / ".build_manifests" / f"{project_name}_diagram.json"
+
+
+# writes the grf and gco data of all elements with graphics
+def write_diagram_cache(app, data, cache_path):
+    cache = {"version": diagram_cache_version, "network": {}}
+    for elm_class in graphic_classes:
+        cache["network"][elm_class] = {}
+        for elm_name, elm_data in data["network"][elm_class].items():
+            if "grf" not in elm_data.keys():
+                continue
+            cache["network"][elm_class][elm_name] = {"grf": dict(elm_data["grf"])}
+            if "gco" in elm_data.keys():
+                cache["network"][elm_class][elm_name]["gco"] = dict(elm_data["gco"])
+
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "w") as file:
+        # gco points are parsed as arrays
+        json.dump(cache, file, default=list)
+    app.PrintInfo(f"Diagram cache written to {cache_path}")
+
+
+# reads the diagram cache into data["network"], in the format used by make_network_diagram
+# element objects are not cached, they are looked up by make_all_grfs
+def read_diagram_cache(app, data, cache_path):
+    cache_path = Path(cache_path)
+    if not cache_path.exists():
+        raise RuntimeError(
+            f"Diagram cache {cache_path} not found. A headless build is required first."
+        )
+    with open(cache_path) as file:
+        cache = json.load(file)
+    if cache.get("version") != diagram_cache_version:
+        raise RuntimeError(
+            f"Diagram cache {cache_path} is out of date. A headless build is required."
+        )
+
+    data["network"] = {}
+    for elm_class, elms_data in cache["network"].items():
+        data["network"][elm_class] = {}
+        for elm_name, elm_data in elms_data.items():
+            data["network"][elm_class][elm_name] = {"elm": {"loc_name": elm_name}}
+            data["network"][elm_class][elm_name].update(elm_data)
+    return data
+
+
+# makes the diagram of an existing network from the diagram cache
+# an existing diagram is replaced. data needs the network directories, see
+# prepare_project_incremental
+def make_deferred_network_diagram(
+    app, data, cache_path, page_name, page_size=None, show=True
+):
+    ts = perf_counter()
+    read_diagram_cache(app, data, cache_path)
+    remake_network_diagram(app, data, page_name, page_size=page_size, show=show)
+    app.PrintInfo(f"Deferred diagram made in: \t{round(perf_counter() - ts, 2)}")
@@ -0,0 +1,422 @@
+import json
+import hashlib
+from pathlib import Path
+from array import array
+from time import perf_counter
+import importlib
+import powerfactory
+
+from . import initial_tasks
+from . import make_all_network_elements
+from . import make_graphic
+
+importlib.reload(initial_tasks)
+importlib.reload(make_all_network_elements)
+importlib.reload(make_graphic)
+
+from .initial_tasks import *
+from .make_all_network_elements import *
+from .make_graphic import *
+
+# Incremental network builds
+# A manifest of fingerprints of the parsed csv data is written after each build.
+# An incremental build compares the newly parsed data to the manifest and only creates,
+# updates or deletes the elements that changed, instead of cleaning the project.
+
+manifest_version = 2
+
+# element classes in build order, with the attributes that connect them to buses
+incremental_classes = {
+    "ElmTerm": [],
+    "ElmStactrl": [],
+    "ElmLne": ["bus1", "bus2"],
+    "ElmTr2": ["buslv", "bushv"],
+    "ElmLod": ["bus1"],
+    "ElmShnt": ["bus1"],
+    "ElmSym": ["bus1"],
+    "ElmGenstat": ["bus1"],
+    "ElmPvsys": ["bus1"],
+    "ElmSvs": ["bus1"],
+}
+
+# type classes of elements with types that can be updated in place
+type_classes = {
+    "ElmLne": "TypLne",
+    "ElmTr2": "TypTr2",
+    "ElmSym": "TypSym",
+    "ElmLod": "TypLod",
+}
+
+# functions that make a subset of the elements of each class
+make_functions = {
+    "ElmTerm": make_all_ElmTerm,
+    "ElmStactrl": make_all_ElmStactrl,
+    "ElmLne": make_all_ElmLne,
+    "ElmTr2": make_all_ElmTr2,
+    "ElmLod": make_all_ElmLod,
+    "ElmShnt": make_all_ElmShnt,
+    "ElmSym": make_all_ElmSym,
+    "ElmGenstat": make_all_ElmGenstat,
+    "ElmPvsys": make_all_ElmPvsys,
+    "ElmSvs": make_all_ElmSvs,
+}
+
+
+###################################################################################
+# MANIFEST
+
+
+# returns a fingerprint of a group of element data
+def fingerprint(group_data):
+    group_json = json.dumps(
+        dict(group_data),
+        sort_keys=True,
+        default=lambda x: list(x) if isinstance(x, array) else str(x),
+    )
+    return hashlib.blake2b(group_json.encode(), digest_size=12).hexdigest()
+
+
+# returns the fingerprints of the data used to make an element
+# graphics (grf, gco) are excluded as they do not change the network
+# dsl models are fingerprinted as a whole, including their matrix entries (mat)
+def fingerprint_elm_data(elm_data):
+    elm_fingerprint = {
+        param_type: fingerprint(elm_data[param_type])
+        for param_type in ["elm", "con", "typ", "msc"]
+        if param_type in elm_data.keys()
+    }
+    if "dsl" in elm_data.keys():
+        elm_fingerprint["dsl"] = {
+            dsl_model_type: fingerprint(dsl_data)
+            for dsl_model_type, dsl_data in elm_data["dsl"].items()
+        }
+    return elm_fingerprint
+
+
+# makes the manifest of all parsed network data
+# must be called before the network is made, as making elements modifies the data dictionary
+def make_build_manifest(data):
+    return {
+        "version": manifest_version,
+        "classes": {
+            elm_class: {
+                elm_name: fingerprint_elm_data(elm_data)
+                for elm_name, elm_data in data["network"][elm_class].items()
+            }
+            for elm_class in incremental_classes.keys()
+            if elm_class in data["network"].keys()
+        },
+    }
+
+
+# returns the default manifest path for the active project
+def get_manifest_path(app, data_dir):
+    project_name = app.GetActiveProject().loc_name
+    return Path(data_dir) / ".build_manifests" / f"{project_name}.json"
+
+
+def write_build_manifest(app, manifest, manifest_path):
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, "w") as file:
+        json.dump(manifest, file)
+    app.PrintInfo(f"Build manifest written to {manifest_path}")
+
+
+def read_build_manifest(app, manifest_path):
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        raise RuntimeError(
+            f"Build manifest {manifest_path} not found. A full build is required first."
+        )
+    with open(manifest_path) as file:
+        manifest = json.load(file)
+    if manifest.get("version") != manifest_version:
+        raise RuntimeError(
+            f"Build manifest {manifest_path} is out of date. A full build is required."
+        )
+    return manifest
+
+
+###################################################################################
+# DIFF
+
+
+# compares the new manifest to the manifest of the last build
+# returns the names of elements to create, recreate, update and delete for each class
+# elements are recreated if their connections, model or dsl models changed
+def diff_build_manifests(old_manifest, new_manifest):
+    changes = {}
+    for elm_class in incremental_classes.keys():
+        old_elms = old_manifest["classes"].get(elm_class, {})
+        new_elms = new_manifest["classes"].get(elm_class, {})
+        class_changes = {
+            "create": [name for name in new_elms.keys() if name not in old_elms],
+            "delete": [name for name in old_elms.keys() if name not in new_elms],
+            "recreate": [],
+            "update_elm": [],
+            "update_typ": [],
+            "update_dsl": [],
+        }
+        for elm_name, new_fp in new_elms.items():
+            old_fp = old_elms.get(elm_name)
+            if old_fp is None or old_fp == new_fp:
+                continue
+            if (
+                old_fp.get("con") != new_fp.get("con")
+                or old_fp.get("msc") != new_fp.get("msc")
+                or ("typ" in old_fp) != ("typ" in new_fp)
+                or old_fp.get("dsl", {}).keys() != new_fp.get("dsl", {}).keys()
+            ):
+                class_changes["recreate"].append(elm_name)
+                continue
+            if old_fp.get("elm") != new_fp.get("elm"):
+                class_changes["update_elm"].append(elm_name)
+            if old_fp.get("typ") != new_fp.get("typ"):
+                class_changes["update_typ"].append(elm_name)
+            if old_fp.get("dsl") != new_fp.get("dsl"):
+                class_changes["update_dsl"].append(elm_name)
+        changes[elm_class] = class_changes
+    return changes
+
+
+# adds the elements connected to recreated buses to the elements to recreate
+# deleting a bus deletes its cubicles, which disconnects the elements connected to it
+def recreate_bus_dependents(data, changes):
+    bus_names = set(changes["ElmTerm"]["recreate"])
+    if len(bus_names) == 0:
+        return
+    for elm_class in incremental_classes.keys():
+        if elm_class == "ElmTerm":
+            continue
+        class_changes = changes[elm_class]
+        for elm_name, elm_data in data["network"][elm_class].items():
+            if elm_name in class_changes["create"] + class_changes["recreate"]:
+                continue
+            con_values = elm_data.get("con", {}).values()
+            if not any(isinstance(v, str) and v in bus_names for v in con_values):
+                continue
+            class_changes["recreate"].append(elm_name)
+            for update in ["update_elm", "update_typ", "update_dsl"]:
+                if elm_name in class_changes[update]:
+                    class_changes[update].remove(elm_name)
+
+
+###################################################################################
+# PROJECT
+
+
+# prepares the project for an incremental build without cleaning it
+# gets the existing network, equipment library, areas and diagram
+def prepare_project_incremental(app, data, network_name, study_case_name="base_case"):
+    # activate study case
+    study_folder = app.GetProjectFolder("study")
+    study_cases = study_folder.GetContents(f"{study_case_name}.IntCase")
+    if len(study_cases) == 0:
+        raise RuntimeError(f"Study case {study_case_name} not found")
+    study_cases[0].Activate()
+
+    # get network
+    netdat_folder = app.GetProjectFolder("netdat")
+    nets = netdat_folder.GetContents(f"{network_name}_grid.ElmNet")
+    if len(nets) == 0:
+        raise RuntimeError(f"Network {network_name}_grid not found")
+    net = nets[0]
+    net.Activate()
+
+    data["directories"] = {
+        "net": net,
+        "elib": app.GetProjectFolder("equip"),
+    }
+
+    # get diagram if it exists
+    dia_folder = app.GetProjectFolder("dia")
+    digs = dia_folder.GetContents(f"{net.loc_name}_diagram.IntGrfnet")
+    if len(digs) != 0:
+        data["directories"]["dig"] = digs[0]
+
+    # get existing areas
+    area_folder = app.GetDataFolder("ElmArea")
+    if area_folder is not None:
+        data["areas"] = {area.loc_name: area for area in area_folder.GetContents()}
+
+    app.PrintInfo("Project prepared for incremental build")
+    return data
+
+
+# adds existing network objects to the data dictionary
+def get_existing_objects(app, data, elm_class):
+    net = data["directories"]["net"]
+    existing = {elm.loc_name: elm for elm in net.GetContents(f"*.{elm_class}", 1)}
+    for elm_name, elm_data in data["network"][elm_class].items():
+        if elm_name in existing:
+            elm_data["object"] = existing[elm_name]
+    return existing
+
+
+###################################################################################
+# APPLY CHANGES
+
+
+# deletes an element with its cubicles, type, composite model and graphic
+def delete_element(app, data, elm, elm_class):
+    elm_name = elm.loc_name
+
+    # get connected objects before the element is deleted
+    related = []
+    for connection_attribute in incremental_classes[elm_class]:
+        cub = elm.GetAttribute(connection_attribute)
+        if cub is not None:
+            related.append(cub)
+    # shared types are kept as other elements may use them
+    if elm_class in type_classes and elm.typ_id is not None:
+        if not is_shared_type(elm, elm.typ_id):
+            related.append(elm.typ_id)
+    if elm.HasAttribute("c_pmod") and elm.c_pmod is not None:
+        related.append(elm.c_pmod)
+    if "dig" in data["directories"]:
+        related.extend(data["directories"]["dig"].GetContents(f"grf_{elm_name}.IntGrf"))
+
+    elm.Delete()
+    for obj in related:
+        obj.Delete()
+
+
+# sets element parameters on an existing element
+def update_element(app, data, elm_data, elm, elm_class):
+    elm_params = dict(elm_data["elm"])
+    if elm_class == "ElmTerm" and "cpArea" in elm_params:
+        # area names are replaced by the area objects
+        areas = data.get("areas", {})
+        if elm_params["cpArea"] in areas:
+            elm_params["cpArea"] = areas[elm_params["cpArea"]]
+        else:
+            del elm_params["cpArea"]
+    params = list(elm_params.keys())
+    values = list(elm_params.values())
+    define_transfer_attributes(app, elm_class, params)
+    set_attributes(elm, values)
+
+
+# sets type parameters on the existing type of an element
+# shared types are not modified, the element is assigned a type matching its new typ block
+def update_type(app, data, elm_data, elm, elm_class):
+    elm_type = elm.typ_id
+    if elm_type is None or is_shared_type(elm, elm_type):
+        make_type(
+            app, data["directories"]["elib"], elm_data, elm, type_classes[elm_class]
+        )
+        return
+    params = list(elm_data["typ"].keys())
+    values = list(elm_data["typ"].values())
+    define_transfer_attributes(app, type_classes[elm_class], params)
+    set_attributes(elm_type, values)
+
+
+# sets dsl parameters on the existing dsls of a generator's composite model
+def update_dsls(app, elm_data, elm):
+    comp_model = elm.c_pmod
+    if comp_model is None:
+        raise RuntimeError(f"Composite model of {elm.loc_name} not found")
+    for dsl_data in elm_data["dsl"].values():
+        dsl_name = dsl_data["elm"]["loc_name"]
+        dsls = comp_model.GetContents(f"{dsl_name}.ElmDsl", 1)
+        if len(dsls) == 0:
+            raise RuntimeError(f"DSL {dsl_name} of {elm.loc_name} not found")
+        set_dsl_parameters(app, dsls[0], dsl_data)
+
+
+# makes graphics for newly made elements, if the network has a diagram
+def make_grfs_for_elements(app, data, elm_class, elm_names):
+    if "dig" not in data["directories"]:
+        return
+    dig = data["directories"]["dig"]
+    for elm_name in elm_names:
+        elm_data = data["network"][elm_class][elm_name]
+        if "grf" not in elm_data.keys():
+            continue
+        grf = make_IntGrf_single_pass(app, dig, elm_data)
+        for gco_name, rX, rY in get_gco_points(elm_data):
+            make_IntGrfcon_single_pass(app, grf, rX, rY, gco_name=gco_name)
+
+
+# reconnects generators to recreated station controllers
+def reconnect_station_controllers(app, data, stactrl_names):
+    for gen_class in ["ElmSym", "ElmGenstat", "ElmPvsys"]:
+        for elm_data in data["network"][gen_class].values():
+            stactrl_name = elm_data.get("con", {}).get("stactrl")
+            if stactrl_name in stactrl_names and "object" in elm_data:
+                set_attribute(
+                    elm_data["object"],
+                    "c_pstac",
+                    data["network"]["ElmStactrl"][stactrl_name]["object"],
+                )
+
+
+# updates the existing network to match the parsed data
+# only elements that changed since the last build (stored in the manifest) are modified
+# data must contain the parsed network, dynamic models and the project directories
+# (see prepare_project_incremental)
+def build_network_incrementally(app, data, manifest_path):
+    ts = perf_counter()
+    new_manifest = make_build_manifest(data)
+    old_manifest = read_build_manifest(app, manifest_path)
+    changes = diff_build_manifests(old_manifest, new_manifest)
+    recreate_bus_dependents(data, changes)
+
+    # delete removed and recreated elements, in reverse build order so that
+    # elements are deleted before the buses they are connected to
+    existing = {}
+    for elm_class in reversed(list(incremental_classes.keys())):
+        existing[elm_class] = get_existing_objects(app, data, elm_class)
+        for elm_name in changes[elm_class]["delete"] + changes[elm_class]["recreate"]:
+            if elm_name in existing[elm_class]:
+                delete_element(app, data, existing[elm_class][elm_name], elm_class)
+            if elm_name in data["network"][elm_class]:
+                data["network"][elm_class][elm_name].pop("object", None)
+
+    # create, recreate and update elements in build order
+    for elm_class in incremental_classes.keys():
+        tc = perf_counter()
+        class_changes = changes[elm_class]
+
+        # elements missing from the project are also made
+        to_make = class_changes["create"] + class_changes["recreate"]
+        to_make += [
+            elm_name
+            for elm_name in data["network"][elm_class].keys()
+            if elm_name not in existing[elm_class] and elm_name not in to_make
+        ]
+        if len(to_make) != 0:
+            make_functions[elm_class](app, data, elm_names=to_make)
+            make_grfs_for_elements(app, data, elm_class, to_make)
+        if elm_class == "ElmStactrl" and len(class_changes["recreate"]) != 0:
+            reconnect_station_controllers(app, data, class_changes["recreate"])
+
+        # update changed elements in place
+        for elm_name in class_changes["update_typ"]:
+            elm_data = data["network"][elm_class][elm_name]
+            update_type(app, data, elm_data, elm_data["object"], elm_class)
+        for elm_name in class_changes["update_elm"]:
+            elm_data = data["network"][elm_class][elm_name]
+            update_element(app, data, elm_data, elm_data["object"], elm_class)
+        for elm_name in class_changes["update_dsl"]:
+            elm_data = data["network"][elm_class][elm_name]
+            update_dsls(app, elm_data, elm_data["object"])
+
+        n_updated = len(
+            set(
+                class_changes["update_elm"]
+                + class_changes["update_typ"]
+                + class_changes["update_dsl"]
+            )
+        )
+        if len(to_make) + len(class_changes["delete"]) + n_updated != 0:
+            app.PrintInfo(
+                f"{elm_class}: {len(to_make)} made, {n_updated} updated, "
+                f"{len(class_changes['delete'])} deleted in: \t{round(perf_counter() - tc, 2)}"
+            )
+
+    # record the state of the network for the next build
+    write_build_manifest(app, new_manifest, manifest_path)
+    app.PrintInfo(f"Incremental build finished in: \t{round(perf_counter() - ts, 2)}")
@@ -1,5 +1,7 @@
 import powerfactory
 
+from .build_instrumentation import create_object, set_attribute
+
 
 # delete existing networks, study cases and equipment types
 def clean_project(app):
@@ -43,8 +45,8 @@ def clean_project(app):
 # create study case
 def create_study_case(app, study_case_name):
     study_folder = app.GetProjectFolder("study")
-    study_case = study_folder.CreateObject("IntCase")
-    study_case.loc_name = study_case_name
+    study_case = create_object(study_folder, "IntCase")
+    set_attribute(study_case, "loc_name", study_case_name)
     study_case.Activate()
     return study_case
 
@@ -52,9 +54,9 @@ def create_study_case(app, study_case_name):
 # create new network ElmNet object
 def create_network(app, network_name, freq):
     netdat_folder = app.GetProjectFolder("netdat")
-    net = netdat_folder.CreateObject("ElmNet")
-    net.loc_name = f"{network_name}_grid"
-    net.SetAttribute("frnom", freq)
+    net = create_object(netdat_folder, "ElmNet")
+    set_attribute(net, "loc_name", f"{network_name}_grid")
+    set_attribute(net, "frnom", freq)
     net.Activate()
     return net
 
@@ -75,7 +77,7 @@ def set_input_options(app, input_options):
 
     # create input options folder if it doesn't exist
     if len(settings_folder.GetContents("*.IntOpt")) == 0:
-        int_opt = settings_folder.CreateObject("IntOpt")
+        int_opt = create_object(settings_folder, "IntOpt")
     else:  # delete existing input options
         int_opt = settings_folder.GetContents("*.IntOpt")[0]
         for x in int_opt.GetContents():
@@ -83,9 +85,9 @@ def set_input_options(app, input_options):
 
     # set input options
     for opt, attrs in input_options.items():
-        opt_obj = int_opt.CreateObject(opt)
+        opt_obj = create_object(int_opt, opt)
         for attr, val in attrs.items():
-            opt_obj.SetAttribute(attr, val)
+            set_attribute(opt_obj, attr, val)
 
 
 # delete all existing data in the network
@@ -103,7 +105,7 @@ def prepare_project(
 ):
     # add scenairo to project description
     prj = app.GetActiveProject()
-    prj.SetAttribute("desc", desc)
+    set_attribute(prj, "desc", desc)
 
     # delete existing networks, study cases, operation scenarios and equipment types
     clean_project(app)
@@ -9,245 +9,259 @@ importlib.reload(make_single_network_element)
 from .make_single_network_element import *
 
 
-def make_all_ElmTerm(app, data):
-    ts = perf_counter()
-    #  get areas folder if it exists
-    if "areas" in data.keys():
-        areas = data["areas"]
+# returns the data of the elements of elm_class to make
+# all elements are made if elm_names is None
+# elements are grouped by attribute signature so transfer attributes are defined once per group
+def get_elms_to_make(data, elm_class, elm_names=None):
+    if elm_names is None:
+        elms_data = list(data["network"][elm_class].values())
     else:
-        areas = None
-
-    # make All elements of class ElmTerms
-    net = data["directories"]["net"]
-    for bus_data in data["network"]["ElmTerm"].values():
-        #   bus is added to data dictionary for future reference
-        bus_data["object"] = make_ElmTerm(app, net, bus_data, areas)
-    app.PrintInfo(
-        f"All elements of class ElmTerm made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
-
-
-def make_all_ElmStactrl(app, data):
-    ts = perf_counter()
-
-    # make All elements of class ElmStactrls
-    net = data["directories"]["net"]
-    for stactrl_data in data["network"]["ElmStactrl"].values():
-        # get connected bus objects
-        bus = data["network"]["ElmTerm"][stactrl_data["con"]["bus"]]["object"]
-
-        #   stactrl is added to data dictionary for future reference
-        stactrl_data["object"] = make_ElmStactrl(app, net, stactrl_data, bus)
-    app.PrintInfo(
-        f"All elements of class ElmStactrl made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
-
-
-def make_all_ElmLne(app, data):
-    ts = perf_counter()
-    # get network folder and equipment library
-    net = data["directories"]["net"]
-    elib = data["directories"]["elib"]
-    for elm_data in data["network"]["ElmLne"].values():
-        # get connected bus objects
-        bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
-        bus2 = data["network"]["ElmTerm"][elm_data["con"]["bus2"]]["object"]
-        make_ElmLne(app, net, elib, elm_data, bus1, bus2)
-    app.PrintInfo(
-        f"All elements of class ElmLne made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
-
-
-def make_all_ElmTr2(app, data):
-    ts = perf_counter()
-    # get network folder and equipment library
-    net = data["directories"]["net"]
-    elib = data["directories"]["elib"]
-    for elm_data in data["network"]["ElmTr2"].values():
-        # get connected bus objects
-        buslv = data["network"]["ElmTerm"][elm_data["con"]["buslv"]]["object"]
-        bushv = data["network"]["ElmTerm"][elm_data["con"]["bushv"]]["object"]
-        make_ElmTr2(app, net, elib, elm_data, buslv, bushv)
-    app.PrintInfo(
-        f"All elements of class ElmTr2 made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
-
-
-def make_all_ElmLod(app, data):
-    ts = perf_counter()
-    # get network folder and equipment library
-    net = data["directories"]["net"]
-    elib = data["directories"]["elib"]
-    for elm_data in data["network"]["ElmLod"].values():
-        # get connected bus objects
-        bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
-        # make load
-        load = make_ElmLod(app, net, elib, elm_data, bus1)
-    app.PrintInfo(
-        f"All elements of class ElmLod made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
-
-
-def make_all_ElmShnt(app, data):
-    ts = perf_counter()
-    # get network folder
-    net = data["directories"]["net"]
-    for elm_data in data["network"]["ElmShnt"].values():
-        # get connected bus objects
-        bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
-        # make shunt
-        make_ElmShnt(app, net, elm_data, bus1)
-    app.PrintInfo(
-        f"All elements of class ElmShnt made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
+        elms_data = [data["network"][elm_class][elm_name] for elm_name in elm_names]
+    return group_by_signature(elms_data)
 
 
-# also makes all controllers connected to the generator
-def make_all_ElmSym(app, data):
-    ts = perf_counter()
-    # get network folder
-    net = data["directories"]["net"]
-    elib = data["directories"]["elib"]
-
-    for elm_data in data["network"]["ElmSym"].values():
-        name = elm_data["elm"]["loc_name"]
-        # get connected bus objects
-        bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
-
-        # make synchronous machine models with controls or synchronous condensers
-        if elm_data["msc"]["powerfactory_model"] in [
-            "thermal_generator",
-            "hydro_generator",
-        ]:
-            make_synchronous_generator(
-                app,
-                net,
-                elib,
-                elm_data,
-                bus1,
-                get_station_controller(app, data["network"]["ElmStactrl"], elm_data),
-                data["composite_model_frames"][elm_data["msc"]["frame_type"]],
-                data["dsl_model_types"][elm_data["msc"]["avr"]],
-                data["dsl_model_types"][elm_data["msc"]["gov"]],
-                data["dsl_model_types"][elm_data["msc"]["pss"]],
-            )
-        elif elm_data["msc"]["powerfactory_model"] == "synchronous_condenser":
-            # create synchronous condenser
-            make_ElmSym(
-                app,
-                net,
-                elib,
-                elm_data,
-                bus1,
-                get_station_controller(app, data["network"]["ElmStactrl"], elm_data),
-            )
+def make_all_ElmTerm(app, data, elm_names=None):
+    with build_stage(app, "ElmTerm"):
+        #  get areas folder if it exists
+        if "areas" in data.keys():
+            areas = data["areas"]
         else:
-            raise ValueError(
-                f"Error creating ElmSym {name}. powerfactory_model {elm_data['msc']['powerfactory_model']} not recognised"
-            )
-    app.PrintInfo(
-        f"All elements of class ElmSym made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
+            areas = None
+
+        # make All elements of class ElmTerms
+        net = data["directories"]["net"]
+        for bus_data in get_elms_to_make(data, "ElmTerm", elm_names):
+            ts = perf_counter()
+            #   bus is added to data dictionary for future reference
+            bus_data["object"] = make_ElmTerm(app, net, bus_data, areas)
+            record_element(bus_data["elm"]["loc_name"], ts)
+
+
+def make_all_ElmStactrl(app, data, elm_names=None):
+    with build_stage(app, "ElmStactrl"):
+        # make All elements of class ElmStactrls
+        net = data["directories"]["net"]
+        for stactrl_data in get_elms_to_make(data, "ElmStactrl", elm_names):
+            ts = perf_counter()
+            # get connected bus objects
+            bus = data["network"]["ElmTerm"][stactrl_data["con"]["bus"]]["object"]
+
+            #   stactrl is added to data dictionary for future reference
+            stactrl_data["object"] = make_ElmStactrl(app, net, stactrl_data, bus)
+            record_element(stactrl_data["elm"]["loc_name"], ts)
+
+
+def make_all_ElmLne(app, data, elm_names=None):
+    with build_stage(app, "ElmLne"):
+        # get network folder and equipment library
+        net = data["directories"]["net"]
+        elib = data["directories"]["elib"]
+        for elm_data in get_elms_to_make(data, "ElmLne", elm_names):
+            ts = perf_counter()
+            # get connected bus objects
+            bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
+            bus2 = data["network"]["ElmTerm"][elm_data["con"]["bus2"]]["object"]
+            make_ElmLne(app, net, elib, elm_data, bus1, bus2)
+            record_element(elm_data["elm"]["loc_name"], ts)
+
+
+def make_all_ElmTr2(app, data, elm_names=None):
+    with build_stage(app, "ElmTr2"):
+        # get network folder and equipment library
+        net = data["directories"]["net"]
+        elib = data["directories"]["elib"]
+        for elm_data in get_elms_to_make(data, "ElmTr2", elm_names):
+            ts = perf_counter()
+            # get connected bus objects
+            buslv = data["network"]["ElmTerm"][elm_data["con"]["buslv"]]["object"]
+            bushv = data["network"]["ElmTerm"][elm_data["con"]["bushv"]]["object"]
+            make_ElmTr2(app, net, elib, elm_data, buslv, bushv)
+            record_element(elm_data["elm"]["loc_name"], ts)
+
+
+def make_all_ElmLod(app, data, elm_names=None):
+    with build_stage(app, "ElmLod"):
+        # get network folder and equipment library
+        net = data["directories"]["net"]
+        elib = data["directories"]["elib"]
+        for elm_data in get_elms_to_make(data, "ElmLod", elm_names):
+            ts = perf_counter()
+            # get connected bus objects
+            bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
+            # make load
+            load = make_ElmLod(app, net, elib, elm_data, bus1)
+            record_element(elm_data["elm"]["loc_name"], ts)
+
+
+def make_all_ElmShnt(app, data, elm_names=None):
+    with build_stage(app, "ElmShnt"):
+        # get network folder
+        net = data["directories"]["net"]
+        for elm_data in get_elms_to_make(data, "ElmShnt", elm_names):
+            ts = perf_counter()
+            # get connected bus objects
+            bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
+            # make shunt
+            make_ElmShnt(app, net, elm_data, bus1)
+            record_element(elm_data["elm"]["loc_name"], ts)
 
 
-# includes  all wind turbine generators and static generators
-def make_all_ElmGenstat(app, data):
-    ts = perf_counter()
-    # get network folder
-    net = data["directories"]["net"]
-
-    for elm_data in data["network"]["ElmGenstat"].values():
-        name = elm_data["elm"]["loc_name"]
-        # get connected bus objects
-        bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
-
-        # get voltage source reference model if required
-        vsr_model = (
-            data["dsl_model_types"]["VSR"]
-            if elm_data["msc"]["powerfactory_model"].endswith("_vsr")
-            else False
-        )
-
-        # make wtg models and controllers
-        if elm_data["msc"]["powerfactory_model"] in [
-            "WECC_WTG_type_3",
-            "WECC_WTG_type_4A",
-            "WECC_WTG_type_4B",
-        ]:
-            make_WECC_wtg(
-                app,
-                net,
-                elm_data,
-                bus1,
-                get_station_controller(app, data["network"]["ElmStactrl"], elm_data),
-                data["composite_model_frames"][elm_data["msc"]["frame_type"]],
-                data["dsl_model_types"],
-                plant_control_frame=data["composite_model_frames"][
-                    "Frame WECC Plant Control"
-                ],
-            )
-        elif elm_data["msc"]["powerfactory_model"] == "static_generator":
-            # create synchronous condenser
-            make_ElmGenstat(
-                app,
-                net,
-                elm_data,
-                bus1,
-                get_station_controller(app, data["network"]["ElmStactrl"], elm_data),
-            )
-        else:
-            raise ValueError(
-                f"Error creating ElmGenstat {name}. powerfactory_model {elm_data['msc']['powerfactory_model']} not recognised"
-            )
+# also makes all controllers connected to the generator
+def make_all_ElmSym(app, data, elm_names=None):
+    with build_stage(app, "ElmSym"):
+        # get network folder
+        net = data["directories"]["net"]
+        elib = data["directories"]["elib"]
+
+        for elm_data in get_elms_to_make(data, "ElmSym", elm_names):
+            ts = perf_counter()
+            name = elm_data["elm"]["loc_name"]
+            # get connected bus objects
+            bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
+
+            # make synchronous machine models with controls or synchronous condensers
+            if elm_data["msc"]["powerfactory_model"] in [
+                "thermal_generator",
+                "hydro_generator",
+            ]:
+                make_synchronous_generator(
+                    app,
+                    net,
+                    elib,
+                    elm_data,
+                    bus1,
+                    get_station_controller(
+                        app, data["network"]["ElmStactrl"], elm_data
+                    ),
+                    data["composite_model_frames"][elm_data["msc"]["frame_type"]],
+                    data["dsl_model_types"][elm_data["msc"]["avr"]],
+                    data["dsl_model_types"][elm_data["msc"]["gov"]],
+                    data["dsl_model_types"][elm_data["msc"]["pss"]],
+                )
+            elif elm_data["msc"]["powerfactory_model"] == "synchronous_condenser":
+                # create synchronous condenser
+                make_ElmSym(
+                    app,
+                    net,
+                    elib,
+                    elm_data,
+                    bus1,
+                    get_station_controller(
+                        app, data["network"]["ElmStactrl"], elm_data
+                    ),
+                )
+            else:
+                raise ValueError(
+                    f"Error creating ElmSym {name}. powerfactory_model {elm_data['msc']['powerfactory_model']} not recognised"
+                )
+            record_element(elm_data["elm"]["loc_name"], ts)
+        # patch the dsls of machines copied from templates
+        flush_template_patches(app)
 
-    app.PrintInfo(
-        f"All elements of class ElmGenstat made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
-
-
-def make_all_ElmPvsys(app, data):
-    ts = perf_counter()
-    # get network folder
-    net = data["directories"]["net"]
-
-    for elm_data in data["network"]["ElmPvsys"].values():
-        name = elm_data["elm"]["loc_name"]
-        # get connected bus objects
-        bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
-
-        # make pv generators
-        if elm_data["msc"]["powerfactory_model"] == "WECC_PV":
-            make_WECC_large_scale_pv(
-                app,
-                net,
-                elm_data,
-                bus1,
-                get_station_controller(app, data["network"]["ElmStactrl"], elm_data),
-                data["composite_model_frames"][elm_data["msc"]["frame_type"]],
-                data["dsl_model_types"],
-                plant_control_frame=data["composite_model_frames"][
-                    "Frame WECC Plant Control"
-                ],
-            )
-        else:
-            raise ValueError(
-                f"Error creating ElmPvsys {name}. powerfactory_model {elm_data['msc']['powerfactory_model']} not recognised"
+
+# includes  all wind turbine generators and static generators
+def make_all_ElmGenstat(app, data, elm_names=None):
+    with build_stage(app, "ElmGenstat"):
+        # get network folder
+        net = data["directories"]["net"]
+
+        for elm_data in get_elms_to_make(data, "ElmGenstat", elm_names):
+            ts = perf_counter()
+            name = elm_data["elm"]["loc_name"]
+            # get connected bus objects
+            bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
+
+            # get voltage source reference model if required
+            vsr_model = (
+                data["dsl_model_types"]["VSR"]
+                if elm_data["msc"]["powerfactory_model"].endswith("_vsr")
+                else False
             )
 
-    app.PrintInfo(
-        f"All elements of class ElmPvsys made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
-
-
-def make_all_ElmSvs(app, data):
-    ts = perf_counter()
-    # get network folder and equipment library
-    net = data["directories"]["net"]
-    for elm_data in data["network"]["ElmSvs"].values():
-        # get connected bus objects
-        bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
-        # make load
-        make_ElmSvs(app, net, elm_data, bus1)
-    app.PrintInfo(
-        f"All elements of class ElmSvs made in: \t\t{round(perf_counter() - ts, 2)}"
-    )
+            # make wtg models and controllers
+            if elm_data["msc"]["powerfactory_model"] in [
+                "WECC_WTG_type_3",
+                "WECC_WTG_type_4A",
+                "WECC_WTG_type_4B",
+            ]:
+                make_WECC_wtg(
+                    app,
+                    net,
+                    elm_data,
+                    bus1,
+                    get_station_controller(
+                        app, data["network"]["ElmStactrl"], elm_data
+                    ),
+                    data["composite_model_frames"][elm_data["msc"]["frame_type"]],
+                    data["dsl_model_types"],
+                    plant_control_frame=data["composite_model_frames"][
+                        "Frame WECC Plant Control"
+                    ],
+                )
+            elif elm_data["msc"]["powerfactory_model"] == "static_generator":
+                # create synchronous condenser
+                make_ElmGenstat(
+                    app,
+                    net,
+                    elm_data,
+                    bus1,
+                    get_station_controller(
+                        app, data["network"]["ElmStactrl"], elm_data
+                    ),
+                )
+            else:
+                raise ValueError(
+                    f"Error creating ElmGenstat {name}. powerfactory_model {elm_data['msc']['powerfactory_model']} not recognised"
+                )
+            record_element(elm_data["elm"]["loc_name"], ts)
+        # patch the dsls of plants copied from templates
+        flush_template_patches(app)
+
+
+def make_all_ElmPvsys(app, data, elm_names=None):
+    with build_stage(app, "ElmPvsys"):
+        # get network folder
+        net = data["directories"]["net"]
+
+        for elm_data in get_elms_to_make(data, "ElmPvsys", elm_names):
+            ts = perf_counter()
+            name = elm_data["elm"]["loc_name"]
+            # get connected bus objects
+            bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
+
+            # make pv generators
+            if elm_data["msc"]["powerfactory_model"] == "WECC_PV":
+                make_WECC_large_scale_pv(
+                    app,
+                    net,
+                    elm_data,
+                    bus1,
+                    get_station_controller(
+                        app, data["network"]["ElmStactrl"], elm_data
+                    ),
+                    data["composite_model_frames"][elm_data["msc"]["frame_type"]],
+                    data["dsl_model_types"],
+                    plant_control_frame=data["composite_model_frames"][
+                        "Frame WECC Plant Control"
+                    ],
+                )
+            else:
+                raise ValueError(
+                    f"Error creating ElmPvsys {name}. powerfactory_model {elm_data['msc']['powerfactory_model']} not recognised"
+                )
+            record_element(elm_data["elm"]["loc_name"], ts)
+        # patch the dsls of plants copied from templates
+        flush_template_patches(app)
+
+
+def make_all_ElmSvs(app, data, elm_names=None):
+    with build_stage(app, "ElmSvs"):
+        # get network folder and equipment library
+        net = data["directories"]["net"]
+        for elm_data in get_elms_to_make(data, "ElmSvs", elm_names):
+            ts = perf_counter()
+            # get connected bus objects
+            bus1 = data["network"]["ElmTerm"][elm_data["con"]["bus1"]]["object"]
+            # make load
+            make_ElmSvs(app, net, elm_data, bus1)
+            record_element(elm_data["elm"]["loc_name"], ts)
@@ -1,12 +1,107 @@
+import csv
+import json
+import hashlib
+from pathlib import Path
+import importlib
 import powerfactory
 
+from pf_utils import transfer_signatures
+
+from . import build_instrumentation
+
+importlib.reload(transfer_signatures)
+importlib.reload(build_instrumentation)
+
+from pf_utils.transfer_signatures import (
+    transfer_attributes,
+    reset_transfer_attributes,
+    report_transfer_attributes,
+)
+from .build_instrumentation import *
+
+
+# defines the transfer attributes of a class, unless they are already defined
+# the defined signatures are kept in pf_utils/transfer_signatures.py, which the batched writes
+# and bulk reads of pf_utils also define through
+def define_transfer_attributes(app, elm_class, params):
+    if transfer_signatures.define_transfer_attributes(app, elm_class, params):
+        count_calls(DefineTransferAttributes=1)
+
+
+# orders element data so that elements with the same attribute signature are consecutive
+# the original order is kept within each signature
+def group_by_signature(elms_data, groups=("elm", "typ")):
+    signature_order = {}
+    for elm_data in elms_data:
+        signature = tuple(
+            tuple(elm_data[group].keys()) if group in elm_data else ()
+            for group in groups
+        )
+        signature_order.setdefault(signature, []).append(elm_data)
+    return [elm_data for group in signature_order.values() for elm_data in group]
+
+
+# equipment types shared between elements with identical type parameters
+# when enabled, make_type makes one type per distinct typ block instead of one per element
+shared_types = {
+    "enabled": False,
+    "types": {},  # shared type name: type object
+    "mapping": {},  # element name: (type class, shared type name)
+}
+
+
+# clears the shared types and enables or disables type sharing
+def reset_shared_types(enabled=False):
+    shared_types["enabled"] = enabled
+    shared_types["types"] = {}
+    shared_types["mapping"] = {}
+
+
+# returns the name of the shared type of a typ block
+# names are derived from a hash of the type parameters, so the same block always gets the same name
+def get_shared_type_name(elm_data, type_class):
+    typ_json = json.dumps(elm_data["typ"], sort_keys=True, default=str)
+    typ_hash = hashlib.blake2b(typ_json.encode(), digest_size=8).hexdigest()
+    return f"t_{type_class}_{typ_hash}"
+
+
+# returns true if a type is used by other elements than elm
+def is_shared_type(elm, elm_type):
+    return elm_type.loc_name != f"t_{elm.loc_name}"
+
+
+# returns the default shared types report path for the active project
+def get_shared_types_report_path(app, data_dir):
+    project_name = app.GetActiveProject().loc_name
+    return Path(data_dir) / ".build_manifests" / f"{project_name}_shared_types.csv"
+
+
+# writes the element to shared type mapping to a csv and prints the number of types per class
+def write_shared_types_report(app, report_path):
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    n_elements = {}
+    n_types = {}
+    with open(report_path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["element", "type_class", "type"])
+        for elm_name, (type_class, type_name) in shared_types["mapping"].items():
+            writer.writerow([elm_name, type_class, type_name])
+            n_elements[type_class] = n_elements.get(type_class, 0) + 1
+            n_types.setdefault(type_class, set()).add(type_name)
+    for type_class in sorted(n_elements.keys()):
+        app.PrintInfo(
+            f"{type_class}: \t{n_elements[type_class]} elements share {len(n_types[type_class])} types"
+        )
+    app.PrintInfo(f"Shared types report written to {report_path}")
+
 
 def make_cub_and_sw(app, bus, name):
-    cub = bus.CreateObject("StaCubic")
-    cub.loc_name = f"c_{bus.loc_name}_{name}"
-    sw = cub.CreateObject("StaSwitch")
-    sw.loc_name = f"sw_{bus.loc_name}_{name}"
-    sw.on_off = 1
+    cub = create_object(bus, "StaCubic")
+    set_attribute(cub, "loc_name", f"c_{bus.loc_name}_{name}")
+    sw = create_object(cub, "StaSwitch")
+    set_attribute(sw, "loc_name", f"sw_{bus.loc_name}_{name}")
+    set_attribute(sw, "on_off", 1)
     return cub, sw
 
 
@@ -14,56 +109,87 @@ def connect_to_bus(app, elm, bus, connection_attribute="bus1"):
     #  create cubicle
     (cub, sw) = make_cub_and_sw(app, bus, elm.loc_name)
     # connect element and cubicle
-    elm.SetAttribute(connection_attribute, cub)
-    cub.SetAttribute("obj_id", elm)
+    set_attribute(elm, connection_attribute, cub)
+    set_attribute(cub, "obj_id", elm)
 
 
 def make_type(app, elib, elm_data, elm, type_class):
+    if shared_types["enabled"]:
+        return make_shared_type(app, elib, elm_data, elm, type_class)
+
     #   create type and assign to element
-    misc_type = elib.CreateObject(type_class)
-    elm.typ_id = misc_type
-    misc_type.loc_name = f"t_{elm_data['elm']['loc_name']}"
+    misc_type = create_object(elib, type_class)
+    set_attribute(elm, "typ_id", misc_type)
+    set_attribute(misc_type, "loc_name", f"t_{elm_data['elm']['loc_name']}")
+    set_type_attributes(app, elm_data, misc_type, type_class)
+    return misc_type
 
+
+# assigns the shared type of the element's typ block, making it if it doesn't exist
+def make_shared_type(app, elib, elm_data, elm, type_class):
+    type_name = get_shared_type_name(elm_data, type_class)
+    if type_name not in shared_types["types"].keys():
+        # types made in previous builds are reused
+        existing_types = elib.GetContents(f"{type_name}.{type_class}")
+        if len(existing_types) != 0:
+            shared_types["types"][type_name] = existing_types[0]
+        else:
+            misc_type = create_object(elib, type_class)
+            set_attribute(misc_type, "loc_name", type_name)
+            set_type_attributes(app, elm_data, misc_type, type_class)
+            shared_types["types"][type_name] = misc_type
+    set_attribute(elm, "typ_id", shared_types["types"][type_name])
+    shared_types["mapping"][elm_data["elm"]["loc_name"]] = (type_class, type_name)
+    return shared_types["types"][type_name]
+
+
+def set_type_attributes(app, elm_data, misc_type, type_class):
     #   set attributes
     params = list(elm_data["typ"].keys())
     values = list(elm_data["typ"].values())
-    app.DefineTransferAttributes(type_class, ", ".join(params))
+    define_transfer_attributes(app, type_class, params)
     try:
-        misc_type.SetAttributes(values)
+        set_attributes(misc_type, values)
     except:
         app.PrintInfo(f"Error setting attributes for {misc_type.loc_name}.{type_class}")
         #   so that it actually flags which one is a problem
         for p, v in zip(params, values):
             app.PrintInfo(f"{p} \t {v}")
-            misc_type.SetAttribute(p, v)
-        quit()
-    return misc_type
+            set_attribute(misc_type, p, v)
+        raise RuntimeError(
+            f"Error setting attributes for {misc_type.loc_name}.{type_class}"
+        )
 
 
 def make_element(app, target_dir, elm_data, elm_class):
     #   create element
-    elm = target_dir.CreateObject(elm_class)
+    elm = create_object(target_dir, elm_class)
 
     #   set attributes
     params = list(elm_data["elm"].keys())
     values = list(elm_data["elm"].values())
-    app.DefineTransferAttributes(elm_class, ", ".join(params))
+    define_transfer_attributes(app, elm_class, params)
     try:
-        elm.SetAttributes(values)
+        set_attributes(elm, values)
     except:
         # try setting desc as a list (this commonly causes issues if the description is to long)
         if "desc" in params:
             elm_data["elm"]["desc"] = list(elm_data["elm"]["desc"])
             values = list(elm_data["elm"].values())
-            elm.SetAttributes(values)
+            set_attributes(elm, values)
         else:  #   iterate so that it actually flags which one is a problem
             app.PrintWarn(
                 f"Error setting attributes for {elm_data['elm']['loc_name']}.{elm_class}"
             )
             for p, v in zip(params, values):
                 app.PrintInfo(f"{p} \t {v}")
-                elm.SetAttribute(p, v)
-            quit()
+                set_attribute(elm, p, v)
+            raise RuntimeError(
+                f"Error setting attributes for {elm_data['elm']['loc_name']}.{elm_class}"
+            )
+
+    #   element is added to data dictionary for future reference
+    elm_data["object"] = elm
     return elm
 
 
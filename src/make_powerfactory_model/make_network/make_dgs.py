@@ -0,0 +1,756 @@
+from pathlib import Path
+from array import array
+from time import perf_counter
+import importlib
+import powerfactory
+
+from . import initial_tasks
+from . import parse_csvs
+from . import make_single_network_element
+from . import make_graphic
+from . import incremental_build
+
+importlib.reload(initial_tasks)
+importlib.reload(parse_csvs)
+importlib.reload(make_single_network_element)
+importlib.reload(make_graphic)
+importlib.reload(incremental_build)
+
+from .initial_tasks import *
+from .parse_csvs import *
+from .make_single_network_element import *
+from .make_graphic import *
+from .incremental_build import *
+
+# DGS bulk import
+# Instead of creating every object with CreateObject and SetAttribute, the whole network
+# (elements, types, cubicles, switches, station controllers, composite models, dsls,
+# measurement devices and graphics) is written to a single DGS file and imported with
+# one ComImport. Objects are sorted into the project folders by class on import.
+# Composite model frames and dsl model types are library objects outside the DGS file,
+# so they are linked to the imported composite models and dsls afterwards (link_dgs_objects).
+
+dgs_version = "6.0"
+
+# composite model names of the generator models with dynamic models
+comp_model_names = {
+    "thermal_generator": "Frame SYM {}",
+    "hydro_generator": "Frame SYM {}",
+    "WECC_WTG_type_3": "Frame WECC WTG {}",
+    "WECC_WTG_type_4A": "Frame WECC WTG {}",
+    "WECC_WTG_type_4B": "Frame WECC WTG {}",
+    "WECC_PV": "Frame WECC PV {}",
+}
+synchronous_generator_models = ["thermal_generator", "hydro_generator"]
+
+# dsls that are placed in a WECC plant control composite model
+# (dsls with the slot "Plant Control DSL" in get_WECC_dynamic_models)
+wecc_plant_control_dsls = ["REPC_A", "REPC_C", "REPC_D", "REPC_A_mod"]
+
+# element classes with graphics, in the order used by make_network_diagram
+graphic_classes = [
+    "ElmTerm",
+    "ElmSym",
+    "ElmGenstat",
+    "ElmPvsys",
+    "ElmSvs",
+    "ElmLod",
+    "ElmShnt",
+    "ElmLne",
+    "ElmTr2",
+]
+
+
+# id of another object in the DGS file
+class DgsPointer(str):
+    pass
+
+
+###################################################################################
+# MAKE DGS TABLES
+
+
+# adds an object to the DGS tables and returns its row
+# rows are also stored by class and name so that they can be referenced by later objects
+def add_dgs_object(dgs, elm_class, attributes, fold_id=None):
+    dgs["n_objects"] += 1
+    row = {"ID": str(dgs["n_objects"]), "loc_name": attributes["loc_name"]}
+    if fold_id is not None:
+        row["fold_id"] = DgsPointer(fold_id)
+    row.update(attributes)
+    dgs["tables"].setdefault(elm_class, []).append(row)
+    dgs["rows"].setdefault(elm_class, {})[row["loc_name"]] = row
+    return row
+
+
+# adds a cubicle and switch connecting an element to a bus and returns the cubicle id
+def add_dgs_cubicle(dgs, bus_row, elm_row):
+    bus_name = bus_row["loc_name"]
+    elm_name = elm_row["loc_name"]
+    cub_row = add_dgs_object(
+        dgs,
+        "StaCubic",
+        {"loc_name": f"c_{bus_name}_{elm_name}", "obj_id": DgsPointer(elm_row["ID"])},
+        fold_id=bus_row["ID"],
+    )
+    add_dgs_object(
+        dgs,
+        "StaSwitch",
+        {"loc_name": f"sw_{bus_name}_{elm_name}", "on_off": 1},
+        fold_id=cub_row["ID"],
+    )
+    return cub_row["ID"]
+
+
+# adds the type of an element and returns its id
+# if shared types are enabled, elements with the same typ block share a type
+def add_dgs_type(dgs, elm_data, type_class):
+    elm_name = elm_data["elm"]["loc_name"]
+    if shared_types["enabled"]:
+        type_name = get_shared_type_name(elm_data, type_class)
+        shared_types["mapping"][elm_name] = (type_class, type_name)
+        if type_name in dgs["rows"].get(type_class, {}).keys():
+            return dgs["rows"][type_class][type_name]["ID"]
+    else:
+        type_name = f"t_{elm_name}"
+    type_row = add_dgs_object(
+        dgs, type_class, dict(elm_data["typ"], loc_name=type_name)
+    )
+    return type_row["ID"]
+
+
+# adds the composite model, dsls and measurement devices of a generator
+# dsl parameters are set when the dsl model types are linked after the import
+def add_dgs_composite_model(dgs, elm_data, elm_row, bus_row, cub_id, net_id):
+    model = elm_data["msc"]["powerfactory_model"]
+    name = elm_row["loc_name"]
+    comp_row = add_dgs_object(
+        dgs,
+        "ElmComp",
+        {"loc_name": comp_model_names[model].format(name)},
+        fold_id=net_id,
+    )
+
+    # synchronous machines only have an avr, governor and pss
+    if model in synchronous_generator_models:
+        dsl_names = [elm_data["msc"][dsl] for dsl in ["avr", "gov", "pss"]]
+    else:
+        dsl_names = list(elm_data["dsl"].keys())
+    for dsl_name in dsl_names:
+        add_dgs_object(
+            dgs,
+            "ElmDsl",
+            {"loc_name": elm_data["dsl"][dsl_name]["elm"]["loc_name"]},
+            fold_id=comp_row["ID"],
+        )
+    if model in synchronous_generator_models:
+        return
+
+    # measurement devices of the WECC models
+    add_dgs_object(
+        dgs,
+        "StaPqmea",
+        {
+            "loc_name": f"pq_meas_{name}",
+            "pcubic": DgsPointer(cub_id),
+            "i_mode": 1,
+            "i_orient": 1,
+            "iAstabint": 1,
+        },
+        fold_id=comp_row["ID"],
+    )
+    add_dgs_object(
+        dgs,
+        "StaVmea",
+        {
+            "loc_name": f"v_meas_{name}",
+            "pbusbar": DgsPointer(bus_row["ID"]),
+            "iOutput": 0,
+            "i_mode": 1,
+            "iAstabint": 1,
+        },
+        fold_id=comp_row["ID"],
+    )
+
+    # plant control composite model, using the measurement devices of the generator
+    if any(dsl_name in wecc_plant_control_dsls for dsl_name in dsl_names):
+        plant_control_name = f"Frame WECC Plant Control {name}"
+        plant_control_row = add_dgs_object(
+            dgs, "ElmComp", {"loc_name": plant_control_name}, fold_id=comp_row["ID"]
+        )
+        add_dgs_object(
+            dgs,
+            "StaImea",
+            {
+                "loc_name": f"i_meas_{plant_control_name}",
+                "pcubic": DgsPointer(cub_id),
+                "i_mode": 1,
+            },
+            fold_id=plant_control_row["ID"],
+        )
+
+
+# adds all elements of a class, with their cubicles, types and composite models
+def add_dgs_elements(dgs, data, elm_class, net_id):
+    for elm_data in data["network"][elm_class].values():
+        elm_params = dict(elm_data["elm"])
+
+        # area names are replaced by the areas
+        if elm_class == "ElmTerm" and "cpArea" in elm_params:
+            area_name = elm_params["cpArea"]
+            elm_params["cpArea"] = DgsPointer(dgs["rows"]["ElmArea"][area_name]["ID"])
+        elm_row = add_dgs_object(dgs, elm_class, elm_params, fold_id=net_id)
+
+        # connect to buses
+        for connection_attribute in incremental_classes[elm_class]:
+            bus_row = dgs["rows"]["ElmTerm"][elm_data["con"][connection_attribute]]
+            cub_id = add_dgs_cubicle(dgs, bus_row, elm_row)
+            elm_row[connection_attribute] = DgsPointer(cub_id)
+        if elm_class == "ElmStactrl":
+            bus_row = dgs["rows"]["ElmTerm"][elm_data["con"]["bus"]]
+            elm_row["rembar"] = DgsPointer(bus_row["ID"])
+
+        # make type
+        if "typ" in elm_data.keys() and elm_class in type_classes.keys():
+            type_id = add_dgs_type(dgs, elm_data, type_classes[elm_class])
+            elm_row["typ_id"] = DgsPointer(type_id)
+
+        # connect to station controller if it exists
+        if "con" in elm_data.keys() and "stactrl" in elm_data["con"].keys():
+            stactrl_row = dgs["rows"]["ElmStactrl"][elm_data["con"]["stactrl"]]
+            elm_row["c_pstac"] = DgsPointer(stactrl_row["ID"])
+
+        # make composite model
+        if (
+            "msc" in elm_data.keys()
+            and elm_data["msc"].get("powerfactory_model") in comp_model_names.keys()
+        ):
+            add_dgs_composite_model(dgs, elm_data, elm_row, bus_row, cub_id, net_id)
+
+
+# adds the graphic and graphic coordinates of all elements
+def add_dgs_graphics(dgs, data, dig_id):
+    for elm_class in graphic_classes:
+        for elm_name, elm_data in data["network"][elm_class].items():
+            if "grf" not in elm_data.keys():
+                continue
+            elm_row = dgs["rows"][elm_class][elm_name]
+            grf_row = add_dgs_object(
+                dgs,
+                "IntGrf",
+                dict(
+                    elm_data["grf"],
+                    loc_name=f"grf_{elm_name}",
+                    pDataObj=DgsPointer(elm_row["ID"]),
+                ),
+                fold_id=dig_id,
+            )
+            if "gco" not in elm_data.keys():
+                continue
+            if "rX" in elm_data["gco"].keys():
+                gco_keys = [("GCO_1", "rX", "rY")]
+            else:
+                gco_keys = [(f"GCO_{i}", f"{i}_rX", f"{i}_rY") for i in [1, 2]]
+            for gco_name, rX, rY in gco_keys:
+                add_dgs_object(
+                    dgs,
+                    "IntGrfcon",
+                    {
+                        "loc_name": gco_name,
+                        "rX": elm_data["gco"][rX],
+                        "rY": elm_data["gco"][rY],
+                    },
+                    fold_id=grf_row["ID"],
+                )
+
+
+# makes the DGS tables of the whole network from the parsed network data
+# no powerfactory objects are needed, so the tables can also be made offline
+def make_dgs_tables(data, network_name, freq=50, diagram=True):
+    dgs = {"tables": {}, "rows": {}, "n_objects": 1}  # id 1 is the general section
+    net_row = add_dgs_object(
+        dgs, "ElmNet", {"loc_name": f"{network_name}_grid", "frnom": freq}
+    )
+    if diagram:
+        dig_row = add_dgs_object(
+            dgs,
+            "IntGrfnet",
+            {
+                "loc_name": f"{net_row['loc_name']}_diagram",
+                "pDataFolder": DgsPointer(net_row["ID"]),
+            },
+        )
+        net_row["pDiagram"] = DgsPointer(dig_row["ID"])
+
+    # areas used by the buses
+    area_names = []
+    for bus_data in data["network"]["ElmTerm"].values():
+        area_name = bus_data["elm"].get("cpArea")
+        if area_name is not None and area_name not in area_names:
+            area_names.append(area_name)
+    for area_name in area_names:
+        add_dgs_object(dgs, "ElmArea", {"loc_name": area_name})
+
+    for elm_class in incremental_classes.keys():
+        if elm_class in data["network"].keys():
+            add_dgs_elements(dgs, data, elm_class, net_row["ID"])
+    if diagram:
+        add_dgs_graphics(dgs, data, dig_row["ID"])
+    return dgs
+
+
+###################################################################################
+# WRITE AND READ DGS FILES
+
+
+# returns the DGS type of a value
+def get_dgs_type(value):
+    if isinstance(value, DgsPointer):
+        return "p"
+    elif isinstance(value, int):
+        return "i"
+    elif isinstance(value, float):
+        return "r"
+    elif isinstance(value, str):
+        if ";" in value or "\n" in value:
+            raise ValueError(f"{value} can not be written to a DGS file")
+        return f"a:{max(40, len(value))}"
+    raise ValueError(f"{value} of type {type(value)} can not be written to a DGS file")
+
+
+# combines the DGS types of the values of a column
+# integer columns with float values are written as reals, strings use the longest length
+def combine_dgs_types(dgs_types):
+    if len(dgs_types) == 1:
+        return dgs_types.pop()
+    elif dgs_types == {"i", "r"}:
+        return "r"
+    elif all(dgs_type.startswith("a:") for dgs_type in dgs_types):
+        return f"a:{max(int(dgs_type[2:]) for dgs_type in dgs_types)}"
+    raise ValueError(f"Column has incompatible DGS types {dgs_types}")
+
+
+# returns the columns of a table as (attribute, type, vector size)
+# vector attributes (lists and arrays) have a size, scalar attributes have None
+def get_dgs_columns(rows):
+    columns = {}
+    for row in rows:
+        for attribute, value in row.items():
+            column = columns.setdefault(attribute, {"types": set(), "size": None})
+            if isinstance(value, (list, array)):
+                column["size"] = max(column["size"] or 0, len(value))
+                column["types"].update(get_dgs_type(x) for x in value)
+            else:
+                column["types"].add(get_dgs_type(value))
+    return [
+        (attribute, combine_dgs_types(column["types"]), column["size"])
+        for attribute, column in columns.items()
+    ]
+
+
+# formats a value for a DGS file
+def format_dgs_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def write_dgs_table(file, elm_class, rows):
+    columns = get_dgs_columns(rows)
+    header = [f"$${elm_class}"]
+    for attribute, dgs_type, size in columns:
+        if attribute == "ID":
+            header.append(f"ID({dgs_type})")
+        elif size is None:
+            header.append(f"{attribute}({dgs_type})")
+        else:
+            header.append(f"{attribute}:SIZEROW(i)")
+            header.extend(f"{attribute}:{i}({dgs_type})" for i in range(size))
+    file.write(";".join(header) + "\n")
+
+    for row in rows:
+        line = []
+        for attribute, dgs_type, size in columns:
+            value = row.get(attribute)
+            if size is None:
+                line.append("" if value is None else format_dgs_value(value))
+            else:
+                value = [] if value is None else list(value)
+                line.append(str(len(value)))
+                line.extend(format_dgs_value(x) for x in value)
+                line.extend([""] * (size - len(value)))
+        file.write(";".join(line) + "\n")
+
+
+def write_dgs_file(app, dgs, dgs_path):
+    dgs_path = Path(dgs_path)
+    dgs_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(dgs_path, "w", encoding="utf-8") as file:
+        file.write("$$General;ID(a:40);Descr(a:40);Val(a:40)\n")
+        file.write(f"1;Version;{dgs_version}\n")
+        for elm_class, rows in dgs["tables"].items():
+            write_dgs_table(file, elm_class, rows)
+    app.PrintInfo(f"DGS file written to {dgs_path}")
+
+
+# parses a DGS value of the given type
+def parse_dgs_value(entry, dgs_type):
+    if dgs_type == "i":
+        return int(entry)
+    elif dgs_type == "r":
+        return float(entry)
+    elif dgs_type == "p":
+        return DgsPointer(entry)
+    return entry
+
+
+# reads a DGS file written by write_dgs_file
+# returns the rows of each class, with vector attributes as lists and empty entries omitted
+def read_dgs_file(dgs_path):
+    tables = {}
+    with open(dgs_path, encoding="utf-8") as file:
+        for line in file:
+            entries = line.rstrip("\n").split(";")
+            if entries[0].startswith("$$"):
+                elm_class = entries[0][2:]
+                columns = []
+                for column in entries[1:]:
+                    (name, dgs_type) = column[:-1].split("(")
+                    columns.append((name.split(":"), dgs_type))
+                tables.setdefault(elm_class, [])
+                continue
+            row = {}
+            for ((name, *index), dgs_type), entry in zip(columns, entries):
+                if index == ["SIZEROW"]:
+                    row[name] = []
+                elif entry == "":
+                    continue
+                elif len(index) != 0:
+                    row[name].append(parse_dgs_value(entry, dgs_type))
+                else:
+                    row[name] = parse_dgs_value(entry, dgs_type)
+            tables[elm_class].append(row)
+    del tables["General"]
+    return tables
+
+
+###################################################################################
+# VALIDATE DGS FILES
+
+
+# returns the differences between element data and a DGS row
+def compare_dgs_row(label, row, params, rows_by_id):
+    errors = []
+    for param, value in params.items():
+        if param not in row.keys():
+            errors.append(f"{label}: {param} missing")
+            continue
+        dgs_value = row[param]
+        # pointers are compared by the name of the object they point to
+        if isinstance(dgs_value, DgsPointer):
+            dgs_value = rows_by_id[dgs_value]["loc_name"]
+        if isinstance(value, (list, array)):
+            value = list(value)
+        if dgs_value != value:
+            errors.append(f"{label}: {param} is {dgs_value} in DGS, {value} in csvs")
+    return errors
+
+
+# returns the differences between the connections of an element and its DGS row
+def compare_dgs_connections(label, elm_data, elm_class, row, rows_by_id):
+    errors = []
+    for connection_attribute in incremental_classes[elm_class]:
+        cub = rows_by_id.get(row.get(connection_attribute))
+        bus_name = elm_data["con"][connection_attribute]
+        if cub is None or rows_by_id[cub["fold_id"]]["loc_name"] != bus_name:
+            errors.append(
+                f"{label}: {connection_attribute} not connected to {bus_name}"
+            )
+        elif cub.get("obj_id") != row["ID"]:
+            errors.append(f"{label}: cubicle {cub['loc_name']} not connected")
+    if elm_class == "ElmStactrl":
+        bus = rows_by_id.get(row.get("rembar"), {})
+        if bus.get("loc_name") != elm_data["con"]["bus"]:
+            errors.append(f"{label}: rembar not {elm_data['con']['bus']}")
+    if "stactrl" in elm_data.get("con", {}).keys():
+        stactrl = rows_by_id.get(row.get("c_pstac"), {})
+        if stactrl.get("loc_name") != elm_data["con"]["stactrl"]:
+            errors.append(f"{label}: not connected to {elm_data['con']['stactrl']}")
+    return errors
+
+
+# checks a DGS file against the pf data csvs it was made from
+# elements, types, connections, dsls and graphics are compared, no powerfactory project is needed
+# returns a list of differences
+def validate_dgs_file(app, dgs_path, data_dir, prefix="pf_data_"):
+    ts = perf_counter()
+    data = {}
+    parse_network_from_csvs(app, data, data_dir, prefix=prefix, use_snapshot=False)
+    tables = read_dgs_file(dgs_path)
+    rows_by_id = {row["ID"]: row for rows in tables.values() for row in rows}
+    rows_by_name = {
+        elm_class: {row["loc_name"]: row for row in rows}
+        for elm_class, rows in tables.items()
+    }
+    dsl_folders = {
+        row["loc_name"]: rows_by_id[row["fold_id"]] for row in tables.get("ElmDsl", [])
+    }
+    grf_gcos = {}
+    for gco in tables.get("IntGrfcon", []):
+        grf_gcos.setdefault(gco["fold_id"], {})[gco["loc_name"]] = gco
+
+    errors = []
+    for elm_class in incremental_classes.keys():
+        elms = data["network"].get(elm_class, {})
+        dgs_rows = rows_by_name.get(elm_class, {})
+        for elm_name in dgs_rows.keys():
+            if elm_name not in elms.keys():
+                errors.append(f"{elm_name}.{elm_class}: not in csvs")
+        for elm_name, elm_data in elms.items():
+            label = f"{elm_name}.{elm_class}"
+            row = dgs_rows.get(elm_name)
+            if row is None:
+                errors.append(f"{label}: missing")
+                continue
+            errors += compare_dgs_row(label, row, elm_data["elm"], rows_by_id)
+            errors += compare_dgs_connections(
+                label, elm_data, elm_class, row, rows_by_id
+            )
+
+            # type
+            if "typ" in elm_data.keys() and elm_class in type_classes.keys():
+                typ = rows_by_id.get(row.get("typ_id"))
+                if typ is None:
+                    errors.append(f"{label}: type missing")
+                else:
+                    errors += compare_dgs_row(
+                        f"{label} type", typ, elm_data["typ"], rows_by_id
+                    )
+
+            # dsls must be in a composite model
+            for dsl_data in elm_data.get("dsl", {}).values():
+                dsl_name = dsl_data["elm"]["loc_name"]
+                if dsl_name not in dsl_folders.keys():
+                    if elm_data["msc"].get("powerfactory_model") in comp_model_names:
+                        errors.append(f"{label}: dsl {dsl_name} missing")
+                elif not dsl_folders[dsl_name]["loc_name"].endswith(elm_name):
+                    errors.append(f"{label}: dsl {dsl_name} not in composite model")
+
+            # graphics
+            if "grf" not in elm_data.keys():
+                continue
+            grf = rows_by_name.get("IntGrf", {}).get(f"grf_{elm_name}")
+            if grf is None or grf.get("pDataObj") != row["ID"]:
+                errors.append(f"{label}: graphic missing")
+                continue
+            errors += compare_dgs_row(
+                f"{label} graphic", grf, elm_data["grf"], rows_by_id
+            )
+            gcos = grf_gcos.get(grf["ID"], {})
+            for param, value in elm_data.get("gco", {}).items():
+                if "_" in param:  # lines and transformers have two gcos
+                    (gco_name, coordinate) = (f"GCO_{param[0]}", param[2:])
+                else:
+                    (gco_name, coordinate) = ("GCO_1", param)
+                if list(value) != gcos.get(gco_name, {}).get(coordinate):
+                    errors.append(f"{label}: graphic coordinates {param} differ")
+
+    app.PrintInfo(
+        f"DGS file validated against csvs in: \t{round(perf_counter() - ts, 2)}"
+    )
+    if len(errors) == 0:
+        app.PrintInfo(f"{dgs_path} matches the csvs in {data_dir}")
+    else:
+        app.PrintWarn(f"{len(errors)} differences between {dgs_path} and the csvs")
+        for error in errors[:50]:
+            app.PrintWarn(error)
+    return errors
+
+
+###################################################################################
+# BUILD NETWORK FROM DGS
+
+
+# returns the default DGS file path for the active project
+def get_dgs_path(app, data_dir):
+    project_name = app.GetActiveProject().loc_name
+    return Path(data_dir) / ".build_manifests" / f"{project_name}.dgs"
+
+
+# writes the DGS file of the parsed network
+def write_network_dgs(app, data, dgs_path, network_name, freq=50, diagram=True):
+    ts = perf_counter()
+    dgs = make_dgs_tables(data, network_name, freq=freq, diagram=diagram)
+    write_dgs_file(app, dgs, dgs_path)
+    for elm_class, rows in dgs["tables"].items():
+        app.PrintInfo(f"{elm_class}: \t{len(rows)}")
+    app.PrintInfo(
+        f"DGS file with {dgs['n_objects'] - 1} objects made in: \t{round(perf_counter() - ts, 2)}"
+    )
+    return dgs
+
+
+# clears the project for a DGS import
+# same as prepare_project, except the network and areas are made by the import
+def prepare_project_for_dgs_import(
+    app,
+    data,
+    desc=[""],
+    study_case_name="base_case",
+    input_options=default_input_options,
+):
+    prj = app.GetActiveProject()
+    set_attribute(prj, "desc", desc)
+
+    # delete existing networks, study cases, operation scenarios, equipment types and areas
+    clean_project(app)
+    area_folder = app.GetDataFolder("ElmArea")
+    if area_folder is not None:
+        for area in area_folder.GetContents():
+            area.Delete()
+
+    create_study_case(app, study_case_name)
+    set_input_options(app, input_options)
+
+    data["directories"] = {"elib": app.GetProjectFolder("equip")}
+    app.PrintInfo("Project initialisation complete")
+    return data
+
+
+# imports a DGS file into the active project
+def import_dgs_file(app, dgs_path):
+    ts = perf_counter()
+    com_import = app.GetFromStudyCase("ComImport")
+    set_attribute(com_import, "g_file", str(dgs_path))
+    set_attribute(com_import, "g_target", app.GetActiveProject())
+    if com_import.Execute() != 0:
+        raise RuntimeError(f"Import of {dgs_path} failed")
+    app.PrintInfo(f"DGS file imported in: \t{round(perf_counter() - ts, 2)}")
+
+
+# links the dsls, measurement devices and plant controller of a WECC composite model
+# equivalent to the slot assignments in make_WECC_wtg and make_WECC_large_scale_pv
+def link_WECC_composite_model(app, data, elm_data, comp_model, dsls, measurements):
+    name = elm_data["elm"]["loc_name"]
+    gen = elm_data["object"]
+    set_attribute(comp_model, "Generator", gen)
+
+    plant_control_dsl = None
+    for dsl_name, dsl_data in elm_data["dsl"].items():
+        dsl = dsls[dsl_data["elm"]["loc_name"]]
+        set_attribute(dsl, "typ_id", data["dsl_model_types"][dsl_name]["blkdef"])
+        set_dsl_parameters(app, dsl, dsl_data)
+        slot_name = data["dsl_model_types"][dsl_name]["slot"]
+        if slot_name == "Plant Control DSL":
+            plant_control_dsl = dsl
+            continue
+        set_attribute(comp_model, slot_name, dsl)
+
+    pq_measurement = measurements[f"pq_meas_{name}"]
+    v_measurement = measurements[f"v_meas_{name}"]
+    set_attribute(comp_model, "Power Measurement", pq_measurement)
+    set_attribute(comp_model, "Voltage Measurement", v_measurement)
+
+    if plant_control_dsl is not None:
+        plant_control_name = f"Frame WECC Plant Control {name}"
+        plant_control_comp_model = comp_model.GetContents(
+            f"{plant_control_name}.ElmComp"
+        )[0]
+        set_attribute(
+            plant_control_comp_model,
+            "typ_id",
+            data["composite_model_frames"]["Frame WECC Plant Control"],
+        )
+        set_attribute(
+            plant_control_comp_model, "Plant Level Control", plant_control_dsl
+        )
+        set_attribute(plant_control_comp_model, "Voltage Measurement", v_measurement)
+        set_attribute(plant_control_comp_model, "Power Measurement", pq_measurement)
+        set_attribute(
+            plant_control_comp_model,
+            "Current Measurement",
+            measurements[f"i_meas_{plant_control_name}"],
+        )
+        set_attribute(comp_model, "Plant Control", plant_control_comp_model)
+
+
+# links the imported network to the data dictionary and the dynamic model library
+# composite model frames and dsl model types are set and dsl parameters are applied
+# data must contain the dynamic models (see get_nem_dynamic_models, get_WECC_dynamic_models)
+def link_dgs_objects(app, data, network_name):
+    ts = perf_counter()
+    nets = app.GetProjectFolder("netdat").GetContents(f"{network_name}_grid.ElmNet")
+    if len(nets) == 0:
+        raise RuntimeError(f"Network {network_name}_grid not found after DGS import")
+    net = nets[0]
+    net.Activate()
+    data["directories"]["net"] = net
+    data["areas"] = {
+        area.loc_name: area for area in app.GetDataFolder("ElmArea", 1).GetContents()
+    }
+
+    # imported elements are added to the data dictionary for future reference
+    for elm_class in incremental_classes.keys():
+        for elm in net.GetContents(f"*.{elm_class}", 1):
+            if elm.loc_name in data["network"].get(elm_class, {}).keys():
+                data["network"][elm_class][elm.loc_name]["object"] = elm
+
+    comp_models = {comp.loc_name: comp for comp in net.GetContents("*.ElmComp", 1)}
+    dsls = {dsl.loc_name: dsl for dsl in net.GetContents("*.ElmDsl", 1)}
+    measurements = {
+        meas.loc_name: meas
+        for meas_class in ["StaPqmea", "StaVmea", "StaImea"]
+        for meas in net.GetContents(f"*.{meas_class}", 1)
+    }
+
+    for elm_class in ["ElmSym", "ElmGenstat", "ElmPvsys"]:
+        for elm_data in data["network"].get(elm_class, {}).values():
+            model = elm_data["msc"]["powerfactory_model"]
+            if model not in comp_model_names.keys():
+                continue
+            comp_model = comp_models[
+                comp_model_names[model].format(elm_data["elm"]["loc_name"])
+            ]
+            set_attribute(
+                comp_model,
+                "typ_id",
+                data["composite_model_frames"][elm_data["msc"]["frame_type"]],
+            )
+            if model not in synchronous_generator_models:
+                link_WECC_composite_model(
+                    app, data, elm_data, comp_model, dsls, measurements
+                )
+                continue
+
+            # synchronous machines, see make_synchronous_generator
+            slots = [elm_data["object"]]
+            for dsl in ["avr", "gov", "pss"]:
+                dsl_data = elm_data["dsl"][elm_data["msc"][dsl]]
+                dsl_obj = dsls[dsl_data["elm"]["loc_name"]]
+                set_attribute(
+                    dsl_obj, "typ_id", data["dsl_model_types"][elm_data["msc"][dsl]]
+                )
+                set_dsl_parameters(app, dsl_obj, dsl_data)
+                slots.append(dsl_obj)
+            set_attribute(comp_model, "pelm", slots + [None, None, None])
+
+    app.PrintInfo(
+        f"{len(comp_models)} composite models and {len(dsls)} dsls linked in: \t{round(perf_counter() - ts, 2)}"
+    )
+
+
+# sets the drawing format of the imported diagram and opens it
+# equivalent to make_IntGrfNet, for a diagram made by the DGS import
+def configure_dgs_diagram(app, data, page_name, page_size=None):
+    if page_size is not None:
+        make_page_size(app, page_name, page_size)
+    net = data["directories"]["net"]
+    dig = app.GetActiveProject().GetContents(f"{net.loc_name}_diagram.IntGrfnet", 1)[0]
+    dig.Show()  # opening the diagram creates the settings folder and Format folder
+    set_attribute(
+        dig.GetContents("Settings")[0].GetContents("Format")[0], "aDrwFrm", page_name
+    )
+    set_attribute(net, "pDiagram", dig)
+    set_attribute(dig, "pDataFolder", net)
+    data["directories"]["dig"] = dig
+    return dig
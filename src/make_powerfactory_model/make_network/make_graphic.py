@@ -1,5 +1,12 @@
 import powerfactory
 from time import perf_counter
+import importlib
+
+from . import make_base
+
+importlib.reload(make_base)
+
+from .make_base import *
 
 
 # makes page_name if it doesn't exist
@@ -9,15 +16,15 @@ def make_page_size(app, page_name, page_size):
     try:  # create drawing formats folder if it doesn't exist
         drawing_formats = settings_folder.GetContents("*.SetFoldPage", 1)[0]
     except:
-        drawing_formats = settings_folder.CreateObject("SetFoldPage")
+        drawing_formats = create_object(settings_folder, "SetFoldPage")
 
     if (
         drawing_formats.GetContents(page_name) == []
     ):  # create new page size if it doesn't exist
-        grid_page_format = drawing_formats.CreateObject("SetFormat")
-        grid_page_format.SetAttribute("loc_name", page_name)
-        grid_page_format.SetAttribute("iSizeX", page_size[0])
-        grid_page_format.SetAttribute("iSizeY", page_size[1])
+        grid_page_format = create_object(drawing_formats, "SetFormat")
+        set_attribute(grid_page_format, "loc_name", page_name)
+        set_attribute(grid_page_format, "iSizeX", page_size[0])
+        set_attribute(grid_page_format, "iSizeY", page_size[1])
     elif (
         page_size is not None
     ):  # check if specified page size is different from existing
@@ -36,27 +43,36 @@ def make_page_size(app, page_name, page_size):
 
 
 # make and configure the IntGrfNet object
-def make_IntGrfNet(app, data, page_name):
+# if show is False the diagram is never opened, e.g. when running without a GUI. The settings
+# folder is only made when the diagram is opened, so the drawing format is then left unset
+def make_IntGrfNet(app, data, page_name, show=True):
     # get network folder
     net = data["directories"]["net"]
 
     # create new diagram
     dia_folder = app.GetProjectFolder("dia")
-    dig = dia_folder.CreateObject("IntGrfnet")
-    dig.loc_name = f"{net.loc_name}_diagram"
-    dig.Show()  # opening the diagram creates the settings folder and Format folder
+    dig = create_object(dia_folder, "IntGrfnet")
+    set_attribute(dig, "loc_name", f"{net.loc_name}_diagram")
+    if show:
+        dig.Show()  # opening the diagram creates the settings folder and Format folder
 
     # set drawing format (page size)
-    dig_settings = dig.GetContents("Settings")[0]
-    dig_settings.GetContents("Format")[0].aDrwFrm = page_name
+    dig_settings = dig.GetContents("Settings")
+    if len(dig_settings) != 0:
+        set_attribute(dig_settings[0].GetContents("Format")[0], "aDrwFrm", page_name)
+    else:
+        app.PrintWarn(
+            f"Diagram was not opened, drawing format {page_name} must be set manually"
+        )
 
     # connect network and diagram
-    net.SetAttribute("pDiagram", dig)
-    dig.SetAttribute("pDataFolder", net)
+    set_attribute(net, "pDiagram", dig)
+    set_attribute(dig, "pDataFolder", net)
 
     # activate network and close diagram
     net.Activate()
-    dig.Close()
+    if show:
+        dig.Close()
 
     # add dig to data dictionary
     data["directories"]["dig"] = dig
@@ -67,27 +83,25 @@ def make_IntGrfNet(app, data, page_name):
 # make IntGrf object for element, set attributes and connect element
 def make_IntGrf(app, target_dir, elm_data, elm):
     # make IntGrf
-    grf = target_dir.CreateObject("IntGrf")
-    grf.loc_name = f"grf_{elm_data['elm']['loc_name']}"
+    grf = create_object(target_dir, "IntGrf")
+    set_attribute(grf, "loc_name", f"grf_{elm_data['elm']['loc_name']}")
 
     # connect to element
-    grf.SetAttribute("pDataObj", elm)
+    set_attribute(grf, "pDataObj", elm)
 
     # set attributes
     params = list(elm_data["grf"].keys())
     values = list(elm_data["grf"].values())
-    app.DefineTransferAttributes("IntGrf", ", ".join(params))
+    define_transfer_attributes(app, "IntGrf", params)
     try:
-        grf.SetAttributes(values)
+        set_attributes(grf, values)
     except:
         #   iterate so that it actually flags which one is a problem
-        app.PrintWarn(
-            f"Error setting attributes for {elm_data['grf']['loc_name']}.{elm_class}"
-        )
+        app.PrintWarn(f"Error setting attributes for {grf.loc_name}.IntGrf")
         for p, v in zip(params, values):
             app.PrintInfo(f"{p} \t {v}")
-            grf.SetAttribute(p, v)
-        quit()
+            set_attribute(grf, p, v)
+        raise RuntimeError(f"Error setting attributes for {grf.loc_name}.IntGrf")
 
     return grf
 
@@ -114,191 +128,373 @@ def make_IntGrf(app, target_dir, elm_data, elm):
 # make IntGrfcon object for graphic coordinates
 # object is placed inside IntGrf object
 def make_IntGrfcon(app, grf, rX, rY, gco_name="GCO_1"):
-    gco = grf.CreateObject("IntGrfcon")
-    gco.loc_name = gco_name
+    gco = create_object(grf, "IntGrfcon")
+    set_attribute(gco, "loc_name", gco_name)
     for i in range(len(rX)):
-        gco.SetAttribute(f"points:{i}", [rX[i], rY[i]])
+        set_attribute(gco, f"points:{i}", [rX[i], rY[i]])
     return gco
 
 
 # make all grfs for ElmTerm objects
 def make_all_grfs_ElmTerm(app, data):
-    # get diagram folder
-    dig = data["directories"]["dig"]
+    with build_stage(app, "grf_ElmTerm"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
 
-    # make grfs for all ElmTerm objects
-    # can iterate over data directly as ElmTerm objects are stored
-    for bus_data in data["network"]["ElmTerm"].values():
-        make_IntGrf(app, dig, bus_data, bus_data["object"])
+        # make grfs for all ElmTerm objects
+        # can iterate over data directly as ElmTerm objects are stored
+        for bus_data in data["network"]["ElmTerm"].values():
+            ts = perf_counter()
+            make_IntGrf(app, dig, bus_data, bus_data["object"])
+            record_element(bus_data["elm"]["loc_name"], ts)
 
 
 # make all grfs for ElmSym objects
 def make_all_grfs_ElmSym(app, data):
-    # get diagram folder
-    dig = data["directories"]["dig"]
+    with build_stage(app, "grf_ElmSym"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
 
-    # make grfs for all ElmSym objects
-    for gen in app.GetCalcRelevantObjects("*.ElmSym"):
-        # make IntGrf for ElmSym
-        gen_data = data["network"]["ElmSym"][gen.loc_name]
-        grf = make_IntGrf(app, dig, gen_data, gen)
-        # make graphic coordinate object (GCO (i think thats what it stands for))
-        make_IntGrfcon(app, grf, gen_data["gco"]["rX"], gen_data["gco"]["rY"])
+        # make grfs for all ElmSym objects
+        for gen in app.GetCalcRelevantObjects("*.ElmSym"):
+            ts = perf_counter()
+            # make IntGrf for ElmSym
+            gen_data = data["network"]["ElmSym"][gen.loc_name]
+            grf = make_IntGrf(app, dig, gen_data, gen)
+            # make graphic coordinate object (GCO (i think thats what it stands for))
+            make_IntGrfcon(app, grf, gen_data["gco"]["rX"], gen_data["gco"]["rY"])
+            record_element(gen_data["elm"]["loc_name"], ts)
 
 
 # make all grfs for ElmGenstat objects
 def make_all_grfs_ElmGenstat(app, data):
-    # get diagram folder
-    dig = data["directories"]["dig"]
+    with build_stage(app, "grf_ElmGenstat"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
 
-    # make grfs for all ElmGenstat objects
-    for gen in app.GetCalcRelevantObjects("*.ElmGenstat"):
-        # make IntGrf for ElmGenstat
-        gen_data = data["network"]["ElmGenstat"][gen.loc_name]
-        grf = make_IntGrf(app, dig, gen_data, gen)
+        # make grfs for all ElmGenstat objects
+        for gen in app.GetCalcRelevantObjects("*.ElmGenstat"):
+            ts = perf_counter()
+            # make IntGrf for ElmGenstat
+            gen_data = data["network"]["ElmGenstat"][gen.loc_name]
+            grf = make_IntGrf(app, dig, gen_data, gen)
 
-        # make graphic coordinate object (GCO (i think thats what it stands for))
-        make_IntGrfcon(app, grf, gen_data["gco"]["rX"], gen_data["gco"]["rY"])
+            # make graphic coordinate object (GCO (i think thats what it stands for))
+            make_IntGrfcon(app, grf, gen_data["gco"]["rX"], gen_data["gco"]["rY"])
+            record_element(gen_data["elm"]["loc_name"], ts)
 
 
 # make all grfs for ElmPvsys objects
 def make_all_grfs_ElmPvsys(app, data):
-    # get diagram folder
-    dig = data["directories"]["dig"]
+    with build_stage(app, "grf_ElmPvsys"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
 
-    # make grfs for all ElmPvsys objects
-    for gen in app.GetCalcRelevantObjects("*.ElmPvsys"):
-        # make IntGrf for ElmPvsys
-        gen_data = data["network"]["ElmPvsys"][gen.loc_name]
-        grf = make_IntGrf(app, dig, gen_data, gen)
+        # make grfs for all ElmPvsys objects
+        for gen in app.GetCalcRelevantObjects("*.ElmPvsys"):
+            ts = perf_counter()
+            # make IntGrf for ElmPvsys
+            gen_data = data["network"]["ElmPvsys"][gen.loc_name]
+            grf = make_IntGrf(app, dig, gen_data, gen)
 
-        # make graphic coordinate object (GCO (i think thats what it stands for))
-        make_IntGrfcon(app, grf, gen_data["gco"]["rX"], gen_data["gco"]["rY"])
+            # make graphic coordinate object (GCO (i think thats what it stands for))
+            make_IntGrfcon(app, grf, gen_data["gco"]["rX"], gen_data["gco"]["rY"])
+            record_element(gen_data["elm"]["loc_name"], ts)
 
 
 # make all grfs for ElmSvs objects
 def make_all_grfs_ElmSvs(app, data):
-    # get diagram folder
-    dig = data["directories"]["dig"]
+    with build_stage(app, "grf_ElmSvs"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
 
-    # make grfs for all ElmSvs objects
-    for svs in app.GetCalcRelevantObjects("*.ElmSvs"):
-        # make IntGrf for ElmSvs
-        svs_data = data["network"]["ElmSvs"][svs.loc_name]
-        grf = make_IntGrf(app, dig, svs_data, svs)
+        # make grfs for all ElmSvs objects
+        for svs in app.GetCalcRelevantObjects("*.ElmSvs"):
+            ts = perf_counter()
+            # make IntGrf for ElmSvs
+            svs_data = data["network"]["ElmSvs"][svs.loc_name]
+            grf = make_IntGrf(app, dig, svs_data, svs)
 
-        # make graphic coordinate object (GCO (i think thats what it stands for))
-        make_IntGrfcon(app, grf, svs_data["gco"]["rX"], svs_data["gco"]["rY"])
+            # make graphic coordinate object (GCO (i think thats what it stands for))
+            make_IntGrfcon(app, grf, svs_data["gco"]["rX"], svs_data["gco"]["rY"])
+            record_element(svs_data["elm"]["loc_name"], ts)
 
 
 # make all grfs for ElmLod objects
 def make_all_grfs_ElmLod(app, data):
-    # get diagram folder
-    dig = data["directories"]["dig"]
+    with build_stage(app, "grf_ElmLod"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
 
-    # make grfs for all ElmLod objects
-    for load in app.GetCalcRelevantObjects("*.ElmLod"):
-        # make IntGrf for ElmLod
-        load_data = data["network"]["ElmLod"][load.loc_name]
-        grf = make_IntGrf(app, dig, load_data, load)
+        # make grfs for all ElmLod objects
+        for load in app.GetCalcRelevantObjects("*.ElmLod"):
+            ts = perf_counter()
+            # make IntGrf for ElmLod
+            load_data = data["network"]["ElmLod"][load.loc_name]
+            grf = make_IntGrf(app, dig, load_data, load)
 
-        # make graphic coordinate object (GCO (i think thats what it stands for))
-        make_IntGrfcon(app, grf, load_data["gco"]["rX"], load_data["gco"]["rY"])
+            # make graphic coordinate object (GCO (i think thats what it stands for))
+            make_IntGrfcon(app, grf, load_data["gco"]["rX"], load_data["gco"]["rY"])
+            record_element(load_data["elm"]["loc_name"], ts)
 
 
 # make all grfs for ElmShnt objects
 def make_all_grfs_ElmShnt(app, data):
-    # get diagram folder
-    dig = data["directories"]["dig"]
+    with build_stage(app, "grf_ElmShnt"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
 
-    # make grfs for all ElmShnt objects
-    for shunt in app.GetCalcRelevantObjects("*.ElmShnt"):
-        # make IntGrf for ElmShnt
-        shunt_data = data["network"]["ElmShnt"][shunt.loc_name]
-        grf = make_IntGrf(app, dig, shunt_data, shunt)
+        # make grfs for all ElmShnt objects
+        for shunt in app.GetCalcRelevantObjects("*.ElmShnt"):
+            ts = perf_counter()
+            # make IntGrf for ElmShnt
+            shunt_data = data["network"]["ElmShnt"][shunt.loc_name]
+            grf = make_IntGrf(app, dig, shunt_data, shunt)
 
-        # make graphic coordinate object (GCO (i think thats what it stands for))
-        make_IntGrfcon(app, grf, shunt_data["gco"]["rX"], shunt_data["gco"]["rY"])
+            # make graphic coordinate object (GCO (i think thats what it stands for))
+            make_IntGrfcon(app, grf, shunt_data["gco"]["rX"], shunt_data["gco"]["rY"])
+            record_element(shunt_data["elm"]["loc_name"], ts)
 
 
 # make all grfs for ElmLne objects
 def make_all_grfs_ElmLne(app, data):
-    # get diagram folder
-    dig = data["directories"]["dig"]
+    with build_stage(app, "grf_ElmLne"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
+
+        # make grfs for all ElmLne objects
+        for line in app.GetCalcRelevantObjects("*.ElmLne"):
+            ts = perf_counter()
+            # make IntGrf for ElmLne
+            line_data = data["network"]["ElmLne"][line.loc_name]
+            grf = make_IntGrf(app, dig, line_data, line)
+
+            # make graphic coordinate object (GCO (i think thats what it stands for))
+            make_IntGrfcon(
+                app,
+                grf,
+                line_data["gco"]["1_rX"],
+                line_data["gco"]["1_rY"],
+                gco_name="GCO_1",
+            )
+            make_IntGrfcon(
+                app,
+                grf,
+                line_data["gco"]["2_rX"],
+                line_data["gco"]["2_rY"],
+                gco_name="GCO_2",
+            )
+            record_element(line_data["elm"]["loc_name"], ts)
 
-    # make grfs for all ElmLne objects
-    for line in app.GetCalcRelevantObjects("*.ElmLne"):
-        # make IntGrf for ElmLne
-        line_data = data["network"]["ElmLne"][line.loc_name]
-        grf = make_IntGrf(app, dig, line_data, line)
-
-        # make graphic coordinate object (GCO (i think thats what it stands for))
-        make_IntGrfcon(
-            app,
-            grf,
-            line_data["gco"]["1_rX"],
-            line_data["gco"]["1_rY"],
-            gco_name="GCO_1",
+
+# make all grfs for ElmTr2 objects
+def make_all_grfs_ElmTr2(app, data):
+    with build_stage(app, "grf_ElmTr2"):
+        # get diagram folder
+        dig = data["directories"]["dig"]
+
+        # make grfs for all ElmTr2 objects
+        for tr2 in app.GetCalcRelevantObjects("*.ElmTr2"):
+            ts = perf_counter()
+            # make IntGrf for ElmTr2
+            tr2_data = data["network"]["ElmTr2"][tr2.loc_name]
+            grf = make_IntGrf(app, dig, tr2_data, tr2)
+
+            # make graphic coordinate object (GCO (i think thats what it stands for))
+            make_IntGrfcon(
+                app,
+                grf,
+                tr2_data["gco"]["1_rX"],
+                tr2_data["gco"]["1_rY"],
+                gco_name="GCO_1",
+            )
+            make_IntGrfcon(
+                app,
+                grf,
+                tr2_data["gco"]["2_rX"],
+                tr2_data["gco"]["2_rY"],
+                gco_name="GCO_2",
+            )
+            record_element(tr2_data["elm"]["loc_name"], ts)
+
+
+###################################################################################
+# SINGLE PASS DIAGRAM
+# make_all_grfs makes the graphics of all classes in one pass over data["network"], using the
+# element objects stored when the network was made instead of looking them up per class.
+# The name and data object of each IntGrf are written with its other attributes, and all
+# points of an IntGrfcon are written with one SetAttributes call.
+
+# element classes with graphics, in the order they are drawn
+graphic_classes = [
+    "ElmTerm",
+    "ElmSym",
+    "ElmGenstat",
+    "ElmPvsys",
+    "ElmSvs",
+    "ElmLod",
+    "ElmShnt",
+    "ElmLne",
+    "ElmTr2",
+]
+
+# PowerFactory calls made by make_all_grfs and made by the make_all_grfs_ElmX functions
+diagram_calls = {
+    "n_made": 0,
+    "n_per_class": 0,
+    "n_fallback": 0,  # IntGrfcons written one point at a time because SetAttributes failed
+}
+
+
+def reset_diagram_calls():
+    for count in diagram_calls.keys():
+        diagram_calls[count] = 0
+
+
+# prints the number of PowerFactory calls avoided by making the diagram in a single pass
+def report_diagram_calls(app):
+    app.PrintInfo(
+        f"Diagram made with {diagram_calls['n_made']} PowerFactory calls, "
+        f"{diagram_calls['n_per_class'] - diagram_calls['n_made']} fewer than per class"
+    )
+    if diagram_calls["n_fallback"] != 0:
+        app.PrintWarn(
+            f"{diagram_calls['n_fallback']} IntGrfcon objects were written one point at a time"
         )
-        make_IntGrfcon(
-            app,
-            grf,
-            line_data["gco"]["2_rX"],
-            line_data["gco"]["2_rY"],
-            gco_name="GCO_2",
+
+
+# returns the (name, rX, rY) of each graphic coordinate object of an element
+def get_gco_points(elm_data):
+    if "gco" not in elm_data.keys():
+        return []
+    if "rX" in elm_data["gco"].keys():
+        return [("GCO_1", elm_data["gco"]["rX"], elm_data["gco"]["rY"])]
+    return [
+        (f"GCO_{i}", elm_data["gco"][f"{i}_rX"], elm_data["gco"][f"{i}_rY"])
+        for i in [1, 2]
+    ]
+
+
+# adds the objects of elements made in a previous run (e.g. a resumed build) to elms_data
+def get_missing_objects(app, elms_data, elm_class):
+    if all("object" in elm_data.keys() for elm_data in elms_data):
+        return
+    existing = {
+        elm.loc_name: elm for elm in app.GetCalcRelevantObjects(f"*.{elm_class}")
+    }
+    diagram_calls["n_made"] += 1
+    for elm_data in elms_data:
+        if "object" not in elm_data.keys():
+            elm_data["object"] = existing[elm_data["elm"]["loc_name"]]
+
+
+# make IntGrf object for element with a single SetAttributes call
+# the name and data object are written with the grf attributes
+def make_IntGrf_single_pass(app, target_dir, elm_data):
+    grf = create_object(target_dir, "IntGrf")
+    params = ["loc_name", "pDataObj"] + list(elm_data["grf"].keys())
+    values = [f"grf_{elm_data['elm']['loc_name']}", elm_data["object"]] + list(
+        elm_data["grf"].values()
+    )
+    define_transfer_attributes(app, "IntGrf", params)
+    diagram_calls["n_made"] += 2
+    diagram_calls["n_per_class"] += 4
+    try:
+        set_attributes(grf, values)
+    except:
+        #   iterate so that it actually flags which one is a problem
+        app.PrintWarn(f"Error setting attributes for grf_{elm_data['elm']['loc_name']}")
+        for p, v in zip(params, values):
+            app.PrintInfo(f"{p} \t {v}")
+            set_attribute(grf, p, v)
+        raise RuntimeError(
+            f"Error setting attributes for grf_{elm_data['elm']['loc_name']}.IntGrf"
         )
+    return grf
 
 
-# make all grfs for ElmTr2 objects
-def make_all_grfs_ElmTr2(app, data):
+# make IntGrfcon object and write its name and points with a single SetAttributes call
+# polylines with the same number of points share their transfer attributes
+def make_IntGrfcon_single_pass(app, grf, rX, rY, gco_name="GCO_1"):
+    gco = create_object(grf, "IntGrfcon")
+    params = ["loc_name"] + [f"points:{i}" for i in range(len(rX))]
+    values = [gco_name] + [[rX[i], rY[i]] for i in range(len(rX))]
+    define_transfer_attributes(app, "IntGrfcon", params)
+    diagram_calls["n_made"] += 2
+    diagram_calls["n_per_class"] += 2 + len(rX)
+    try:
+        set_attributes(gco, values)
+    except:
+        # write one point at a time, as make_IntGrfcon does
+        for p, v in zip(params, values):
+            set_attribute(gco, p, v)
+        diagram_calls["n_made"] += len(params)
+        diagram_calls["n_fallback"] += 1
+    return gco
+
+
+# make grfs for all elements in a single pass over data["network"]
+# equivalent to the make_all_grfs_ElmX functions in graphic_classes order
+def make_all_grfs(app, data):
+    reset_diagram_calls()
+    n_gco_defined = transfer_attributes["n_defined"].get("IntGrfcon", 0)
+
     # get diagram folder
     dig = data["directories"]["dig"]
 
-    # make grfs for all ElmTr2 objects
-    for tr2 in app.GetCalcRelevantObjects("*.ElmTr2"):
-        # make IntGrf for ElmTr2
-        tr2_data = data["network"]["ElmTr2"][tr2.loc_name]
-        grf = make_IntGrf(app, dig, tr2_data, tr2)
-
-        # make graphic coordinate object (GCO (i think thats what it stands for))
-        make_IntGrfcon(
-            app,
-            grf,
-            tr2_data["gco"]["1_rX"],
-            tr2_data["gco"]["1_rY"],
-            gco_name="GCO_1",
-        )
-        make_IntGrfcon(
-            app,
-            grf,
-            tr2_data["gco"]["2_rX"],
-            tr2_data["gco"]["2_rY"],
-            gco_name="GCO_2",
-        )
+    for elm_class in graphic_classes:
+        with build_stage(app, f"grf_{elm_class}"):
+            elms_data = [
+                elm_data
+                for elm_data in data["network"][elm_class].values()
+                if "grf" in elm_data.keys()
+            ]
+            # the make_all_grfs_ElmX functions, other than ElmTerm, get the objects of each class
+            # from PowerFactory and read the name of each object
+            if elm_class != "ElmTerm":
+                diagram_calls["n_per_class"] += 1 + len(elms_data)
+            get_missing_objects(app, elms_data, elm_class)
+            for elm_data in group_by_signature(elms_data, groups=("grf",)):
+                ts = perf_counter()
+                grf = make_IntGrf_single_pass(app, dig, elm_data)
+                for gco_name, rX, rY in get_gco_points(elm_data):
+                    make_IntGrfcon_single_pass(app, grf, rX, rY, gco_name=gco_name)
+                record_element(elm_data["elm"]["loc_name"], ts)
+
+    diagram_calls["n_made"] += (
+        transfer_attributes["n_defined"].get("IntGrfcon", 0) - n_gco_defined
+    )
+    report_diagram_calls(app)
 
 
 # make network diagram, including page size, IntGrfNet, and all IntGrf objects
-def make_network_diagram(app, data, page_name, page_size=None):
-    ts = perf_counter()
-    # make page format for diagram if it doesn't exist
-    if page_size is not None:
-        make_page_size(app, page_name, page_size)
-
-    # make and configure the IntGrfNet object
-    dig = make_IntGrfNet(app, data, page_name)
-
-    # make grfs for all objects
-    make_all_grfs_ElmTerm(app, data)
-    make_all_grfs_ElmSym(app, data)
-    make_all_grfs_ElmGenstat(app, data)
-    make_all_grfs_ElmPvsys(app, data)
-    make_all_grfs_ElmSvs(app, data)
-    make_all_grfs_ElmLod(app, data)
-    make_all_grfs_ElmShnt(app, data)
-    make_all_grfs_ElmLne(app, data)
-    make_all_grfs_ElmTr2(app, data)
-
-    # open diagram
-    dig.Show()
-
-    app.PrintInfo(f"Network diagram made in: {round(perf_counter() - ts, 2)}s")
+# single_pass makes the grfs with make_all_grfs instead of the make_all_grfs_ElmX functions
+# show=False makes the diagram without opening it (see make_IntGrfNet)
+def make_network_diagram(
+    app, data, page_name, page_size=None, single_pass=True, show=True
+):
+    with build_stage(app, "diagram"):
+        # make page format for diagram if it doesn't exist
+        if page_size is not None:
+            make_page_size(app, page_name, page_size)
+
+        # make and configure the IntGrfNet object
+        dig = make_IntGrfNet(app, data, page_name, show=show)
+
+        # make grfs for all objects
+        if single_pass:
+            make_all_grfs(app, data)
+        else:
+            make_all_grfs_ElmTerm(app, data)
+            make_all_grfs_ElmSym(app, data)
+            make_all_grfs_ElmGenstat(app, data)
+            make_all_grfs_ElmPvsys(app, data)
+            make_all_grfs_ElmSvs(app, data)
+            make_all_grfs_ElmLod(app, data)
+            make_all_grfs_ElmShnt(app, data)
+            make_all_grfs_ElmLne(app, data)
+            make_all_grfs_ElmTr2(app, data)
+
+        # open diagram
+        if show:
+            dig.Show()
@@ -2,10 +2,13 @@ import powerfactory
 import importlib
 
 from . import make_base
+from . import composite_model_templates
 
 importlib.reload(make_base)
+importlib.reload(composite_model_templates)
 
 from .make_base import *
+from .composite_model_templates import *
 
 
 def make_ElmTerm(app, net, bus_data, areas):
@@ -33,7 +36,7 @@ def make_ElmStactrl(app, net, stactrl_data, bus1):
     stactrl = make_element(app, net, stactrl_data, "ElmStactrl")
 
     #  connect stactrl to bus
-    stactrl.SetAttribute("rembar", bus1)
+    set_attribute(stactrl, "rembar", bus1)
 
     return stactrl
 
@@ -75,7 +78,7 @@ def make_ElmTr2(app, net, elib, elm_data, buslv, bushv):
     make_type(app, elib, elm_data, tr2, "TypTr2")
 
     #  set tap settings
-    tr2.SetAttribute("nntap", nntap)
+    set_attribute(tr2, "nntap", nntap)
 
     return tr2
 
@@ -119,7 +122,7 @@ def make_ElmSym(app, target_dir, elib, elm_data, bus1, station_controller):
 
     # connect to station controller if it exists
     if station_controller is not None:
-        gen.SetAttribute("c_pstac", station_controller)
+        set_attribute(gen, "c_pstac", station_controller)
 
     return gen
 
@@ -134,7 +137,7 @@ def make_ElmGenstat(app, target_dir, elm_data, bus1, station_controller):
 
     # connect to station controller if it exists
     if station_controller is not None:
-        gen.SetAttribute("c_pstac", station_controller)
+        set_attribute(gen, "c_pstac", station_controller)
 
     return gen
 
@@ -148,7 +151,7 @@ def make_ElmPvsys(app, target_dir, elm_data, bus1, station_controller):
 
     # connect to station controller if it exists
     if station_controller is not None:
-        gen.SetAttribute("c_pstac", station_controller)
+        set_attribute(gen, "c_pstac", station_controller)
 
     return gen
 
@@ -165,31 +168,36 @@ def make_ElmSvs(app, net, elm_data, bus1):
 
 def make_ElmComp(app, net, name, frame):
     # make composite model
-    comp_model = net.CreateObject("ElmComp")
-    comp_model.loc_name = name
-    comp_model.typ_id = frame
+    comp_model = create_object(net, "ElmComp")
+    set_attribute(comp_model, "loc_name", name)
+    set_attribute(comp_model, "typ_id", frame)
     return comp_model
 
 
 def make_ElmDsl(app, target_dir, elm_data, dsl_model_type):
     #   create dsl
-    dsl = target_dir.CreateObject("ElmDsl")
-    dsl.typ_id = dsl_model_type
+    dsl = create_object(target_dir, "ElmDsl")
+    set_attribute(dsl, "typ_id", dsl_model_type)
+    set_dsl_parameters(app, dsl, elm_data)
 
+    return dsl
+
+
+# sets the parameters and matrix entries of a dsl
+# the dsl model type must be set first, as parameter names are defined by the model
+def set_dsl_parameters(app, dsl, elm_data):
     #  set attributes
     for param, value in elm_data["elm"].items():
         try:
-            dsl.SetAttribute(param, value)
+            set_attribute(dsl, param, value)
         except:
             app.PrintInfo(f"{param} \t {value}")
-            dsl.SetAttribute(param, value)
+            set_attribute(dsl, param, value)
 
-    # set matrix entries
+    # set matrix entries (rows are stored as arrays, powerfactory expects lists)
     if "mat" in elm_data.keys():
         for matrix_row_index, matrix_row in elm_data["mat"].items():
-            dsl.SetAttribute(f"matrix:{matrix_row_index}", matrix_row)
-
-    return dsl
+            set_attribute(dsl, f"matrix:{matrix_row_index}", list(matrix_row))
 
 
 def make_StaPqmea(app, target_dir, pq_measuement_data):
@@ -227,6 +235,22 @@ def make_synchronous_generator(
 ):
     name = elm_data["elm"]["loc_name"]
 
+    # copy the composite model from its template if templates are enabled
+    if composite_templates["enabled"]:
+        comp_model = copy_sym_template(
+            app,
+            net,
+            elm_data,
+            f"Frame SYM {name}",
+            frame,
+            avr_model,
+            gov_model,
+            pss_model,
+        )
+        gen = make_ElmSym(app, net, elib, elm_data, bus1, station_controller)
+        patch_sym_template_copy(app, comp_model, gen, elm_data)
+        return comp_model
+
     # make composite model
     comp_model = make_ElmComp(app, net, f"Frame SYM {name}", frame)
 
@@ -255,7 +279,7 @@ def make_synchronous_generator(
         pss_model,
     )
 
-    comp_model.SetAttribute("pelm", [gen, avr, gov, pss, None, None, None])
+    set_attribute(comp_model, "pelm", [gen, avr, gov, pss, None, None, None])
 
     return comp_model
 
@@ -327,7 +351,7 @@ def make_type_3_wtg(
             voltage_source_model,
         )
         # set gen to use voltage source reference
-        gen.SetAttribute("iSimModel", 2)
+        set_attribute(gen, "iSimModel", 2)
 
     # make measurement devices
     pq_measurement_data = {
@@ -352,7 +376,8 @@ def make_type_3_wtg(
     v_measurement = make_StaVmea(app, comp_model, v_measurement_data)
 
     # set slots
-    comp_model.SetAttribute(
+    set_attribute(
+        comp_model,
         "pelm",
         [
             gen,
@@ -429,7 +454,7 @@ def make_type_4B_wtg(
             voltage_source_model,
         )
         # set gen to use voltage source reference
-        gen.SetAttribute("iSimModel", 2)
+        set_attribute(gen, "iSimModel", 2)
 
     # make measurement devices
     pq_measurement_data = {
@@ -454,7 +479,8 @@ def make_type_4B_wtg(
     v_measurement = make_StaVmea(app, comp_model, v_measurement_data)
 
     # set slots
-    comp_model.SetAttribute(
+    set_attribute(
+        comp_model,
         "pelm",
         [
             gen,
@@ -514,7 +540,7 @@ def make_pv_generator(
             voltage_source_model,
         )
         # set gen to use voltage source reference
-        gen.SetAttribute("iSimModel", 2)
+        set_attribute(gen, "iSimModel", 2)
 
     # make measurement devices
     pq_measurement_data = {
@@ -539,7 +565,8 @@ def make_pv_generator(
     v_measurement = make_StaVmea(app, comp_model, v_measurement_data)
 
     # set slots
-    comp_model.SetAttribute(
+    set_attribute(
+        comp_model,
         "pelm",
         [
             gen,
@@ -578,7 +605,8 @@ def make_WECC_plant_control(
     plant_control_comp_model = make_ElmComp(app, gen_comp_model, name, frame)
 
     # add plant control dsl
-    plant_control_comp_model.SetAttribute(
+    set_attribute(
+        plant_control_comp_model,
         "Plant Level Control",
         plant_control_dsl,
     )
@@ -595,7 +623,7 @@ def make_WECC_plant_control(
             }
         }
         v_measurement = make_StaVmea(app, plant_control_comp_model, v_measurement_data)
-    plant_control_comp_model.SetAttribute("Voltage Measurement", v_measurement)
+    set_attribute(plant_control_comp_model, "Voltage Measurement", v_measurement)
 
     # add pq_measurement
     if pq_measurement is None:  # make if pq_measurement is None
@@ -611,7 +639,7 @@ def make_WECC_plant_control(
         pq_measurement = make_StaPqmea(
             app, plant_control_comp_model, pq_measurement_data
         )
-    plant_control_comp_model.SetAttribute("Power Measurement", pq_measurement)
+    set_attribute(plant_control_comp_model, "Power Measurement", pq_measurement)
 
     # add i_measurement
     if i_measurement is None:  # make if i_measurement is None
@@ -623,7 +651,7 @@ def make_WECC_plant_control(
             }
         }
         i_measurement = make_StaImea(app, plant_control_comp_model, i_measurement_data)
-    plant_control_comp_model.SetAttribute("Current Measurement", i_measurement)
+    set_attribute(plant_control_comp_model, "Current Measurement", i_measurement)
 
     return plant_control_comp_model
 
@@ -641,12 +669,27 @@ def make_WECC_wtg(
 ):
     name = elm_data["elm"]["loc_name"]
 
+    # copy the composite model from its template if templates are enabled
+    if composite_templates["enabled"]:
+        comp_model = copy_WECC_template(
+            app,
+            net,
+            elm_data,
+            f"Frame WECC WTG {name}",
+            frame,
+            wecc_dsl_models,
+            plant_control_frame,
+        )
+        gen = make_ElmGenstat(app, net, elm_data, bus1, station_controller)
+        patch_WECC_template_copy(app, comp_model, gen, elm_data)
+        return comp_model
+
     # make composite model
     comp_model = make_ElmComp(app, net, f"Frame WECC WTG {name}", frame)
 
     # make ElmGenstat and connect to composite model
     gen = make_ElmGenstat(app, net, elm_data, bus1, station_controller)
-    comp_model.SetAttribute("Generator", gen)
+    set_attribute(comp_model, "Generator", gen)
 
     # make ElmDsls
     plant_control_dsl = None
@@ -667,7 +710,7 @@ def make_WECC_wtg(
             continue
 
         # set dsl to correct slot
-        comp_model.SetAttribute(slot_name, dsl)
+        set_attribute(comp_model, slot_name, dsl)
 
     # make measurement devices
     pq_measurement_data = {
@@ -680,7 +723,7 @@ def make_WECC_wtg(
         }
     }
     pq_measurement = make_StaPqmea(app, comp_model, pq_measurement_data)
-    comp_model.SetAttribute("Power Measurement", pq_measurement)
+    set_attribute(comp_model, "Power Measurement", pq_measurement)
 
     v_measurement_data = {
         "elm": {
@@ -692,7 +735,7 @@ def make_WECC_wtg(
         }
     }
     v_measurement = make_StaVmea(app, comp_model, v_measurement_data)
-    comp_model.SetAttribute("Voltage Measurement", v_measurement)
+    set_attribute(comp_model, "Voltage Measurement", v_measurement)
 
     # make plant control model if required
     if plant_control_dsl is not None:
@@ -705,7 +748,7 @@ def make_WECC_wtg(
             v_measurement=v_measurement,
             pq_measurement=pq_measurement,
         )
-        comp_model.SetAttribute("Plant Control", plant_control_comp_model)
+        set_attribute(comp_model, "Plant Control", plant_control_comp_model)
 
     return comp_model
 
@@ -723,12 +766,27 @@ def make_WECC_large_scale_pv(
 ):
     name = elm_data["elm"]["loc_name"]
 
+    # copy the composite model from its template if templates are enabled
+    if composite_templates["enabled"]:
+        comp_model = copy_WECC_template(
+            app,
+            net,
+            elm_data,
+            f"Frame WECC PV {name}",
+            frame,
+            wecc_dsl_models,
+            plant_control_frame,
+        )
+        gen = make_ElmPvsys(app, net, elm_data, bus1, station_controller)
+        patch_WECC_template_copy(app, comp_model, gen, elm_data)
+        return comp_model
+
     # make composite model
     comp_model = make_ElmComp(app, net, f"Frame WECC PV {name}", frame)
 
     # make ElmGenstat and connect to composite model
     gen = make_ElmPvsys(app, net, elm_data, bus1, station_controller)
-    comp_model.SetAttribute("Generator", gen)
+    set_attribute(comp_model, "Generator", gen)
 
     # make ElmDsls
     plant_control_dsl = None
@@ -749,7 +807,7 @@ def make_WECC_large_scale_pv(
             continue
 
         # set dsl to correct slot
-        comp_model.SetAttribute(slot_name, dsl)
+        set_attribute(comp_model, slot_name, dsl)
 
     # make measurement devices
     pq_measurement_data = {
@@ -762,7 +820,7 @@ def make_WECC_large_scale_pv(
         }
     }
     pq_measurement = make_StaPqmea(app, comp_model, pq_measurement_data)
-    comp_model.SetAttribute("Power Measurement", pq_measurement)
+    set_attribute(comp_model, "Power Measurement", pq_measurement)
 
     v_measurement_data = {
         "elm": {
@@ -774,7 +832,7 @@ def make_WECC_large_scale_pv(
         }
     }
     v_measurement = make_StaVmea(app, comp_model, v_measurement_data)
-    comp_model.SetAttribute("Voltage Measurement", v_measurement)
+    set_attribute(comp_model, "Voltage Measurement", v_measurement)
 
     # make plant control model if required
     if plant_control_dsl is not None:
@@ -787,6 +845,6 @@ def make_WECC_large_scale_pv(
             v_measurement=v_measurement,
             pq_measurement=pq_measurement,
         )
-        comp_model.SetAttribute("Plant Control", plant_control_comp_model)
+        set_attribute(comp_model, "Plant Control", plant_control_comp_model)
 
     return comp_model
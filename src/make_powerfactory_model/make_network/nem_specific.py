@@ -1,6 +1,8 @@
 from datetime import datetime, timezone, timedelta
 import csv
 
+from .build_instrumentation import create_object, set_attribute
+
 # Functions that are specific to creating the NEM network
 
 
@@ -15,8 +17,8 @@ def make_nem_areas(app, data):
     area_names = ["NSW", "VIC", "QLD", "SA", "TAS"]
     areas = {}
     for area_name in area_names:
-        areas[area_name] = area_folder.CreateObject("ElmArea")
-        areas[area_name].loc_name = area_name
+        areas[area_name] = create_object(area_folder, "ElmArea")
+        set_attribute(areas[area_name], "loc_name", area_name)
     data["areas"] = areas
 
 
@@ -181,8 +183,8 @@ def make_isp_variation(app, path_gen_capacities, year_range=(2026, 2051)):
     ]
 
     # create variation
-    isp_scheme = variations.CreateObject("IntScheme")
-    isp_scheme.loc_name = "ISPHVDC"
+    isp_scheme = create_object(variations, "IntScheme")
+    set_attribute(isp_scheme, "loc_name", "ISPHVDC")
 
     # create new stage for each year
     for year in range(year_range[0], year_range[1]):
@@ -195,7 +197,9 @@ def make_isp_variation(app, path_gen_capacities, year_range=(2026, 2051)):
 
         # set rez gen capacities for ISP year
         for wtg in rez_wtgs:
-            wtg.SetAttribute("sgn", rez_gen_capacities[wtg.loc_name][year])
+            set_attribute(wtg, "sgn", rez_gen_capacities[wtg.loc_name][year])
         for pv in rez_pvs:
-            pv.SetAttribute("sgn", 1000 * rez_gen_capacities[pv.loc_name][year])  # kVA
+            set_attribute(
+                pv, "sgn", 1000 * rez_gen_capacities[pv.loc_name][year]
+            )  # kVA
         app.PrintInfo(f"Created ISP variation for {year}")
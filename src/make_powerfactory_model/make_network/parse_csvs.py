@@ -1,9 +1,16 @@
 import csv
+import os
+import pickle
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from collections.abc import MutableMapping
+from functools import partial
 from pathlib import Path
 import importlib
 import powerfactory
 from time import perf_counter
-import ast
 
 
 # return key value pairs of header title and index
@@ -24,6 +31,30 @@ def parse_row_entry_type(row_entry):
             return row_entry
 
 
+# decodes a graphical coordinate list, e.g. "[23244.375, 23244.375]", to an array of floats
+# replaces ast.literal_eval, which compiles every entry
+def decode_coordinates(entry):
+    entry = entry.strip().strip("[]()")
+    if entry == "":
+        return array("d")
+    try:
+        return array("d", map(float, entry.split(",")))
+    except ValueError:
+        raise ValueError(f"Graphical coordinates not parsable from {entry}")
+
+
+# decodes a dsl matrix row, e.g. "2,0,2,0", to an array of ints, or floats if any entry isn't an int
+def decode_matrix_row(entry):
+    entries = str(entry).split(",")
+    try:
+        return array("l", map(int, entries))
+    except (ValueError, OverflowError):
+        try:
+            return array("d", map(float, entries))
+        except ValueError:
+            raise ValueError(f"Matrix row not parsable from {entry}")
+
+
 # parse a row of csv data into a dictionary
 def parse_csv_row(row, header):
     # initialize dictionary
@@ -68,17 +99,15 @@ def parse_csv_row(row, header):
             desc_line for desc_line in misc_dict["elm"]["desc"].split("\n")
         ]
 
-    # convert matrix entries to lists of ints/floats
+    # convert matrix entries to arrays of ints/floats
     if "mat" in misc_dict.keys():
         for matrix_row_index, matrix_row in misc_dict["mat"].items():
-            misc_dict["mat"][matrix_row_index] = [
-                parse_row_entry_type(entry) for entry in matrix_row.split(",")
-            ]
+            misc_dict["mat"][matrix_row_index] = decode_matrix_row(matrix_row)
 
-    # convert graphical coordinates to lists of ints/floats
+    # convert graphical coordinates to arrays of floats
     if "gco" in misc_dict.keys():
         for gco_key, gco_val in misc_dict["gco"].items():
-            misc_dict["gco"][gco_key] = ast.literal_eval(gco_val)
+            misc_dict["gco"][gco_key] = decode_coordinates(str(gco_val))
 
     return misc_dict
 
@@ -100,62 +129,452 @@ def parse_csv(app, file_path):
     return elm_class_data
 
 
-# parse all network data from csv files
-def parse_network_from_csvs(app, data, data_dir, prefix="pf_data_"):
+# element classes with a pf data csv (ElmDsls are stored in dsl_csvs)
+pf_data_classes = [
+    "ElmTerm",
+    "ElmStactrl",
+    "ElmLne",
+    "ElmTr2",
+    "ElmShnt",
+    "ElmLod",
+    "ElmSym",
+    "ElmGenstat",
+    "ElmPvsys",
+    "ElmSvs",
+]
+
+# column prefix groups, in the order they are stored in the element dictionary
+# res columns (results) are not used to make the network and are dropped
+column_groups = ["elm", "con", "typ", "mat", "grf", "gco", "msc"]
+dropped_column_groups = ["res"]
+
+# first characters of entries that could be parsed as an int or float
+numeric_start_chars = set("0123456789+-.iInN ")
+
+
+# returns the prefix group and parameter name of a csv header entry
+def split_column_name(file_path, param):
+    param_type = param.split("_")[0]
+    if param_type not in column_groups and param_type not in dropped_column_groups:
+        raise ValueError(f"Parameter {param} not recognized in {file_path}")
+    return param_type, param.replace(f"{param_type}_", "")
+
+
+# returns entry as an int if it is an integer literal, otherwise as a float
+# matches parse_row_entry_type for entries of a float column
+def parse_int_or_float(entry):
+    if entry.lstrip("+-").isdigit():
+        return int(entry)
+    return float(entry)
+
+
+# returns entry as a number if it could be one, otherwise as a string
+# matches parse_row_entry_type for entries of a string column
+def parse_str_or_number(entry):
+    if entry[:1] in numeric_start_chars:
+        return parse_row_entry_type(entry)
+    return entry
+
+
+# converts a column of csv entries in a single pass
+# the column type is inferred once: int, then float, then string
+# missing entries ("NA") are returned as None
+def parse_column(entries):
+    present = [entry for entry in entries if entry != "NA"]
+    try:
+        values = list(map(int, present))
+    except ValueError:
+        try:
+            list(map(float, present))
+            values = list(map(parse_int_or_float, present))
+        except ValueError:
+            values = list(map(parse_str_or_number, present))
+
+    # reinsert missing entries
+    if len(present) == len(entries):
+        return values
+    values = iter(values)
+    return [None if entry == "NA" else next(values) for entry in entries]
+
+
+# converts a column of a specific group/parameter
+# descriptions, matrix entries and graphical coordinates are converted from their raw strings
+def parse_group_column(param_type, param, entries):
+    if param_type == "elm" and param == "desc":
+        return [None if e == "NA" else e.split("\n") for e in entries]
+    elif param_type == "mat":
+        return [None if e == "NA" else decode_matrix_row(e) for e in entries]
+    elif param_type == "gco":
+        return [None if e == "NA" else decode_coordinates(e) for e in entries]
+    return parse_column(entries)
+
+
+# converts a single entry of a specific group/parameter
+# gives the same value as parse_group_column for that entry
+def parse_group_entry(param_type, param, entry):
+    if param_type == "elm" and param == "desc":
+        return entry.split("\n")
+    elif param_type == "mat":
+        return decode_matrix_row(entry)
+    elif param_type == "gco":
+        return decode_coordinates(entry)
+    return parse_row_entry_type(entry)
+
+
+# group of an element's data that is decoded from the raw csv entries when first accessed
+# raw_columns are (param, entries) pairs shared by all rows of the csv
+class LazyColumnGroup(MutableMapping):
+    def __init__(self, param_type, raw_columns, row_idx):
+        self.param_type = param_type
+        self.raw_columns = raw_columns
+        self.row_idx = row_idx
+        self.values = None
+
+    # decodes the raw entries of this row
+    def decoded(self):
+        if self.values is None:
+            self.values = {
+                param: parse_group_entry(self.param_type, param, entries[self.row_idx])
+                for (param, entries) in self.raw_columns
+                if entries[self.row_idx] != "NA"
+            }
+            self.raw_columns = None
+        return self.values
+
+    def __getitem__(self, key):
+        return self.decoded()[key]
+
+    def __setitem__(self, key, value):
+        self.decoded()[key] = value
+
+    def __delitem__(self, key):
+        del self.decoded()[key]
+
+    def __iter__(self):
+        return iter(self.decoded())
+
+    def __len__(self):
+        return len(self.decoded())
+
+    def __repr__(self):
+        if self.values is None:
+            return f"LazyColumnGroup({self.param_type}, not decoded)"
+        return repr(self.values)
+
+
+# returns the column groups to materialize, checking that they are valid
+def get_materialized_groups(groups):
+    if groups is None:
+        return set(column_groups)
+    for param_type in groups:
+        if param_type not in column_groups:
+            raise ValueError(
+                f"Column group {param_type} not recognized. Valid groups: {column_groups}"
+            )
+    return set(groups)
+
+
+# parse a csv file of data for elements of a specific class column by column
+# returns the same dictionary as parse_csv
+# groups not in the materialized groups are stored as LazyColumnGroups and decoded when accessed
+def parse_csv_columns(app, file_path, groups=None):
+    materialized_groups = get_materialized_groups(groups)
+    elm_class_data = {}
+    if not file_path.exists():
+        app.PrintInfo(f"File {file_path} not found")
+        return elm_class_data
+
+    with open(file_path) as file:
+        csvreader = csv.reader(file)
+        header = next(csvreader)
+        rows = list(csvreader)
+    for row in rows:
+        if len(row) != len(header):
+            raise ValueError(
+                f"Row {row[0]} of {file_path} has {len(row)} entries, expected {len(header)}"
+            )
+    if len(rows) == 0:
+        return elm_class_data
+
+    # infer group of each column and convert whole columns
+    # columns of lazy groups are kept as raw entries
+    group_columns = {param_type: [] for param_type in column_groups}
+    for param, entries in zip(header, zip(*rows)):
+        (param_type, param_name) = split_column_name(file_path, param)
+        if param_type in dropped_column_groups:
+            continue
+        elif param_type in materialized_groups:
+            entries = parse_group_column(param_type, param_name, entries)
+        group_columns[param_type].append((param_name, entries))
+    group_columns = {k: v for k, v in group_columns.items() if len(v) != 0}
+
+    # assemble element dictionaries
+    idx_of = header_indexes(header)
+    for row_idx, row in enumerate(rows):
+        elm_data = {}
+        for param_type, columns in group_columns.items():
+            if param_type not in materialized_groups:
+                if any(entries[row_idx] != "NA" for (_, entries) in columns):
+                    elm_data[param_type] = LazyColumnGroup(param_type, columns, row_idx)
+                continue
+            group_data = {
+                param_name: values[row_idx]
+                for (param_name, values) in columns
+                if values[row_idx] is not None
+            }
+            if len(group_data) != 0:
+                elm_data[param_type] = group_data
+        elm_class_data[row[idx_of["elm_loc_name"]]] = elm_data
+
+    return elm_class_data
+
+
+# parse dsl model type from dsl file name
+def get_dsl_model_type(dsl_file_path, prefix="pf_data_"):
+    dsl_model_type = str(dsl_file_path.name).replace(prefix, "")
+    dsl_model_type = dsl_model_type.replace(".csv", "")
+    return dsl_model_type
+
+
+# adds the dsl data parsed from one dsl csv to the connected generators
+def attach_dsl_data(data, dsl_model_type, all_dsl_data):
+    for dsl_name, dsl_data in all_dsl_data.items():
+        try:
+            con_gen_full_name = dsl_data["con"]["gen"]
+        except:
+            raise ValueError(f"Error parsing {dsl_name}. con_gen not found in dsl data")
+        try:
+            (con_gen_name, con_gen_class) = con_gen_full_name.split(".")
+        except:
+            raise ValueError(
+                f"Error parsing {dsl_name}. Generator name and class not parsable from {dsl_data['con']['gen']}"
+            )
+        try:
+            con_gen = data["network"][con_gen_class][con_gen_name]
+        except:
+            raise ValueError(
+                f"Error parsing {dsl_name}. Generator {con_gen_name}.{con_gen_class} not found in network data"
+            )
+
+        # add dsl data to generator dict
+        if "dsl" not in con_gen:  # create dsl dict if it doesn't exist
+            con_gen["dsl"] = {}
+        con_gen["dsl"][dsl_model_type] = dsl_data
+
+
+# parses a single csv in a worker process and returns the data and parse time
+# app is not available in worker processes, so missing files are handled by the caller
+def parse_csv_in_worker(file_path, columnar, groups=None):
     ts = perf_counter()
-    # initialise data dict
-    data["network"] = {}
+    if columnar:
+        return parse_csv_columns(None, file_path, groups), perf_counter() - ts
+    return parse_csv(None, file_path), perf_counter() - ts
 
-    # parse data of all non ELmDsl classes
+
+# parses all pf data and dsl csvs concurrently in a process pool
+# results are merged in the same order as the sequential parser, so the data is identical
+# python_executable must be set when running inside PowerFactory, where sys.executable
+# is the PowerFactory executable rather than a python interpreter
+def parse_network_csvs_in_parallel(
+    app,
+    data,
+    data_dir,
+    prefix,
+    columnar,
+    groups=None,
+    max_workers=None,
+    python_executable=None,
+):
+    # get csv files, in the order they are merged
     dir_path = Path(data_dir)
-    data["network"]["ElmTerm"] = parse_csv(app, data_dir / f"{prefix}ElmTerm.csv")
-    data["network"]["ElmStactrl"] = parse_csv(app, data_dir / f"{prefix}ElmStactrl.csv")
-    data["network"]["ElmLne"] = parse_csv(app, data_dir / f"{prefix}ElmLne.csv")
-    data["network"]["ElmTr2"] = parse_csv(app, data_dir / f"{prefix}ElmTr2.csv")
-    data["network"]["ElmShnt"] = parse_csv(app, data_dir / f"{prefix}ElmShnt.csv")
-    data["network"]["ElmLod"] = parse_csv(app, data_dir / f"{prefix}ElmLod.csv")
-    data["network"]["ElmSym"] = parse_csv(app, data_dir / f"{prefix}ElmSym.csv")
-    data["network"]["ElmGenstat"] = parse_csv(app, data_dir / f"{prefix}ElmGenstat.csv")
-    data["network"]["ElmPvsys"] = parse_csv(app, data_dir / f"{prefix}ElmPvsys.csv")
-    data["network"]["ElmSvs"] = parse_csv(app, data_dir / f"{prefix}ElmSvs.csv")
-
-    # parse ElmDsls
-    dsls_dir = dir_path / "dsl_csvs"
-    for dsl_file_path in dsls_dir.iterdir():
-        # get dsl data
-        all_dsl_data = parse_csv(app, dsls_dir / dsl_file_path)
-
-        # get connected generator
-        for dsl_name, dsl_data in all_dsl_data.items():
-            try:
-                con_gen_full_name = dsl_data["con"]["gen"]
-            except:
-                raise ValueError(
-                    f"Error parsing {dsl_name}. con_gen not found in dsl data"
-                )
-            try:
-                (con_gen_name, con_gen_class) = con_gen_full_name.split(".")
-            except:
-                raise ValueError(
-                    f"Error parsing {dsl_name}. Generator name and class not parsable from {dsl_data['con']['gen']}"
-                )
-            try:
-                con_gen = data["network"][con_gen_class][con_gen_name]
-            except:
-                raise ValueError(
-                    f"Error parsing {dsl_name}. Generator {con_gen_name}.{con_gen_class} not found in network data"
+    elm_class_files = [
+        (elm_class, dir_path / f"{prefix}{elm_class}.csv")
+        for elm_class in pf_data_classes
+    ]
+    dsl_files = [
+        (get_dsl_model_type(dsl_file_path, prefix), dsl_file_path)
+        for dsl_file_path in (dir_path / "dsl_csvs").iterdir()
+    ]
+
+    # start workers
+    mp_context = multiprocessing.get_context("spawn")
+    if python_executable is not None:
+        mp_context.set_executable(str(python_executable))
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as pool:
+        futures = {}
+        for name, file_path in elm_class_files + dsl_files:
+            if file_path.exists():
+                futures[name] = pool.submit(
+                    parse_csv_in_worker, file_path, columnar, groups
                 )
+            else:
+                app.PrintInfo(f"File {file_path} not found")
+
+        # collect results and report timing per file
+        parsed = {}
+        for name, file_path in elm_class_files + dsl_files:
+            if name in futures:
+                (parsed[name], t_parse) = futures[name].result()
+                app.PrintInfo(f"parsed {file_path.name} in: \t{round(t_parse, 3)}")
+            else:
+                parsed[name] = {}
+
+    # merge
+    data["network"] = {}
+    for elm_class, _ in elm_class_files:
+        data["network"][elm_class] = parsed[elm_class]
+    for dsl_model_type, _ in dsl_files:
+        attach_dsl_data(data, dsl_model_type, parsed[dsl_model_type])
+
+
+# name of the folder in data_dir where parsed network snapshots are stored
+snapshot_dir_name = ".network_snapshots"
+
+
+# returns a hash of the csvs in data_dir, the parser source and the parser options
+# any change to a csv (size, modification time or contents) gives a new hash
+def hash_network_csvs(data_dir, prefix, columnar, groups=None):
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(
+        f"{prefix}|{columnar}|{sorted(get_materialized_groups(groups))}".encode()
+    )
+    hasher.update(Path(__file__).read_bytes())
+    for file_path in sorted(Path(data_dir).rglob("*.csv")):
+        file_stat = file_path.stat()
+        hasher.update(
+            f"{file_path.relative_to(data_dir).as_posix()}|{file_stat.st_size}|{file_stat.st_mtime_ns}".encode()
+        )
+        hasher.update(hashlib.blake2b(file_path.read_bytes()).digest())
+    return hasher.hexdigest()
+
+
+# returns the key of data_dir in snapshot names, a hash of its resolved path, so that snapshots of
+# different data directories can share a snapshot_dir
+def get_data_dir_key(data_dir):
+    return hashlib.blake2b(
+        str(Path(data_dir).resolve()).encode(), digest_size=6
+    ).hexdigest()
+
+
+# returns the path of the snapshot for the csvs in data_dir
+def get_snapshot_path(
+    data_dir, prefix="pf_data_", columnar=True, groups=None, snapshot_dir=None
+):
+    if snapshot_dir is None:
+        snapshot_dir = Path(data_dir) / snapshot_dir_name
+    csv_hash = hash_network_csvs(data_dir, prefix, columnar, groups)
+    return (
+        Path(snapshot_dir) / f"network_{get_data_dir_key(data_dir)}_{csv_hash}.pickle"
+    )
+
+
+# loads data["network"] from a snapshot, returns false if the snapshot doesn't exist
+def load_network_snapshot(app, data, snapshot_path):
+    if not snapshot_path.exists():
+        return False
+    try:
+        with open(snapshot_path, "rb") as file:
+            data["network"] = pickle.load(file)
+    except Exception as e:
+        app.PrintWarn(f"Could not load network snapshot {snapshot_path.name}: {e}")
+        return False
+    return True
+
+
+# writes data["network"] to a snapshot and deletes snapshots of previous csvs of the same data
+# directory
+# must be called before network objects are added to data["network"]
+def save_network_snapshot(app, data, snapshot_path):
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    data_dir_key = snapshot_path.stem.split("_")[1]
+    for old_snapshot_path in snapshot_path.parent.glob(
+        f"network_{data_dir_key}_*.pickle"
+    ):
+        if old_snapshot_path != snapshot_path:
+            old_snapshot_path.unlink()
+
+    # write to a temporary file first so an interrupted write can't leave a broken snapshot
+    tmp_path = snapshot_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as file:
+        pickle.dump(data["network"], file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, snapshot_path)
+
+
+# parse all network data from csv files
+# csvs are parsed column by column unless columnar is False
+# if use_snapshot is True, the parsed data is saved to a snapshot that is reloaded
+# on later runs until any of the csvs change
+# if parallel is True, csvs are parsed concurrently in a process pool
+# groups sets the column groups (elm, con, typ, mat, grf, gco, msc) that are decoded while
+# parsing, the remaining groups are decoded only if they are accessed. e.g. for builds without a
+# network diagram, use groups=["elm", "con", "typ", "mat", "msc"] (columnar parser only)
+def parse_network_from_csvs(
+    app,
+    data,
+    data_dir,
+    prefix="pf_data_",
+    columnar=True,
+    groups=None,
+    use_snapshot=True,
+    snapshot_dir=None,
+    parallel=False,
+    max_workers=None,
+    python_executable=None,
+):
+    ts = perf_counter()
+
+    # reload network data from snapshot if the csvs haven't changed
+    if use_snapshot:
+        snapshot_path = get_snapshot_path(
+            data_dir, prefix, columnar, groups, snapshot_dir
+        )
+        if load_network_snapshot(app, data, snapshot_path):
+            app.PrintInfo(
+                f"got data from snapshot in: \t{round(perf_counter() - ts, 3)}"
+            )
+            return
+
+    if groups is not None and not columnar:
+        raise ValueError("Lazy column groups are only supported by the columnar parser")
+
+    if parallel:
+        parse_network_csvs_in_parallel(
+            app,
+            data,
+            data_dir,
+            prefix,
+            columnar,
+            groups,
+            max_workers,
+            python_executable,
+        )
+    else:
+        if columnar:
+            parse_file = partial(parse_csv_columns, groups=groups)
+        else:
+            parse_file = parse_csv
+
+        # initialise data dict
+        data["network"] = {}
 
-            # add dsl data to generator dict
-            if "dsl" not in con_gen:  # create dsl dict if it doesn't exist
-                con_gen["dsl"] = {}
+        # parse data of all non ELmDsl classes
+        dir_path = Path(data_dir)
+        for elm_class in pf_data_classes:
+            data["network"][elm_class] = parse_file(
+                app, data_dir / f"{prefix}{elm_class}.csv"
+            )
 
-            # parse dsl model type from dsl file name
-            dsl_model_type = str(dsl_file_path.name).replace(prefix, "")
-            dsl_model_type = dsl_model_type.replace(prefix, "")
-            dsl_model_type = dsl_model_type.replace(".csv", "")
+        # parse ElmDsls and add them to their generators
+        dsls_dir = dir_path / "dsl_csvs"
+        for dsl_file_path in dsls_dir.iterdir():
+            attach_dsl_data(
+                data,
+                get_dsl_model_type(dsl_file_path, prefix),
+                parse_file(app, dsls_dir / dsl_file_path),
+            )
 
-            # add dsl data to generator dict
-            con_gen["dsl"][dsl_model_type] = dsl_data
+    # save snapshot for later runs
+    if use_snapshot:
+        save_network_snapshot(app, data, snapshot_path)
 
     app.PrintInfo(f"got data in: \t\t{round(perf_counter() - ts, 2)}")
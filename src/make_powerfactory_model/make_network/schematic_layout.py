@@ -0,0 +1,240 @@
+import csv
+from array import array
+from pathlib import Path
+from time import perf_counter
+import numpy as np
+import powerfactory
+
+# Schematic layout from bus coordinates
+# Computes the grf and gco data of all elements from a bus_xy csv (name, x, y), using the
+# layout of write_pf_data_csvs/graphical_data.jl:
+# - buses are placed at their coordinates, normalised so that the minimum x and y are 10
+# - each connection to a bus has a slot 2 grid units wide along the bus. Branches leaving
+#   upwards (angle >= 0) are drawn above the bus, all other connections below it, ordered by
+#   angle. The first slot below the bus is left free for the results box
+# - generators, loads and shunts are drawn 4 grid units below their slot
+# - branches are drawn from their slot at each bus to the midpoint of the two slots
+# All elements are laid out together in vectorized passes over a table of bus connections.
+
+# size of a diagram grid unit in PowerFactory
+pf_grid_size = 4.375
+
+# connection types, in the order connections in the same direction and angle are placed
+connection_types = ["branch", "gen", "load", "shunt"]
+
+# classes of each connection type and the con_* entries of their buses
+branch_buses = {"ElmLne": ["bus1", "bus2"], "ElmTr2": ["buslv", "bushv"]}
+shunt_classes = {
+    "gen": ["ElmSym", "ElmGenstat", "ElmPvsys", "ElmSvs"],
+    "load": ["ElmLod"],
+    "shunt": ["ElmShnt"],
+}
+
+# symbol of each class
+symbol_names = {
+    "ElmTerm": "TermStrip",
+    "ElmSym": "d_symg",
+    "ElmGenstat": "d_genstat",
+    "ElmPvsys": "d_genstat",
+    "ElmSvs": "d_svs",
+    "ElmLod": "d_load",
+    "ElmShnt": "d_shunt",
+    "ElmLne": "d_lin",
+    "ElmTr2": "d_lin",
+}
+
+
+# returns the bus names and an (n, 2) array of their coordinates
+def read_bus_xy(bus_xy_path):
+    with open(bus_xy_path, newline="") as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        rows = list(reader)
+    idx_name = header.index("name")
+    names = [row[idx_name] for row in rows]
+    xy = np.array(
+        [[row[header.index("x")], row[header.index("y")]] for row in rows], dtype=float
+    )
+    return (names, xy)
+
+
+# returns the coordinates of the network buses, in the order of data["network"]["ElmTerm"]
+# coordinates are normalised so that the minimum x and y of all buses in the csv are 10, as
+# the csv can include buses that are not in the network
+def get_bus_coordinates(data, bus_xy_path):
+    (names, xy) = read_bus_xy(bus_xy_path)
+    xy = xy - xy.min(axis=0) + 10
+    xy_idx = {name: i for i, name in enumerate(names)}
+    missing = [name for name in data["network"]["ElmTerm"] if name not in xy_idx]
+    if len(missing) != 0:
+        raise RuntimeError(
+            f"{len(missing)} buses not found in {bus_xy_path}, e.g. {missing[:5]}"
+        )
+    return xy[[xy_idx[name] for name in data["network"]["ElmTerm"]]]
+
+
+# returns the bus indexes of a con entry for all elements of each class
+def get_connected_buses(data, bus_idx, elm_classes, con):
+    elm_names = []
+    buses = []
+    for elm_class in elm_classes:
+        for elm_name, elm_data in data["network"].get(elm_class, {}).items():
+            elm_names.append((elm_class, elm_name))
+            buses.append(bus_idx[elm_data["con"][con]])
+    return (elm_names, np.array(buses, dtype=int))
+
+
+# returns the table of bus connections as a dict of arrays, one entry per connection
+# branches have a connection at each end, listed as all first ends then all second ends
+def get_connection_table(data, bus_xy):
+    bus_idx = {name: i for i, name in enumerate(data["network"]["ElmTerm"])}
+
+    # branch ends, lines then transformers
+    branch_names = []
+    ends = [[], []]
+    for elm_class, (con_1, con_2) in branch_buses.items():
+        (names, buses_1) = get_connected_buses(data, bus_idx, [elm_class], con_1)
+        (_, buses_2) = get_connected_buses(data, bus_idx, [elm_class], con_2)
+        branch_names += names
+        ends[0].append(buses_1)
+        ends[1].append(buses_2)
+    bus_1 = np.concatenate(ends[0])
+    bus_2 = np.concatenate(ends[1])
+    # angles of each end are calculated separately, as negating the differences of a horizontal
+    # branch gives an angle of -pi instead of pi
+    (dx_1, dy_1) = (bus_xy[bus_2] - bus_xy[bus_1]).T
+    (dx_2, dy_2) = (bus_xy[bus_1] - bus_xy[bus_2]).T
+    n_branches = len(branch_names)
+
+    table = {
+        "bus": [bus_1, bus_2],
+        "type": [np.zeros(2 * n_branches, dtype=int)],
+        "angle": [np.arctan2(dy_1, dx_1), np.arctan2(dy_2, dx_2)],
+        "seq": [np.arange(n_branches), np.arange(n_branches)],
+    }
+    elements = {"branch": branch_names}
+    for elm_type, elm_classes in shunt_classes.items():
+        (names, buses) = get_connected_buses(data, bus_idx, elm_classes, "bus1")
+        elements[elm_type] = names
+        table["bus"].append(buses)
+        table["type"].append(np.full(len(names), connection_types.index(elm_type)))
+        table["angle"].append(np.full(len(names), -np.pi / 2))
+        table["seq"].append(np.arange(len(names)))
+    table = {key: np.concatenate(values) for key, values in table.items()}
+    table["up"] = table["angle"] >= 0
+    return (table, elements)
+
+
+# returns the order of each connection along its bus
+# connections above the bus are ordered by decreasing angle and type, connections below by
+# increasing angle and type. ties keep the order the elements are listed in
+def get_connection_orders(table):
+    down = (~table["up"]).astype(int)
+    sign = np.where(table["up"], -1, 1)
+    sort_idx = np.lexsort(
+        (table["seq"], sign * table["type"], sign * table["angle"], down, table["bus"])
+    )
+    bus_sorted = table["bus"][sort_idx]
+    down_sorted = down[sort_idx]
+    positions = np.arange(len(sort_idx))
+    group_start = np.ones(len(sort_idx), dtype=bool)
+    group_start[1:] = (bus_sorted[1:] != bus_sorted[:-1]) | (
+        down_sorted[1:] != down_sorted[:-1]
+    )
+    rank = positions - np.maximum.accumulate(np.where(group_start, positions, 0))
+
+    orders = np.empty(len(sort_idx), dtype=int)
+    orders[sort_idx] = rank + 1 + down_sorted  # first slot below the bus is left free
+    return orders
+
+
+# returns the length of each bus in grid units, two units per connection on its busiest side
+def get_bus_lengths(table, n_buses):
+    is_branch = table["type"] == connection_types.index("branch")
+    n_up = np.bincount(table["bus"][table["up"] & is_branch], minlength=n_buses)
+    n_down = 1 + np.bincount(table["bus"][~table["up"]], minlength=n_buses)
+    return np.maximum(n_up, n_down) * 2
+
+
+# returns the grf and gco data of all elements, in grid units
+# format: {elm_class: {elm_name: {"grf": {...}, "gco": {...}}}}
+def compute_schematic_layout(data, bus_xy_path):
+    bus_xy = get_bus_coordinates(data, bus_xy_path)
+    (table, elements) = get_connection_table(data, bus_xy)
+    orders = get_connection_orders(table)
+    bus_lengths = get_bus_lengths(table, len(bus_xy))
+
+    # x coordinate of each connection point, and y coordinate of its bus
+    bus_left_x = bus_xy[:, 0] - bus_lengths / 2
+    cp_x = (bus_left_x[table["bus"]] + 1 + (orders - 1) * 2) * pf_grid_size
+    cp_y = bus_xy[table["bus"], 1] * pf_grid_size
+
+    layout = {elm_class: {} for elm_class in symbol_names.keys()}
+
+    # buses
+    bus_x = (bus_xy[:, 0] * pf_grid_size).tolist()
+    bus_y = (bus_xy[:, 1] * pf_grid_size).tolist()
+    bus_size = (bus_lengths / 6).tolist()
+    for i, bus_name in enumerate(data["network"]["ElmTerm"]):
+        layout["ElmTerm"][bus_name] = {
+            "grf": {
+                "rCenterX": bus_x[i],
+                "rCenterY": bus_y[i],
+                "rSizeX": bus_size[i],
+                "sSymNam": symbol_names["ElmTerm"],
+            }
+        }
+
+    # branches, from the midpoint of the connection points to each connection point
+    n_branches = len(elements["branch"])
+    (x_1, x_2) = (cp_x[:n_branches], cp_x[n_branches : 2 * n_branches])
+    (y_1, y_2) = (cp_y[:n_branches], cp_y[n_branches : 2 * n_branches])
+    centre = np.stack([(x_1 + x_2) / 2, (y_1 + y_2) / 2], axis=1).tolist()
+    points = np.stack([x_1, y_1, x_2, y_2], axis=1).tolist()
+    for i, (elm_class, elm_name) in enumerate(elements["branch"]):
+        (cx, cy) = centre[i]
+        (px_1, py_1, px_2, py_2) = points[i]
+        layout[elm_class][elm_name] = {
+            "grf": {"rCenterX": cx, "rCenterY": cy, "sSymNam": symbol_names[elm_class]},
+            "gco": {
+                "1_rX": array("d", [cx, px_1, px_1]),
+                "1_rY": array("d", [cy, py_1, py_1]),
+                "2_rX": array("d", [cx, px_2, px_2]),
+                "2_rY": array("d", [cy, py_2, py_2]),
+            },
+        }
+
+    # generators, loads and shunts, 4 grid units below their connection point
+    start = 2 * n_branches
+    for elm_type in ["gen", "load", "shunt"]:
+        end = start + len(elements[elm_type])
+        icon = np.stack(
+            [cp_x[start:end], cp_y[start:end] - 4 * pf_grid_size, cp_y[start:end]],
+            axis=1,
+        ).tolist()
+        for i, (elm_class, elm_name) in enumerate(elements[elm_type]):
+            (x, y_icon, y_bus) = icon[i]
+            layout[elm_class][elm_name] = {
+                "grf": {
+                    "rCenterX": x,
+                    "rCenterY": y_icon,
+                    "sSymNam": symbol_names[elm_class],
+                },
+                "gco": {"rX": array("d", [x, x]), "rY": array("d", [y_icon, y_bus])},
+            }
+        start = end
+    return layout
+
+
+# replaces the grf and gco data in data["network"] with the layout computed from bus_xy_path
+# make_network_diagram then draws the network with the new layout
+def apply_schematic_layout(app, data, bus_xy_path):
+    ts = perf_counter()
+    layout = compute_schematic_layout(data, bus_xy_path)
+    for elm_class, elms_layout in layout.items():
+        for elm_name, elm_layout in elms_layout.items():
+            data["network"][elm_class][elm_name].update(elm_layout)
+    app.PrintInfo(
+        f"Layout from {Path(bus_xy_path).name} computed in: \t{round(perf_counter() - ts, 3)}"
+    )
+    return layout
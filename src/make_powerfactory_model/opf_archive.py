@@ -0,0 +1,266 @@
+import os
+import csv
+import zipfile
+from pathlib import Path
+import numpy as np
+
+# OPF results archive
+# The OPF results of a stage are written as one directory per hour, each holding a csv per
+# component (results/opf/2050/stage_2/<hour>/gen.csv, ...). pack_opf_results packs all hours of
+# a stage into a single uncompressed npz archive beside the stage directory, with one
+# hour x element array per component column:
+# - "hours": the hour of each row, in increasing order
+# - "<component>/ind": the PowerModels index of each element column
+# - "<component>/columns": the columns of the component
+# - "<component>/<column>": hour x element array of values, NaN where the hour has no value or
+#   the csv entry is empty
+# - "<component>/present": hour x column array, True where the hour's csv has the column
+# - "metadata/<column>": the metadata of each hour, including the termination status
+# - "files/path", "files/mtime_ns", "files/size": the path (<hour>/<file>), modification time and
+#   size of each results csv packed
+# The arrays are stored uncompressed, so open_opf_archive memory maps them directly from the
+# archive, and reading the results of an hour only reads its rows.
+# The archive is not used once a results csv of the stage is added, removed or modified after
+# it was packed, and must then be packed again.
+
+# components with a results csv per hour
+opf_components = [
+    "gen",
+    "bus",
+    "branch",
+    "branchdc",
+    "busdc",
+    "convdc",
+    "load",
+    "shunt",
+]
+
+# metadata columns kept as strings
+metadata_string_columns = ["termination_status", "dual_status", "primal_status"]
+
+# opened archives, {archive path: (archive mtime, arrays)}
+opf_archives = {}
+
+
+# returns the path of the archive of a stage directory
+def get_opf_archive_path(stage_dir):
+    stage_dir = Path(stage_dir)
+    return stage_dir.parent / f"{stage_dir.name}_opf_archive.npz"
+
+
+# returns the hour directories of a stage directory, sorted by hour
+def get_hour_dirs(stage_dir):
+    hour_dirs = [
+        hour_dir
+        for hour_dir in Path(stage_dir).iterdir()
+        if hour_dir.is_dir() and hour_dir.name.isdigit()
+    ]
+    return sorted(hour_dirs, key=lambda hour_dir: int(hour_dir.name))
+
+
+# returns the path (<hour>/<file>), modification time and size of each results csv of a stage
+# directory, sorted by path
+def scan_results_files(stage_dir):
+    files = []
+    for hour_dir in get_hour_dirs(stage_dir):
+        with os.scandir(hour_dir) as entries:
+            for entry in entries:
+                if not (entry.is_file() and entry.name.endswith(".csv")):
+                    continue
+                stat = entry.stat()
+                files.append(
+                    (f"{hour_dir.name}/{entry.name}", stat.st_mtime_ns, stat.st_size)
+                )
+    return sorted(files)
+
+
+# returns the arrays of the results files of a stage directory, as stored in the archive
+def pack_results_files(files):
+    return {
+        "files/path": np.array([path for (path, _, _) in files], dtype=str),
+        "files/mtime_ns": np.array([mtime for (_, mtime, _) in files], dtype=np.int64),
+        "files/size": np.array([size for (_, _, size) in files], dtype=np.int64),
+    }
+
+
+# returns true if the results files recorded in an archive are the files of the stage directory
+def is_archive_current(archive, files):
+    if "files/path" not in archive:
+        return False
+    return (
+        archive["files/path"].tolist() == [path for (path, _, _) in files]
+        and archive["files/mtime_ns"].tolist() == [mtime for (_, mtime, _) in files]
+        and archive["files/size"].tolist() == [size for (_, _, size) in files]
+    )
+
+
+def read_results_csv(csv_path):
+    with open(csv_path, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    return (header, rows)
+
+
+# returns the arrays of a component, from the csv rows of each hour (None where the csv is missing)
+# the elements of the component must be the same in all hours
+def pack_component(component, hour_csvs):
+    ids = None
+    columns = []
+    for hour_csv in hour_csvs:
+        if hour_csv is None:
+            continue
+        (header, rows) = hour_csv
+        hour_ids = [row[header.index("ind")] for row in rows]
+        if ids is None:
+            ids = hour_ids
+        elif hour_ids != ids:
+            raise ValueError(
+                f"{component} results do not have the same elements each hour"
+            )
+        columns += [column for column in header if column not in columns + ["ind"]]
+    if ids is None:
+        return {}
+
+    arrays = {
+        f"{component}/ind": np.array(ids, dtype=str),
+        f"{component}/columns": np.array(columns, dtype=str),
+        f"{component}/present": np.zeros((len(hour_csvs), len(columns)), dtype=bool),
+    }
+    for column in columns:
+        arrays[f"{component}/{column}"] = np.full((len(hour_csvs), len(ids)), np.nan)
+    for i, hour_csv in enumerate(hour_csvs):
+        if hour_csv is None:
+            continue
+        (header, rows) = hour_csv
+        values = np.array(rows, dtype=str).reshape(len(rows), len(header))
+        values[values == ""] = "nan"
+        for j, column in enumerate(header):
+            if column == "ind":
+                continue
+            arrays[f"{component}/{column}"][i] = values[:, j].astype(float)
+            arrays[f"{component}/present"][i, columns.index(column)] = True
+    return arrays
+
+
+# returns the metadata arrays, from the metadata csv of each hour
+def pack_metadata(hour_csvs):
+    columns = []
+    for header, _ in hour_csvs:
+        columns += [column for column in header if column not in columns]
+    arrays = {}
+    for column in columns:
+        values = [
+            rows[0][header.index(column)] if column in header else ""
+            for (header, rows) in hour_csvs
+        ]
+        if column in metadata_string_columns:
+            arrays[f"metadata/{column}"] = np.array(values, dtype=str)
+        else:
+            arrays[f"metadata/{column}"] = np.array(
+                [np.nan if value == "" else float(value) for value in values]
+            )
+    return arrays
+
+
+# returns the arrays of the results of all hours of a stage directory, as stored in the archive
+# the files are scanned before they are read, so that files modified while they are read make
+# the archive out of date
+def read_opf_results(stage_dir):
+    files = scan_results_files(stage_dir)
+    hour_dirs = get_hour_dirs(stage_dir)
+
+    arrays = {"hours": np.array([int(hour_dir.name) for hour_dir in hour_dirs])}
+    arrays.update(pack_results_files(files))
+    arrays.update(
+        pack_metadata(
+            [read_results_csv(hour_dir / "metadata.csv") for hour_dir in hour_dirs]
+        )
+    )
+    for component in opf_components:
+        hour_csvs = [
+            (
+                read_results_csv(hour_dir / f"{component}.csv")
+                if (hour_dir / f"{component}.csv").exists()
+                else None
+            )
+            for hour_dir in hour_dirs
+        ]
+        arrays.update(pack_component(component, hour_csvs))
+    return arrays
+
+
+# packs the results of all hours of a stage directory into an archive
+# returns the archive path
+def pack_opf_results(stage_dir, archive_path=None):
+    if archive_path is None:
+        archive_path = get_opf_archive_path(stage_dir)
+    archive_path = Path(archive_path)
+    arrays = read_opf_results(stage_dir)
+
+    # written to a temporary file first, so that an interrupted pack leaves no archive
+    temp_path = archive_path.with_name(f"{archive_path.stem}.tmp.npz")
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, archive_path)
+    return archive_path
+
+
+# returns the arrays of an archive, memory mapped from the archive file
+def open_opf_archive(archive_path):
+    arrays = {}
+    with zipfile.ZipFile(archive_path) as archive, open(archive_path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename.removesuffix(".npy")
+            # compressed members, e.g. of archives packed elsewhere, are read into memory
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info.filename))
+                continue
+            # the data of each member follows its local header, and then the npy header
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            name_length = int.from_bytes(local_header[26:28], "little")
+            extra_length = int.from_bytes(local_header[28:30], "little")
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(f)
+            else:
+                header = np.lib.format.read_array_header_2_0(f)
+            (shape, fortran_order, dtype) = header
+            if np.prod(shape) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(
+                    archive_path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=f.tell(),
+                    shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+    return arrays
+
+
+# returns the arrays of the archive of a stage directory, or None if the stage has no archive or
+# its results files changed after the archive was packed
+# archives are opened once, and again when the archive file changes
+def get_opf_archive(stage_dir):
+    archive_path = get_opf_archive_path(stage_dir)
+    if not archive_path.exists():
+        return None
+    archive_mtime = archive_path.stat().st_mtime
+    cached = opf_archives.get(archive_path)
+    if cached is None or cached[0] != archive_mtime:
+        opf_archives[archive_path] = (archive_mtime, open_opf_archive(archive_path))
+    archive = opf_archives[archive_path][1]
+    if not is_archive_current(archive, scan_results_files(stage_dir)):
+        return None
+    return archive
+
+
+# returns the row of an hour in an archive, or None if the hour is not in the archive
+def get_hour_position(archive, hour):
+    position = int(np.searchsorted(archive["hours"], hour))
+    if position < len(archive["hours"]) and archive["hours"][position] == hour:
+        return position
+    return None
@@ -0,0 +1,145 @@
+import os
+import csv
+from pathlib import Path
+
+# OPF results manifest
+# get_opf_manifest returns the hour, termination status, solve time and objective of each hour
+# of a stage directory, from one scan of the stage directory. The manifest is cached in memory
+# and in <stage>_opf_manifest.csv beside the stage directory, with the modification time of the
+# metadata csv of each hour, and the metadata csv of an hour is only read again when its
+# modification time changes. Hours added to or removed from the stage are picked up by the scan.
+# get_solved_hours selects the solved hours, e.g. for the hours of operation scenarios or studies.
+
+# termination statuses of solved hours
+solved_statuses = ["LOCALLY_SOLVED", "ALMOST_LOCALLY_SOLVED"]
+
+# columns of the manifest csv
+manifest_columns = [
+    "hour",
+    "termination_status",
+    "solve_time",
+    "objective",
+    "metadata_mtime",
+]
+
+# manifests read or built, {manifest path: {hour: entry}}
+opf_manifests = {}
+
+
+# returns the path of the manifest of a stage directory
+def get_opf_manifest_path(stage_dir):
+    stage_dir = Path(stage_dir)
+    return stage_dir.parent / f"{stage_dir.name}_opf_manifest.csv"
+
+
+# returns the modification time of the metadata csv of each hour directory of a stage directory
+# hours without a metadata csv have a modification time of None
+def scan_stage_dir(stage_dir):
+    metadata_mtimes = {}
+    with os.scandir(stage_dir) as entries:
+        for entry in entries:
+            if not (entry.is_dir() and entry.name.isdigit()):
+                continue
+            try:
+                mtime = os.stat(Path(entry.path) / "metadata.csv").st_mtime
+            except FileNotFoundError:
+                mtime = None
+            metadata_mtimes[int(entry.name)] = mtime
+    return metadata_mtimes
+
+
+# returns the manifest entry of an hour from its metadata csv
+def read_hour_metadata(hour_dir, hour, metadata_mtime):
+    entry = {
+        "hour": hour,
+        "termination_status": "",
+        "solve_time": float("nan"),
+        "objective": float("nan"),
+        "metadata_mtime": metadata_mtime,
+    }
+    if metadata_mtime is None:
+        return entry
+    with open(Path(hour_dir) / "metadata.csv", "r", newline="") as f:
+        row = next(csv.DictReader(f), {})
+    entry["termination_status"] = row.get("termination_status", "")
+    for column in ["solve_time", "objective"]:
+        if row.get(column, "") != "":
+            entry[column] = float(row[column])
+    return entry
+
+
+def read_opf_manifest_file(manifest_path):
+    if not Path(manifest_path).exists():
+        return {}
+    manifest = {}
+    with open(manifest_path, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            hour = int(row["hour"])
+            manifest[hour] = {
+                "hour": hour,
+                "termination_status": row["termination_status"],
+                "solve_time": float(row["solve_time"]),
+                "objective": float(row["objective"]),
+                "metadata_mtime": (
+                    None
+                    if row["metadata_mtime"] == ""
+                    else float(row["metadata_mtime"])
+                ),
+            }
+    return manifest
+
+
+def write_opf_manifest_file(manifest_path, manifest):
+    with open(manifest_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=manifest_columns)
+        writer.writeheader()
+        for entry in manifest.values():
+            writer.writerow(
+                {
+                    **entry,
+                    "metadata_mtime": (
+                        ""
+                        if entry["metadata_mtime"] is None
+                        else entry["metadata_mtime"]
+                    ),
+                }
+            )
+
+
+# returns the manifest of a stage directory, {hour: entry} in increasing order of hour
+# each entry has the columns in manifest_columns
+def get_opf_manifest(stage_dir):
+    manifest_path = get_opf_manifest_path(stage_dir)
+    if manifest_path not in opf_manifests:
+        opf_manifests[manifest_path] = read_opf_manifest_file(manifest_path)
+    cached = opf_manifests[manifest_path]
+
+    manifest = {}
+    n_read = 0
+    for hour, metadata_mtime in sorted(scan_stage_dir(stage_dir).items()):
+        entry = cached.get(hour)
+        if entry is None or entry["metadata_mtime"] != metadata_mtime:
+            entry = read_hour_metadata(
+                Path(stage_dir) / str(hour), hour, metadata_mtime
+            )
+            n_read += 1
+        manifest[hour] = entry
+
+    if n_read != 0 or list(manifest.keys()) != list(cached.keys()):
+        write_opf_manifest_file(manifest_path, manifest)
+    opf_manifests[manifest_path] = manifest
+    return manifest
+
+
+# returns true if the manifest entry of an hour is solved
+def is_solved(entry, statuses=solved_statuses):
+    return entry is not None and entry["termination_status"] in statuses
+
+
+# returns the hours of a stage directory with a termination status in statuses
+def get_solved_hours(stage_dir, statuses=solved_statuses):
+    return [
+        hour
+        for hour, entry in get_opf_manifest(stage_dir).items()
+        if is_solved(entry, statuses)
+    ]
@@ -0,0 +1,182 @@
+from pathlib import Path
+import importlib
+import numpy as np
+
+import opf_archive
+
+importlib.reload(opf_archive)
+
+from opf_archive import *
+
+# Stage setpoints
+# transform_setpoints applies the rules of the parse_*_rows functions of applyscenario.py to all
+# hours of a stage at once, from the arrays of its opf results archive (or of read_opf_results).
+# The setpoints of each component are hour x element arrays, in the element order of the
+# archive:
+# - "ind": the PowerModels index of each element
+# - "present": True for the hours that have results for the component
+# - one array for each setpoint, e.g. "pgini", "qgini" and "outserv" of the generators
+# get_hour_setpoint_data returns the setpoints of an hour in the format of
+# parse_setpoint_from_opf_results.
+
+# setpoints of each component, in the order of the setpoint data of an hour
+setpoint_columns = {
+    "gen": ["pgini", "qgini", "outserv"],
+    "convdc": ["pgini", "qgini", "outserv"],
+    "load": ["plini", "qlini", "outserv"],
+    "bus": ["vm", "va"],
+    "branch": ["tm", "tap_percentage"],
+    "shunt": ["outserv"],
+}
+
+# transformed stages, {(stage directory, baseMVA): (archive, setpoints)}
+transformed_stages = {}
+
+
+# returns where values are close to target, as math.isclose with its default relative tolerance
+def isclose(values, target, abs_tol):
+    tolerance = np.maximum(1e-9 * np.maximum(np.abs(values), abs(target)), abs_tol)
+    return np.isfinite(values) & (np.abs(values - target) <= tolerance)
+
+
+# returns the values of a column and the hours that have it, or None if no hour has it
+def get_column(arrays, component, column):
+    columns = arrays[f"{component}/columns"].tolist()
+    if column not in columns:
+        return None
+    has_column = np.asarray(arrays[f"{component}/present"][:, columns.index(column)])
+    return (np.asarray(arrays[f"{component}/{column}"]), has_column)
+
+
+# returns the element indexes and the hours with results of a component
+def get_component_index(arrays, component):
+    return {
+        "ind": arrays[f"{component}/ind"].tolist(),
+        "present": np.asarray(arrays[f"{component}/present"]).any(axis=1),
+    }
+
+
+# returns the outserv setpoints of a component and the hours that have the status column
+# where an hour has the status column, elements are out of service where it is close to 0,
+# otherwise the outserv column of the hour is used
+def get_outserv(arrays, component, status_column):
+    setpoints = get_component_index(arrays, component)
+    status = get_column(arrays, component, status_column)
+    outserv_column = get_column(arrays, component, "outserv")
+    n_hours = len(setpoints["present"])
+    has_status = np.zeros(n_hours, dtype=bool) if status is None else status[1]
+    has_outserv = (
+        np.zeros(n_hours, dtype=bool) if outserv_column is None else outserv_column[1]
+    )
+    if (setpoints["present"] & ~has_status & ~has_outserv).any():
+        raise ValueError(f"No {component} status found in {component} results file")
+
+    outserv = np.zeros((n_hours, len(setpoints["ind"])), dtype=int)
+    if outserv_column is not None:
+        outserv_values = np.nan_to_num(outserv_column[0]).astype(int)
+        outserv = np.where(has_outserv[:, None], outserv_values, outserv)
+    if status is not None:
+        is_off = isclose(status[0], 0.0, abs_tol=1e-5).astype(int)
+        outserv = np.where(has_status[:, None], is_off, outserv)
+    return (has_status, outserv)
+
+
+def transform_gens(arrays, baseMVA=100):
+    setpoints = get_component_index(arrays, "gen")
+    (has_alpha_g, outserv) = get_outserv(arrays, "gen", "alpha_g")
+    # generators switched off by alpha_g have no dispatch
+    is_zeroed = has_alpha_g[:, None] & (outserv == 1)
+    setpoints["pgini"] = np.where(is_zeroed, 0.0, arrays["gen/pg"] * baseMVA)
+    setpoints["qgini"] = np.where(is_zeroed, 0.0, arrays["gen/qg"] * baseMVA)
+    setpoints["outserv"] = outserv
+    return setpoints
+
+
+def transform_convs(arrays, baseMVA=100):
+    setpoints = get_component_index(arrays, "convdc")
+    setpoints["pgini"] = -np.asarray(arrays["convdc/pgrid"]) * baseMVA
+    setpoints["qgini"] = -np.asarray(arrays["convdc/qgrid"]) * baseMVA
+    setpoints["outserv"] = np.zeros(setpoints["pgini"].shape, dtype=int)
+    return setpoints
+
+
+def transform_loads(arrays, baseMVA=100):
+    setpoints = get_component_index(arrays, "load")
+    setpoints["plini"] = arrays["load/pd"] * baseMVA
+    setpoints["qlini"] = arrays["load/qd"] * baseMVA
+    setpoints["outserv"] = np.where(np.asarray(arrays["load/status"]) == 1, 0, 1)
+    return setpoints
+
+
+def transform_buses(arrays):
+    setpoints = get_component_index(arrays, "bus")
+    setpoints["vm"] = np.asarray(arrays["bus/vm"])
+    setpoints["va"] = np.asarray(arrays["bus/va"])
+    return setpoints
+
+
+# tap ratios are snapped to their limits of 0.9 and 1.1
+def transform_branches(arrays):
+    setpoints = get_component_index(arrays, "branch")
+    tm = np.asarray(arrays["branch/tm"])
+    tm = np.where(isclose(tm, 0.9, abs_tol=1e-5), 0.9, tm)
+    tm = np.where(isclose(tm, 1.1, abs_tol=1e-5), 1.1, tm)
+    setpoints["tm"] = tm
+    setpoints["tap_percentage"] = 100 * (tm - 1)
+    return setpoints
+
+
+def transform_shunts(arrays):
+    setpoints = get_component_index(arrays, "shunt")
+    (_, setpoints["outserv"]) = get_outserv(arrays, "shunt", "shunt_bigM")
+    return setpoints
+
+
+# returns the setpoints of all hours of a stage, from the arrays of its opf results
+def transform_setpoints(arrays, baseMVA=100):
+    stage_setpoints = {"hours": np.asarray(arrays["hours"])}
+    for component, transform, kwargs in [
+        ("gen", transform_gens, {"baseMVA": baseMVA}),
+        ("convdc", transform_convs, {"baseMVA": baseMVA}),
+        ("load", transform_loads, {"baseMVA": baseMVA}),
+        ("bus", transform_buses, {}),
+        ("branch", transform_branches, {}),
+        ("shunt", transform_shunts, {}),
+    ]:
+        if f"{component}/columns" in arrays:
+            stage_setpoints[component] = transform(arrays, **kwargs)
+    return stage_setpoints
+
+
+# returns the setpoints of all hours of a stage from its opf results archive, or None if the stage
+# has no archive (see get_opf_archive)
+# stages are transformed once, and again when the archive changes
+def get_stage_setpoints(stage_dir, baseMVA=100):
+    archive = get_opf_archive(stage_dir)
+    if archive is None:
+        return None
+    key = (Path(stage_dir).resolve(), baseMVA)
+    cached = transformed_stages.get(key)
+    if cached is None or cached[0] is not archive:
+        transformed_stages[key] = (archive, transform_setpoints(archive, baseMVA))
+    return transformed_stages[key][1]
+
+
+# returns the setpoint data of the hour at position, in the format of
+# parse_setpoint_from_opf_results
+def get_hour_setpoint_data(app, stage_setpoints, position):
+    setpoint_data = {}
+    for component, columns in setpoint_columns.items():
+        setpoints = stage_setpoints.get(component)
+        if setpoints is None or not setpoints["present"][position]:
+            if component != "shunt":
+                raise FileNotFoundError(f"No {component} results found for the hour")
+            app.PrintInfo("No shunt results found")
+            setpoint_data["shunt"] = {}
+            continue
+        values = [setpoints[column][position].tolist() for column in columns]
+        setpoint_data[component] = {
+            ind: dict(zip(columns, elm_values))
+            for ind, *elm_values in zip(setpoints["ind"], *values)
+        }
+    return setpoint_data
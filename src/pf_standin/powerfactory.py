@@ -0,0 +1,617 @@
+import fnmatch
+from time import perf_counter
+
+# In-memory stand-in for the powerfactory python module
+# Implements the subset of Application and DataObject used by this repository, so that the
+# network build, setpoint application and section isolation can be run and timed without
+# PowerFactory. Objects are plain python objects in a tree under the project, and attributes
+# are stored as given, without any checks against the PowerFactory data model.
+#
+# To use, add src/pf_standin to the start of sys.path before importing powerfactory
+#   sys.path.insert(0, str(path_src / "pf_standin"))
+#   import powerfactory
+#   app = powerfactory.GetApplication()
+#
+# Each API call sleeps for the latency configured for it (see set_latency), to approximate
+# the cost of calls into PowerFactory, and is counted in call_counts.
+#
+# Calculations are not run: ComLdf.Execute() returns 0 and calculation results (m:, c:, ...)
+# are 0.0 unless set, so load flow results, e.g. the branch flows read by section isolation
+# when no branch flow csv is given, must come from csvs.
+
+# latency of each API call in seconds, "default" is used for calls not listed
+latency = {"default": 0.0}
+
+# number of calls to each API method since the last reset_call_counts()
+call_counts = {}
+
+# attributes holding references to other objects, which are None until set
+pointer_attributes = {
+    "typ_id",
+    "bus1",
+    "bus2",
+    "buslv",
+    "bushv",
+    "obj_id",
+    "rembar",
+    "c_pmod",
+    "c_pstac",
+    "cpArea",
+    "pDataObj",
+    "pDataFolder",
+    "pDiagram",
+    "pbusbar",
+    "pcubic",
+}
+
+# network element classes whose attributes are recorded by the active operation scenario
+scenario_class_prefixes = ("Elm", "Sta")
+
+# folders returned by Application.GetProjectFolder
+project_folders = {
+    "study": ("Study Cases", "IntFolder"),
+    "equip": ("Equipment Type Library", "IntFolder"),
+    "netdat": ("Network Data", "IntFolder"),
+    "dia": ("Diagrams", "IntFolder"),
+    "scen": ("Operation Scenarios", "IntFolder"),
+    "blk": ("User Defined Models", "IntFolder"),
+    "scheme": ("Variations", "IntFolder"),
+    "netmod": ("Network Model", "IntFolder"),
+    "templ": ("Templates", "IntFolder"),
+}
+
+# folders of network data returned by Application.GetDataFolder, which exist in a new project
+data_folders = {"ElmArea": "Areas", "ElmZone": "Zones", "ElmBoundary": "Boundaries"}
+
+# options of operation scenarios, see set_scenario_options
+# keep_unsaved: keep the unsaved changes of a deactivated operation scenario until it is
+# activated again, instead of discarding them. Section isolation modifies the isolated scenario,
+# activates the base scenario to read its setpoints and saves the isolated scenario after
+# activating it again, so requires this
+scenario_options = {"keep_unsaved": False}
+
+_application = {"app": None}
+
+
+# sets the latency of API calls in seconds
+# e.g. set_latency(default=20e-6, CreateObject=200e-6)
+def set_latency(default=None, **calls):
+    if default is not None:
+        latency["default"] = default
+    latency.update(calls)
+
+
+def reset_latency():
+    for call in list(latency.keys()):
+        del latency[call]
+    latency["default"] = 0.0
+
+
+# e.g. set_scenario_options(keep_unsaved=True)
+def set_scenario_options(**options):
+    scenario_options.update(options)
+
+
+def reset_call_counts():
+    for call in list(call_counts.keys()):
+        del call_counts[call]
+
+
+# returns a copy of the call counts, sorted by method name
+def get_call_counts():
+    return dict(sorted(call_counts.items()))
+
+
+# counts a call and waits for its latency
+# a busy wait is used, as time.sleep is not accurate for latencies of a few microseconds
+def _call(name):
+    call_counts[name] = call_counts.get(name, 0) + 1
+    delay = latency.get(name, latency["default"])
+    if delay > 0:
+        t_end = perf_counter() + delay
+        while perf_counter() < t_end:
+            pass
+
+
+def _matches(obj, pattern):
+    if pattern == "*":
+        return True
+    if "." in pattern:
+        return fnmatch.fnmatchcase(f"{obj._name}.{obj._class}", pattern)
+    return fnmatch.fnmatchcase(obj._name, pattern)
+
+
+def _is_literal(pattern):
+    return not any(c in pattern for c in "*?[")
+
+
+# returns the matching objects in the tree below root, in creation order
+def _find(root, pattern, recursive):
+    # names without wildcards are looked up directly
+    if not recursive and _is_literal(pattern):
+        name = pattern.rsplit(".", 1)[0] if "." in pattern else pattern
+        return [obj for obj in root._by_name.get(name, []) if _matches(obj, pattern)]
+    found = []
+    for obj in root._children:
+        if _matches(obj, pattern):
+            found.append(obj)
+        if recursive and len(obj._children) != 0:
+            found.extend(_find(obj, pattern, recursive))
+    return found
+
+
+class DataObject:
+    def __init__(self, app, parent, class_name, name=None):
+        object.__setattr__(self, "_app", app)
+        object.__setattr__(self, "_parent", parent)
+        object.__setattr__(self, "_class", class_name)
+        object.__setattr__(self, "_name", name if name is not None else class_name)
+        object.__setattr__(self, "_attributes", {})
+        object.__setattr__(self, "_results", {})
+        object.__setattr__(self, "_children", [])
+        object.__setattr__(self, "_by_name", {})
+        object.__setattr__(self, "_deleted", False)
+        app._by_class.setdefault(class_name, {})[self] = None
+        # operation scenarios store the values of network element attributes set while active
+        if class_name == "IntScenario":
+            object.__setattr__(self, "_values", {})
+            object.__setattr__(self, "_pending", {})
+
+    def __repr__(self):
+        return self.GetFullName()
+
+    __str__ = __repr__
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.GetAttribute(name)
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            self.SetAttribute(name, value)
+
+    # tree
+
+    def _add_child(self, obj):
+        self._children.append(obj)
+        self._by_name.setdefault(obj._name, []).append(obj)
+
+    def _remove_child(self, obj):
+        self._children.remove(obj)
+        self._by_name[obj._name].remove(obj)
+
+    def _rename(self, name):
+        if self._parent is not None:
+            self._parent._by_name[self._name].remove(self)
+            self._parent._by_name.setdefault(name, []).append(self)
+        self._name = name
+
+    def _in_network(self):
+        return self._class.startswith(scenario_class_prefixes)
+
+    def CreateObject(self, class_name, name=None):
+        _call("CreateObject")
+        obj = DataObject(self._app, self, class_name, name)
+        self._add_child(obj)
+        return obj
+
+    # copies obj and its contents into this object, named by the joined name parts if given
+    # references between the copied objects point to their copies, other references are kept
+    def AddCopy(self, obj, *name_parts):
+        _call("AddCopy")
+        copies = {}
+        for original in [obj] + _find(obj, "*", 1):
+            parent = self if original is obj else copies[original._parent]
+            copy = DataObject(self._app, parent, original._class, original._name)
+            parent._add_child(copy)
+            copies[original] = copy
+        for original, copy in copies.items():
+            for name, value in original._attributes.items():
+                if isinstance(value, list):
+                    value = [
+                        copies.get(v, v) if isinstance(v, DataObject) else v
+                        for v in value
+                    ]
+                elif isinstance(value, DataObject):
+                    value = copies.get(value, value)
+                copy._attributes[name] = value
+            # operation scenarios are copied with their saved values
+            if original._class == "IntScenario":
+                copy._values.update(original._values)
+        if len(name_parts) != 0:
+            copies[obj]._rename("".join(str(part) for part in name_parts))
+        return copies[obj]
+
+    def GetContents(self, pattern="*", recursive=0):
+        _call("GetContents")
+        if isinstance(pattern, int):
+            pattern, recursive = ("*", pattern)
+        # folder paths are separated by backslashes
+        parents = [self]
+        path = pattern.split("\\")
+        for folder_name in path[:-1]:
+            parents = [
+                folder for parent in parents for folder in _find(parent, folder_name, 0)
+            ]
+        return [obj for parent in parents for obj in _find(parent, path[-1], recursive)]
+
+    def GetParent(self):
+        return self._parent
+
+    def GetClassName(self):
+        return self._class
+
+    def GetFullName(self):
+        names = []
+        obj = self
+        while obj is not None:
+            names.append(f"{obj._name}.{obj._class}")
+            obj = obj._parent
+        return "\\".join(reversed(names))
+
+    def IsDeleted(self):
+        return int(self._deleted)
+
+    def Delete(self):
+        _call("Delete")
+        if self._parent is not None:
+            self._parent._remove_child(self)
+        for obj in [self] + _find(self, "*", 1):
+            obj._deleted = True
+            del self._app._by_class[obj._class][obj]
+            self._app._on_delete(obj)
+        return 0
+
+    def Move(self, obj):
+        _call("Move")
+        obj._parent._remove_child(obj)
+        obj._parent = self
+        self._add_child(obj)
+        return 0
+
+    # attributes
+
+    def HasAttribute(self, name):
+        _call("HasAttribute")
+        name = name.split(":", 1)[1] if ":" in name else name
+        return int(
+            name in self._attributes
+            or name in pointer_attributes
+            or self._class.startswith(("Elm", "Sta", "Typ"))
+        )
+
+    def GetAttribute(self, name):
+        _call("GetAttribute")
+        return self._get(name)
+
+    def _get(self, name):
+        if ":" in name:
+            prefix, var = name.split(":", 1)
+            # calculation results
+            if prefix in ["m", "c", "n", "s", "b", "r"]:
+                return self._results.get(var, 0.0)
+            name = var
+        if name == "loc_name":
+            return self._name
+        # cubicles are connected to the terminal they are stored in
+        if name == "cterm" and self._class == "StaCubic":
+            return self._parent
+        scenario = self._app._active["scenario"]
+        if scenario is not None:
+            if (self, name) in scenario._pending:
+                return scenario._pending[(self, name)]
+            if (self, name) in scenario._values:
+                return scenario._values[(self, name)]
+        if name in self._attributes:
+            return self._attributes[name]
+        if name in pointer_attributes:
+            return None
+        if name == "desc":
+            return []
+        return 0
+
+    def SetAttribute(self, name, value):
+        _call("SetAttribute")
+        self._set(name, value)
+        return 0
+
+    def _set(self, name, value):
+        if ":" in name:
+            prefix, var = name.split(":", 1)
+            if prefix in ["m", "c", "n", "s", "b", "r"]:
+                self._results[var] = value
+                return
+            # vector entries, e.g. points:0 or matrix:1, are stored under their full name
+            if prefix == "e":
+                name = var
+        if isinstance(value, (list, tuple)):
+            value = list(value)
+        if name == "loc_name":
+            self._rename(value)
+            return
+        scenario = self._app._active["scenario"]
+        if scenario is not None and self._in_network():
+            scenario._pending[(self, name)] = value
+            return
+        self._attributes[name] = value
+        # objects assigned to composite model slots are linked to the composite model
+        if self._class == "ElmComp":
+            for obj in value if isinstance(value, list) else [value]:
+                if isinstance(obj, DataObject):
+                    obj._attributes["c_pmod"] = self
+
+    def SetAttributes(self, values):
+        _call("SetAttributes")
+        params = self._app._transfer_attributes.get(self._class)
+        if params is None:
+            raise RuntimeError(
+                f"No transfer attributes defined for class {self._class}"
+            )
+        if len(params) != len(values):
+            raise RuntimeError(
+                f"Expected {len(params)} values for {self._class}, got {len(values)}"
+            )
+        for param, value in zip(params, values):
+            self._set(param, value)
+        return 0
+
+    def GetAttributes(self):
+        _call("GetAttributes")
+        params = self._app._transfer_attributes.get(self._class)
+        if params is None:
+            raise RuntimeError(
+                f"No transfer attributes defined for class {self._class}"
+            )
+        return [self._get(param) for param in params]
+
+    # topology
+
+    def GetConnectedElements(self, *args):
+        _call("GetConnectedElements")
+        if self._class == "ElmTerm":
+            return [
+                cub._attributes["obj_id"]
+                for cub in self._children
+                if cub._class == "StaCubic"
+                and cub._attributes.get("obj_id") is not None
+                and not cub._attributes["obj_id"]._deleted
+            ]
+        connected = []
+        for attribute in ["bus1", "bus2", "buslv", "bushv"]:
+            cub = self._attributes.get(attribute)
+            if cub is not None and cub._parent not in connected:
+                connected.append(cub._parent)
+        return connected
+
+    # activation of study cases, networks and operation scenarios
+
+    def Activate(self):
+        _call("Activate")
+        return self._app._activate(self)
+
+    def Deactivate(self):
+        _call("Deactivate")
+        return self._app._deactivate(self)
+
+    def Save(self):
+        _call("Save")
+        if self._class == "IntScenario":
+            self._values.update(self._pending)
+            self._pending.clear()
+        return 0
+
+    # commands and diagrams
+
+    def Execute(self, *args):
+        _call("Execute")
+        return 0
+
+    def Show(self):
+        _call("Show")
+        # opening a diagram creates its settings
+        if self._class == "IntGrfnet" and len(_find(self, "Settings", 0)) == 0:
+            settings = DataObject(self._app, self, "IntFolder", "Settings")
+            self._add_child(settings)
+            settings._add_child(DataObject(self._app, settings, "SetGrfpage", "Format"))
+        return 0
+
+    def Close(self):
+        _call("Close")
+        return 0
+
+
+class Application:
+    def __init__(self, project_name="SNEM2000d", echo=True):
+        self.echo = echo
+        self.messages = []
+        self._transfer_attributes = {}
+        self._active = {"study_case": None, "scenario": None, "networks": []}
+        # objects of each class, in creation order
+        self._by_class = {}
+
+        # project with the standard folders
+        self._root = DataObject(self, None, "IntUser", "standin")
+        self._project = self._root.CreateObject("IntPrj", project_name)
+        self._folders = {}
+        for key, (name, class_name) in project_folders.items():
+            self._folders[key] = self._project.CreateObject(class_name, name)
+        self._project.CreateObject("SetFold", "Settings")
+        for folder_name in data_folders.values():
+            self._folders["netdat"].CreateObject("IntFolder", folder_name)
+        self._global_library = self._root.CreateObject("IntFolder", "Library")
+        reset_call_counts()
+
+    # output window
+
+    def _print(self, level, message):
+        _call("Print")
+        self.messages.append((level, str(message)))
+        if self.echo:
+            print(message)
+
+    def PrintPlain(self, message):
+        self._print("plain", message)
+
+    def PrintInfo(self, message):
+        self._print("info", message)
+
+    def PrintWarn(self, message):
+        self._print("warn", message)
+
+    def PrintError(self, message):
+        self._print("error", message)
+
+    def ClearOutputWindow(self):
+        self.messages.clear()
+
+    # project and library folders
+
+    def GetActiveProject(self):
+        return self._project
+
+    def GetProjectFolder(self, key):
+        _call("GetProjectFolder")
+        return self._folders.get(key)
+
+    def GetDataFolder(self, class_name, create=0):
+        _call("GetDataFolder")
+        netdat = self._folders["netdat"]
+        folder_name = data_folders.get(class_name, class_name)
+        folders = _find(netdat, f"{folder_name}.IntFolder", 0)
+        if len(folders) != 0:
+            return folders[0]
+        if create:
+            return netdat.CreateObject("IntFolder", folder_name)
+        return None
+
+    def GetGlobalLibrary(self, class_name=None):
+        return self._global_library
+
+    def GetLocalLibrary(self, class_name=None):
+        if class_name == "BlkDef":
+            return self._folders["blk"]
+        return self._folders["equip"]
+
+    # study case
+
+    def GetActiveStudyCase(self):
+        return self._active["study_case"]
+
+    def GetActiveScenario(self):
+        return self._active["scenario"]
+
+    # returns the object of the class in the active study case, making it if necessary
+    def GetFromStudyCase(self, name):
+        _call("GetFromStudyCase")
+        study_case = self._active["study_case"]
+        if study_case is None:
+            return None
+        pattern = name if "." in name else f"*.{name}"
+        found = _find(study_case, pattern, 0)
+        if len(found) != 0:
+            return found[0]
+        class_name = name.split(".")[-1]
+        return study_case.CreateObject(class_name)
+
+    # calculation relevant objects are the objects of the active networks
+    def GetCalcRelevantObjects(self, pattern="*", *args):
+        _call("GetCalcRelevantObjects")
+        if "." not in pattern and pattern != "*":
+            pattern = f"*.{pattern}"
+        # objects of a class are looked up directly, instead of searching the networks
+        name, class_name = pattern.rsplit(".", 1) if "." in pattern else ("*", "*")
+        if name == "*" and _is_literal(class_name):
+            return [
+                obj
+                for obj in self._by_class.get(class_name, {}).keys()
+                if self._is_calc_relevant(obj)
+            ]
+        found = []
+        for net in self._active["networks"]:
+            found.extend(_find(net, pattern, 1))
+        return found
+
+    def _is_calc_relevant(self, obj):
+        while obj is not None:
+            if obj._class == "ElmNet":
+                return obj in self._active["networks"]
+            obj = obj._parent
+        return False
+
+    def DefineTransferAttributes(self, class_name, attributes):
+        _call("DefineTransferAttributes")
+        if isinstance(attributes, str):
+            attributes = [a.strip() for a in attributes.split(",")]
+        self._transfer_attributes[class_name] = list(attributes)
+        return 0
+
+    # activation
+
+    def _activate(self, obj):
+        if obj._class == "IntCase":
+            self._active["study_case"] = obj
+        elif obj._class == "ElmNet":
+            if obj not in self._active["networks"]:
+                self._active["networks"].append(obj)
+        elif obj._class == "IntScenario":
+            current = self._active["scenario"]
+            if current is obj:
+                return 0
+            if current is not None:
+                self._deactivate(current)
+            self._active["scenario"] = obj
+        return 0
+
+    def _deactivate(self, obj):
+        if obj._class == "IntCase" and self._active["study_case"] is obj:
+            self._active["study_case"] = None
+            self._active["networks"] = []
+        elif obj._class == "ElmNet" and obj in self._active["networks"]:
+            self._active["networks"].remove(obj)
+        elif obj._class == "IntScenario" and self._active["scenario"] is obj:
+            # unsaved changes are discarded, unless kept (see scenario_options)
+            if not scenario_options["keep_unsaved"]:
+                obj._pending.clear()
+            self._active["scenario"] = None
+        return 0
+
+    def _on_delete(self, obj):
+        if obj is self._active["scenario"]:
+            self._active["scenario"] = None
+        if obj is self._active["study_case"]:
+            self._active["study_case"] = None
+        if obj in self._active["networks"]:
+            self._active["networks"].remove(obj)
+
+
+def GetApplication():
+    if _application["app"] is None:
+        _application["app"] = Application()
+    return _application["app"]
+
+
+# discards the current application, so that the next GetApplication() starts an empty project
+def reset_application(project_name="SNEM2000d", echo=True):
+    _application["app"] = Application(project_name=project_name, echo=echo)
+    return _application["app"]
+
+
+# makes an object at a backslash separated path below folder, making folders as needed
+# e.g. make_object_path(app.GetLocalLibrary("BlkDef"), "nem_dynamic_models\\TGOV1.BlkDef")
+def make_object_path(folder, path):
+    names = path.split("\\")
+    for folder_name in names[:-1]:
+        existing = _find(folder, folder_name, 0)
+        folder = (
+            existing[0]
+            if len(existing) != 0
+            else folder.CreateObject("IntFolder", folder_name)
+        )
+    name, class_name = names[-1].rsplit(".", 1)
+    existing = _find(folder, names[-1], 0)
+    if len(existing) != 0:
+        return existing[0]
+    return folder.CreateObject(class_name, name)
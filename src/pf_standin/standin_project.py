@@ -0,0 +1,64 @@
+import powerfactory
+
+# Populates the stand-in project with the library objects the SNEM2000d build expects
+# The dynamic model definitions are empty objects, which is enough for the build to link
+# composite models and dsls to them.
+
+# nem_dynamic_models folder, copied into the project library from nem_dynamic_models.pfd
+nem_dynamic_models = [
+    "synchronous_machines\\SYM Frame_no droop.BlkDef",
+    "synchronous_machines\\SYM Frame_no droop_torque_reference.BlkDef",
+    "synchronous_machines\\TGOV1.BlkDef",
+    "synchronous_machines\\HYGOV.BlkDef",
+    "synchronous_machines\\IEEET1.BlkDef",
+    "synchronous_machines\\PSS2B.BlkDef",
+    "WECC_renewable_energy\\Frame WECC WT Type 3.BlkDef",
+    "WECC_renewable_energy\\Frame WECC WT Type 4A.BlkDef",
+    "WECC_renewable_energy\\Frame WECC WT Type 4B.BlkDef",
+    "WECC_renewable_energy\\Frame WECC Large-scale PV Plant.BlkDef",
+    "WECC_renewable_energy\\WTGTRQ_A.BlkDef",
+    "WECC_renewable_energy\\WTGPT_A.BlkDef",
+    "WECC_renewable_energy\\WTGAR_A.BlkDef",
+    "WECC_renewable_energy\\WTGT_A.BlkDef",
+    "WECC_renewable_energy\\REEC_A.BlkDef",
+    "WECC_renewable_energy\\REEC_B.BlkDef",
+    "WECC_renewable_energy\\REGC_A.BlkDef",
+    "REPC_A_mod.BlkDef",
+]
+
+# WECC models of the PowerFactory global library
+wecc_dynamic_models = [
+    "Frm\\Frame WECC Large-scale PV Plant.BlkDef",
+    "Frm\\Frame WECC WT Type 3.BlkDef",
+    "Frm\\Frame WECC WT Type 4A.BlkDef",
+    "Frm\\Frame WECC WT Type 4B.BlkDef",
+    "Frm\\Frame WECC Plant Control.BlkDef",
+    "REEC_A.BlkDef",
+    "REEC_B.BlkDef",
+    "REEC_C.BlkDef",
+    "REEC_D.BlkDef",
+    "REGC_A.BlkDef",
+    "REGC_B.BlkDef",
+    "REGC_C.BlkDef",
+    "REPC_A.BlkDef",
+    "REPC_C.BlkDef",
+    "REPC_D.BlkDef",
+    "WTGTRQ_A.BlkDef",
+    "WTGPT_A.BlkDef",
+    "WTGAR_A.BlkDef",
+    "WTGT_A.BlkDef",
+    "WTGIBFFR_A.BlkDef",
+]
+
+
+# returns a stand-in application with an empty project and the dynamic model libraries
+def make_standin_application(project_name="SNEM2000d", echo=True):
+    app = powerfactory.reset_application(project_name=project_name, echo=echo)
+    user_library = app.GetLocalLibrary("BlkDef")
+    for path in nem_dynamic_models:
+        powerfactory.make_object_path(user_library, f"nem_dynamic_models\\{path}")
+    global_library = app.GetGlobalLibrary("BlkDef")
+    for path in wecc_dynamic_models:
+        powerfactory.make_object_path(global_library, f"IBR\\WECC\\{path}")
+    powerfactory.reset_call_counts()
+    return app
@@ -3,6 +3,9 @@ __all__ = [
     "export_data",
     "plotting",
     "rms_simulation",
+    "write_batch",
+    "read_batch",
+    "transfer_signatures",
 ]
 
 import importlib
@@ -11,15 +14,23 @@ from . import utils
 from . import export_data
 from . import plotting
 from . import rms_simulation
-
+from . import write_batch
+from . import read_batch
+from . import transfer_signatures
 
 importlib.reload(utils)
 importlib.reload(export_data)
 importlib.reload(plotting)
 importlib.reload(rms_simulation)
+importlib.reload(write_batch)
+importlib.reload(read_batch)
+importlib.reload(transfer_signatures)
 
 
 from .utils import *
 from .export_data import *
 from .plotting import *
 from .rms_simulation import *
+from .write_batch import *
+from .read_batch import *
+from .transfer_signatures import *
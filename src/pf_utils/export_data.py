@@ -4,10 +4,13 @@ import csv
 import importlib
 
 from . import utils
+from . import read_batch
 
 importlib.reload(utils)
+importlib.reload(read_batch)
 
 from .utils import *
+from .read_batch import *
 
 
 # configures the ComRes object
@@ -39,6 +42,8 @@ def export_rms_results(
             "f_name": str(output_dir / f"header_{output_name}.csv"),
         },
     )
+    # queued parameters must be written before ComRes reads them
+    flush_writes(app)
     com_res.Execute()
 
     # export values
@@ -49,17 +54,22 @@ def export_rms_results(
             "f_name": str(output_dir / f"{output_name}.csv"),
         },
     )
+    flush_writes(app)
     com_res.Execute()
 
 
 # exports element parameters
+# export_data format: {set_name: {"elms": [...], "vars": [...], "class": optional class}}
+# if all elements of a set have the same class, giving "class" saves a lookup per element
 def export_parameters(app, dir_path, export_data, prefix=""):
     for set_name, set_data in export_data.items():
+        rows = read_attribute_rows(
+            app,
+            set_data["elms"],
+            ["loc_name"] + set_data["vars"],
+            set_data.get("class"),
+        )
         with open(Path(dir_path) / f"{prefix}{set_name}.csv", "w", newline="") as f:
             writer = csv.writer(f)
             writer.writerow(["loc_name"] + set_data["vars"])
-            for elm in set_data["elms"]:
-                writer.writerow(
-                    [elm.loc_name]
-                    + [elm.GetAttribute(param) for param in set_data["vars"]]
-                )
+            writer.writerows(rows)
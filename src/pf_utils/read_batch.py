@@ -0,0 +1,82 @@
+import powerfactory
+import numpy as np
+import importlib
+
+from . import transfer_signatures
+
+importlib.reload(transfer_signatures)
+
+from .transfer_signatures import *
+
+# Bulk attribute reads
+# read_attributes reads the same variables of many elements with one DefineTransferAttributes
+# call per class and one GetAttributes call per element, instead of one GetAttribute call per
+# element and variable. Variables can be parameters or results (e.g. "m:u").
+# The transfer attributes are defined with define_transfer_attributes, which keeps the signature
+# of each class, so SetAttributes writes made after a bulk read define their signature again
+# (see transfer_signatures.py).
+
+read_counts = {
+    "n_define": 0,
+    "n_get_attributes": 0,
+    "n_values": 0,  # values read, i.e. GetAttribute calls replaced
+    "n_fallback": 0,  # elements read with GetAttribute because GetAttributes failed
+}
+
+
+def reset_read_counts():
+    for count in read_counts.keys():
+        read_counts[count] = 0
+
+
+# returns the indexes of elms for each class
+# the classes are looked up per element unless elm_class is given
+def get_class_indexes(elms, elm_class=None):
+    if elm_class is not None:
+        return {elm_class: list(range(len(elms)))}
+    class_indexes = {}
+    for i, elm in enumerate(elms):
+        class_indexes.setdefault(elm.GetClassName(), []).append(i)
+    return class_indexes
+
+
+# returns a list of the values of variables for each element, in the order of elms
+def read_attribute_rows(app, elms, variables, elm_class=None):
+    rows = [None] * len(elms)
+    for read_class, indexes in get_class_indexes(elms, elm_class).items():
+        if define_transfer_attributes(app, read_class, variables):
+            read_counts["n_define"] += 1
+        for i in indexes:
+            try:
+                rows[i] = list(elms[i].GetAttributes())
+                read_counts["n_get_attributes"] += 1
+            except:
+                rows[i] = [elms[i].GetAttribute(var) for var in variables]
+                read_counts["n_fallback"] += 1
+            read_counts["n_values"] += len(variables)
+    return rows
+
+
+# returns a 2d array of the values of variables, with a row per element and a column per
+# variable
+def read_attributes(app, elms, variables, elm_class=None, dtype=float):
+    rows = read_attribute_rows(app, elms, variables, elm_class)
+    return np.array(rows, dtype=dtype).reshape(len(elms), len(variables))
+
+
+# returns the values of variables for each element, keyed by loc_name
+# format: {loc_name: {variable: value}}
+# loc_name is read with the variables, so no further calls are made per element
+def read_attributes_by_name(app, elms, variables, elm_class=None):
+    rows = read_attribute_rows(app, elms, ["loc_name"] + list(variables), elm_class)
+    return {row[0]: dict(zip(variables, row[1:])) for row in rows}
+
+
+# returns the values of variables as a DataFrame indexed by loc_name
+def read_attributes_frame(app, elms, variables, elm_class=None):
+    import pandas as pd
+
+    rows = read_attribute_rows(app, elms, ["loc_name"] + list(variables), elm_class)
+    return pd.DataFrame(rows, columns=["loc_name"] + list(variables)).set_index(
+        "loc_name"
+    )
@@ -0,0 +1,56 @@
+import powerfactory
+
+# Transfer attribute signatures
+# DefineTransferAttributes sets the attributes read by GetAttributes and written by SetAttributes
+# for a class, for all callers. define_transfer_attributes keeps the signature defined for each
+# class and only calls DefineTransferAttributes when the signature of the class changes, so
+# consecutive elements with the same signature are read or written without it.
+# All DefineTransferAttributes calls must go through define_transfer_attributes (the network
+# build, flush_writes and read_attribute_rows do), otherwise the kept signature of the class is
+# wrong and SetAttributes writes values into the wrong attributes.
+# The signatures are only valid for the PowerFactory session they were defined in, so
+# reset_transfer_attributes must be called when the application is restarted.
+
+transfer_attributes = {
+    "cache": True,  # set to False to define attributes for every call
+    "defined": {},
+    "n_defined": {},
+    "n_skipped": {},
+}
+
+
+# clears the defined signatures and counts
+def reset_transfer_attributes():
+    transfer_attributes["defined"] = {}
+    transfer_attributes["n_defined"] = {}
+    transfer_attributes["n_skipped"] = {}
+
+
+# defines the transfer attributes of a class, unless they are already defined
+# returns True if DefineTransferAttributes was called
+def define_transfer_attributes(app, elm_class, params):
+    signature = ", ".join(params)
+    if (
+        transfer_attributes["cache"]
+        and transfer_attributes["defined"].get(elm_class) == signature
+    ):
+        transfer_attributes["n_skipped"][elm_class] = (
+            transfer_attributes["n_skipped"].get(elm_class, 0) + 1
+        )
+        return False
+    app.DefineTransferAttributes(elm_class, signature)
+    transfer_attributes["defined"][elm_class] = signature
+    transfer_attributes["n_defined"][elm_class] = (
+        transfer_attributes["n_defined"].get(elm_class, 0) + 1
+    )
+    return True
+
+
+# prints the number of DefineTransferAttributes calls made and saved for each class
+def report_transfer_attributes(app):
+    for elm_class in sorted(transfer_attributes["n_defined"].keys()):
+        n_defined = transfer_attributes["n_defined"][elm_class]
+        n_skipped = transfer_attributes["n_skipped"].get(elm_class, 0)
+        app.PrintInfo(
+            f"{elm_class}: \t{n_defined} DefineTransferAttributes calls, {n_skipped} saved"
+        )
@@ -1,11 +1,19 @@
 import powerfactory
+import importlib
+
+from . import write_batch
+
+importlib.reload(write_batch)
+
+from .write_batch import *
 
 
 # sets parameters for a PowerFactory object
 # dict format: {"parameter_name": "value"}
+# parameters are queued if batched writes are enabled (see write_batch.py)
 def set_parameters(obj, parameter_dict):
     for param, value in parameter_dict.items():
-        obj.SetAttribute(param, value)
+        set_attribute(obj, param, value)
 
 
 # create study case
@@ -28,6 +36,7 @@ def make_study_case(app, study_case_name, target=None):
 
 
 def run_load_flow(app, throw=True):
+    flush_writes(app)
     comldf = app.GetFromStudyCase("ComLdf")
     ldf_result = comldf.Execute()
     if throw:
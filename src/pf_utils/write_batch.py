@@ -0,0 +1,175 @@
+from array import array
+import powerfactory
+import importlib
+
+from . import transfer_signatures
+
+importlib.reload(transfer_signatures)
+
+from .transfer_signatures import *
+
+# Batched attribute writes
+# When enabled, set_attribute queues writes instead of calling SetAttribute. flush_writes then
+# writes each object's queued attributes with one SetAttributes call, defining the transfer
+# attributes once for each class and attribute signature (see transfer_signatures.py).
+# Queued writes are not visible to GetAttribute until they are flushed, so flush_writes must be
+# called before load flows, before activating, deactivating or saving operation scenarios, and
+# before reading back written attributes.
+# Disabled by default, in which case set_attribute calls SetAttribute directly.
+
+queued_writes = {
+    "enabled": False,
+    "objects": {},  # object: {attribute: value}, in the order objects were first written
+    "classes": {},  # object: class name
+    "n_queued": 0,  # set_attribute calls queued
+    "n_written": 0,  # attribute values written, after repeated writes are combined
+    "n_set_attributes": 0,
+    "n_define": 0,
+    "n_fallback": 0,  # objects written with SetAttribute because SetAttributes failed
+}
+
+
+# enables or disables batched writes and clears the queue and counts
+def enable_batched_writes(enabled=True):
+    queued_writes["enabled"] = enabled
+    queued_writes["objects"] = {}
+    queued_writes["classes"] = {}
+    for count in [
+        "n_queued",
+        "n_written",
+        "n_set_attributes",
+        "n_define",
+        "n_fallback",
+    ]:
+        queued_writes[count] = 0
+
+
+# Delta writes
+# When enabled, set_attribute keeps the last value written to each numeric attribute and skips
+# writes that are within the tolerance of it. The values are kept in an array, with a slot for
+# each object and attribute.
+# The skipped values must already be held by the object, e.g. in an operation scenario copied
+# from the one the previous values were written to. reset_delta_writes must be called whenever
+# this is not the case, e.g. when the network or the active operation scenario is changed
+# outside of the written sequence.
+# Disabled by default, in which case all writes are made.
+
+applied_values = {
+    "enabled": False,
+    "tolerance": 1e-6,  # absolute tolerance of skipped writes
+    "slots": {},  # (object, attribute): index in values
+    "values": array("d"),  # last value written to each slot
+    "n_written": 0,  # numeric writes made since the last reset_delta_counts
+    "n_skipped": 0,  # numeric writes skipped since the last reset_delta_counts
+}
+
+
+# enables or disables delta writes and clears the stored values and counts
+def enable_delta_writes(enabled=True, tolerance=1e-6):
+    applied_values["enabled"] = enabled
+    applied_values["tolerance"] = tolerance
+    reset_delta_writes()
+
+
+# clears the stored values and counts, so that the next writes are all made
+def reset_delta_writes():
+    applied_values["slots"] = {}
+    applied_values["values"] = array("d")
+    reset_delta_counts()
+
+
+def reset_delta_counts():
+    applied_values["n_written"] = 0
+    applied_values["n_skipped"] = 0
+
+
+# returns True if the value is within the tolerance of the last value written to the attribute,
+# otherwise stores the value and returns False. values that are not numbers are never skipped
+def is_unchanged(obj, param, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    key = (obj, param[2:] if param.startswith("e:") else param)
+    slot = applied_values["slots"].get(key)
+    if slot is None:
+        applied_values["slots"][key] = len(applied_values["values"])
+        applied_values["values"].append(value)
+    elif abs(applied_values["values"][slot] - value) <= applied_values["tolerance"]:
+        applied_values["n_skipped"] += 1
+        return True
+    else:
+        applied_values["values"][slot] = value
+    applied_values["n_written"] += 1
+    return False
+
+
+# prints the numeric writes made and skipped since the last reset_delta_counts
+def report_delta_writes(app, label="Delta writes"):
+    n_total = applied_values["n_written"] + applied_values["n_skipped"]
+    app.PrintInfo(
+        f"{label}: {applied_values['n_written']} written, "
+        f"{applied_values['n_skipped']} skipped of {n_total} "
+        f"(tolerance {applied_values['tolerance']})"
+    )
+
+
+# sets an attribute of a PowerFactory object, or queues it if batched writes are enabled
+# later writes of the same attribute replace earlier ones
+# if delta writes are enabled, values unchanged since the last write are skipped
+def set_attribute(obj, param, value):
+    if applied_values["enabled"] and is_unchanged(obj, param, value):
+        return
+    if not queued_writes["enabled"]:
+        obj.SetAttribute(param, value)
+        return
+    # element parameters are written without the e: prefix, so both forms are combined
+    if param.startswith("e:"):
+        param = param[2:]
+    if obj not in queued_writes["objects"]:
+        queued_writes["objects"][obj] = {}
+        queued_writes["classes"][obj] = obj.GetClassName()
+    queued_writes["objects"][obj][param] = value
+    queued_writes["n_queued"] += 1
+
+
+# writes all queued attributes
+# objects are grouped by class and attribute signature so that transfer attributes are
+# defined once per group
+def flush_writes(app):
+    if len(queued_writes["objects"]) == 0:
+        return
+    groups = {}
+    for obj, values in queued_writes["objects"].items():
+        signature = (queued_writes["classes"][obj], tuple(values.keys()))
+        groups.setdefault(signature, []).append(obj)
+
+    for (elm_class, params), objs in groups.items():
+        if define_transfer_attributes(app, elm_class, params):
+            queued_writes["n_define"] += 1
+        for obj in objs:
+            values = list(queued_writes["objects"][obj].values())
+            try:
+                obj.SetAttributes(values)
+                queued_writes["n_set_attributes"] += 1
+            except:
+                # write one at a time so that the failing attribute raises its own error
+                for param, value in zip(params, values):
+                    obj.SetAttribute(param, value)
+                queued_writes["n_fallback"] += 1
+            queued_writes["n_written"] += len(values)
+
+    queued_writes["objects"] = {}
+    queued_writes["classes"] = {}
+
+
+# prints the number of PowerFactory calls made for the writes since batching was enabled
+def report_batched_writes(app):
+    app.PrintInfo(
+        f"Batched writes: {queued_writes['n_queued']} SetAttribute calls replaced by "
+        f"{queued_writes['n_set_attributes']} SetAttributes and "
+        f"{queued_writes['n_define']} DefineTransferAttributes calls"
+    )
+    if queued_writes["n_fallback"] != 0:
+        app.PrintWarn(
+            f"{queued_writes['n_fallback']} objects were written with SetAttribute "
+            "because SetAttributes failed"
+        )